@@ -6,12 +6,24 @@ MSSQL = "mssql"
 POSTGRES = "postgres"
 ORACLE = "oracle"
 
+# Entry point group of the dialects of other packages, and the features a dialect can support
+DIALECT_ENTRY_POINT_GROUP = "schema_validator.dialects"
+CAPABILITY_BULK_CATALOG_QUERY = "bulk_catalog_query"
+CAPABILITY_SERVER_SIDE_HASHING = "server_side_hashing"
+CAPABILITY_SAMPLED_ROW_COUNT = "sampled_row_count"
+CAPABILITY_PARTITIONS = "partitions"
+# The partitions are tables of their own, which are also listed among the tables, like the partitions of PostgreSQL
+CAPABILITY_PARTITION_TABLES = "partition_tables"
+CAPABILITY_DDL_MARKERS = "ddl_markers"
+CAPABILITY_OBJECT_DIGESTS = "object_digests"
+
 CONFIG_FILE = "configurations.ini"
 CONNECTION_STRING = "CONNECTION_STRING"
 LOG_BASE_PATH = "LOG_BASE_PATH"
 CHUNK_SIZE = "CHUNK_SIZE"
 
 FILE_FORMAT = "FILE_FORMAT"
+SAVE_SNAPSHOT = "SAVE_SNAPSHOT"
 
 DATABASE_TYPE = "database_type"
 HOST = "host"
@@ -19,10 +31,16 @@ PORT = "port"
 USERNAME = "username"
 PASSWORD = "password"
 DATABASE_NAME = "database_name"
+SCHEMA_NAMES = "schema_names"
 
 SOURCE_SECRET_ID = "SOURCE_SECRET_ID"
 TARGET_SECRET_ID = "TARGET_SECRET_ID"
 SECRET_REGION = "SECRET_REGION"
+SECRETS_PROVIDER = "SECRETS_PROVIDER"
+SECRETS_ENDPOINT_URL = "SECRETS_ENDPOINT_URL"
+SECRETS_FILE = "SECRETS_FILE"
+SECRETS_CACHE_TTL = "SECRETS_CACHE_TTL"
+SECRETS_DISK_CACHE = "SECRETS_DISK_CACHE"
 
 SOURCE_DATABASE_TYPE = "source_database_type"
 SOURCE_HOST = "source_host"
@@ -41,4 +59,46 @@ TARGET_DATABASE_NAME = "target_database_name"
 SECTION_SOURCE = "source"
 SECTION_TARGET = "target"
 SECTION_REGION = "region"
+SECTION_SECRETS = "secrets"
 SECTION_FILE_FORMAT = "file-format"
+SECTION_CONNECTION_POOL = "connection-pool"
+SECTION_EXTRACTION = "extraction"
+SECTION_QUERY_CACHE = "query-cache"
+SECTION_COMPARISON = "comparison"
+SECTION_ROW_COUNT = "row-count"
+SECTION_DATA_VALIDATION = "data-validation"
+
+POOL_SIZE = "POOL_SIZE"
+POOL_MAX_OVERFLOW = "POOL_MAX_OVERFLOW"
+POOL_PRE_PING = "POOL_PRE_PING"
+POOL_RECYCLE = "POOL_RECYCLE"
+
+EXTRACTION_MODE = "EXTRACTION_MODE"
+EXTRACTION_ENGINE = "EXTRACTION_ENGINE"
+SOURCE_CONCURRENCY = "SOURCE_CONCURRENCY"
+TARGET_CONCURRENCY = "TARGET_CONCURRENCY"
+INCREMENTAL = "INCREMENTAL"
+DIGEST_COMPARISON = "DIGEST_COMPARISON"
+
+QUERY_CACHE_ENABLED = "QUERY_CACHE_ENABLED"
+QUERY_CACHE_TTL = "QUERY_CACHE_TTL"
+QUERY_CACHE_FILE = "query_cache.sqlite3"
+
+COMPARISON_BACKEND = "COMPARISON_BACKEND"
+MEMORY_BUDGET = "MEMORY_BUDGET_MB"
+
+ROW_COUNT_MODE = "ROW_COUNT_MODE"
+ROW_COUNT_CONCURRENCY = "ROW_COUNT_CONCURRENCY"
+ROW_COUNT_TIMEOUT = "ROW_COUNT_TIMEOUT"
+ROW_COUNT_SAMPLE_PERCENT = "ROW_COUNT_SAMPLE_PERCENT"
+ROW_COUNT_SAMPLE_TOLERANCE = "ROW_COUNT_SAMPLE_TOLERANCE"
+ROW_COUNT_SAMPLE_MIN_ROWS = "ROW_COUNT_SAMPLE_MIN_ROWS"
+PARTITION_ROW_COUNT = "PARTITION_ROW_COUNT"
+
+DATA_VALIDATION = "DATA_VALIDATION"
+CHECKSUM_CHUNK_ROWS = "CHECKSUM_CHUNK_ROWS"
+CHECKSUM_MIN_CHUNK_ROWS = "CHECKSUM_MIN_CHUNK_ROWS"
+CHECKSUM_TIMEOUT = "CHECKSUM_TIMEOUT"
+SPOT_CHECK = "SPOT_CHECK"
+SPOT_CHECK_SAMPLE_SIZE = "SPOT_CHECK_SAMPLE_SIZE"
+SPOT_CHECK_CONFIDENCE = "SPOT_CHECK_CONFIDENCE"
@@ -0,0 +1,88 @@
+"""
+Includes the asyncio counterparts of the classes in database_types. Dialects with a native asyncio driver use an
+SQLAlchemy async engine, the other dialects run the blocking driver in a worker thread
+"""
+import asyncio
+from abc import ABC
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database.database_types import prepare_statement
+from logger import get_logger
+
+
+class AsyncDatabase(ABC):
+    def __init__(self) -> None:
+        self.logger = get_logger(__name__)
+        self.engine = None
+        self.database_type = None
+
+    async def execute_query(self, query, params=None):
+        """
+        execute_query coroutine takes the sql query as input and returns all the rows of the result
+        :param query: Query to execute in the database e.g. "select * from table_name"
+        :param params: Dictionary with the values of the bound parameters of the query
+        :return: Returns a list of rows, each row can be accessed like a dictionary
+        """
+        try:
+            async with self.engine.connect() as conn:
+                result = await conn.execute(prepare_statement(query), params or {})
+                return result.mappings().all()
+        except Exception as e:
+            self.logger.error(f'Error occurred while executing the {self.database_type} query: {e}')
+            exit(0)
+
+    async def close(self):
+        """
+        Closes all the pooled connections of the engine
+        """
+        if self.engine is not None:
+            await self.engine.dispose()
+
+
+class AsyncDatabaseMySQL(AsyncDatabase):
+    def __init__(self, hostname, port, database, username, password, **engine_options) -> None:
+        super().__init__()
+        self.database_type = 'MySQL'
+        url = f'mysql+aiomysql://{username}:{password}@{hostname}:{port}/{database}'
+
+        try:
+            self.logger.info("Trying to create the async MySQL DB engine")
+            self.engine = create_async_engine(url, **engine_options)
+        except Exception as e:
+            self.logger.error(e)
+            exit(0)
+
+
+class AsyncDatabasePostgres(AsyncDatabase):
+    def __init__(self, hostname, port, database, username, password, **engine_options) -> None:
+        super().__init__()
+        self.database_type = 'PostgreSQL'
+        url = f'postgresql+asyncpg://{username}:{password}@{hostname}:{port}/{database}?ssl=require'
+
+        try:
+            self.logger.info("Trying to create the async PostgreSQL DB engine")
+            self.engine = create_async_engine(url, **engine_options)
+        except Exception as e:
+            self.logger.error(e)
+            exit()
+
+
+class AsyncDatabaseThreaded(AsyncDatabase):
+    """
+    Used for the dialects without an asyncio driver (SQL Server and Oracle). The queries run on the blocking
+    database in the default executor of the event loop, so they do not block the other queries in flight
+    """
+
+    def __init__(self, database) -> None:
+        super().__init__()
+        self.db = database
+        self.database_type = database.database_type
+
+    async def execute_query(self, query, params=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.db.execute_query, query, params)
+
+    async def close(self):
+        # The connections belong to the blocking database, which is closed separately
+        pass
+
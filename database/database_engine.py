@@ -1,7 +1,13 @@
+import os
+from collections import namedtuple
+from functools import lru_cache
+
 from database import *
-from database.database_types import *
+from database.dialects import get_dialect
+from database.query_cache import QueryCache
+from logger import get_logger
+from src import OUTPUT_DIR
 from src.utility.utils import CommonUtility
-from sqlalchemy import text
 
 """
 export DYLD_LIBRARY_PATH=/usr/local/mysql/lib/
@@ -17,25 +23,163 @@ Had to create new symlink for openssl1.1
 Good resource: https://docs.microsoft.com/en-us/azure/azure-sql/database/connect-query-python
 """
 
-DB_TYPE_MAPPING = {
-    MSSQL: DatabaseMsSQL,
-    MYSQL: DatabaseMySQL,
-    POSTGRES: DatabasePostgres,
-    ORACLE: DatabaseOracle
-}
+class ConfiguredDatabase:
+    """
+    Behaviour shared by the source and the target database. Child classes read their section of the configuration
+    file and create the underlying database object
+    """
+    db = None
+    async_db = None
+    query_cache = None
+    logger = None
+
+    def get_query_parameters(self, params=None):
+        """
+        Every query is bound with the username and the database name of the connection, along with the given
+        parameters
+        """
+        query_params = {USERNAME: self.username, DATABASE_NAME: self.database}
+        if params:
+            query_params.update(params)
+
+        return query_params
+
+    def execute_query(self, query, params=None, use_cache=True):
+        params = self.get_query_parameters(params)
+        use_cache = use_cache and self.query_cache is not None
+        if use_cache:
+            records = self.query_cache.get(self, query, params)
+            if records is not None:
+                return records
+
+        try:
+            records = self.db.execute_query(query, params)
+        except Exception as e:
+            self.logger.error(f"An unexpected error occurred when trying to run the query: {e}")
+            self.logger.error("Exiting program.")
+            exit(1)
+
+        if use_cache:
+            self.query_cache.put(self, query, params, records)
+        return records
+
+    def execute_query_stream(self, query, batch_size=None, params=None):
+        """
+        Yields the result of the query in batches instead of materializing all rows at once
+        """
+        params = self.get_query_parameters(params)
+        if self.query_cache is not None:
+            yield from self.execute_cached_query_stream(query, batch_size, params)
+            return
+
+        try:
+            yield from self.db.execute_query_stream(query, batch_size, params)
+        except Exception as e:
+            self.logger.error(f"An unexpected error occurred when trying to run the query: {e}")
+            self.logger.error("Exiting program.")
+            exit(1)
+
+    def execute_cached_query_stream(self, query, batch_size, params):
+        """
+        Same as execute_query_stream when the query cache is enabled. Each batch is written to the cache while it is
+        streamed, and a cached result is read back one batch at a time, so that the rows are never all in memory
+        """
+        batch_size = int(batch_size or self.db.chunk_size)
+        cached = self.query_cache.get_stream(self, query, params, batch_size)
+        if cached is not None:
+            columns, batches = cached
+            row_class = namedtuple('Row', columns, rename=True)
+            for batch in batches:
+                yield [row_class._make(row) for row in batch]
+            return
+
+        try:
+            yield from self.query_cache.put_stream(self, query, params,
+                                                   self.db.execute_query_stream(query, batch_size, params))
+        except Exception as e:
+            self.logger.error(f"An unexpected error occurred when trying to run the query: {e}")
+            self.logger.error("Exiting program.")
+            exit(1)
+
+    def execute_query_frame(self, query, params=None):
+        """
+        Returns the result of the query as a pandas dataframe, for analysing the data
+        """
+        try:
+            return self.db.execute_query_frame(query, self.get_query_parameters(params))
+        except Exception as e:
+            self.logger.error(f"An unexpected error occurred when trying to run the query: {e}")
+            self.logger.error("Exiting program.")
+            exit(1)
+
+    def execute_scalar(self, query, timeout=None):
+        """
+        Runs a query which returns a single value. The result is never cached and errors are raised to the caller
+        """
+        return self.db.execute_scalar(query, timeout)
+
+    def execute_rows(self, query, timeout=None):
+        """
+        Runs a query without bound parameters. The result is never cached and errors are raised to the caller
+        """
+        return self.db.execute_rows(query, timeout)
+
+    def quote_table(self, schema_name, table_name):
+        return self.db.quote_table(schema_name, table_name)
+
+    def quote_identifier(self, name):
+        return self.db.quote_identifier(name)
+
+    def get_async_database(self):
+        """
+        Creates the asyncio counterpart of the database the first time it is needed
+        """
+        if self.async_db is None:
+            self.async_db = create_async_database(self.db_type, self.host, self.port, self.database, self.username,
+                                                  self.password, self.db)
+        return self.async_db
+
+    async def execute_query_async(self, query, params=None, use_cache=True):
+        params = self.get_query_parameters(params)
+        use_cache = use_cache and self.query_cache is not None
+        if use_cache:
+            records = self.query_cache.get(self, query, params)
+            if records is not None:
+                return records
+
+        try:
+            records = await self.get_async_database().execute_query(query, params)
+        except Exception as e:
+            self.logger.error(f"An unexpected error occurred when trying to run the query: {e}")
+            self.logger.error("Exiting program.")
+            exit(1)
 
+        if use_cache:
+            self.query_cache.put(self, query, params, records)
+        return records
 
-class SourceDatabase:
+    def close(self):
+        """
+        Releases the pooled connections once the validation run is complete
+        """
+        self.db.close()
+
+    async def close_async(self):
+        if self.async_db is not None:
+            await self.async_db.close()
+
+
+class SourceDatabase(ConfiguredDatabase):
     database = None
 
-    def __init__(self) -> None:
+    def __init__(self, source_secret) -> None:
+        """
+        :param source_secret: Dictionary with the connection details of the secret of SOURCE_SECRET_ID
+        """
         self.logger = get_logger(__name__)
 
         category = SECTION_SOURCE
 
-        source_secret = CommonUtility.get_secret(secret_name=CommonUtility.read_configurations(SOURCE_SECRET_ID,
-                                                                                               CONFIG_FILE,
-                                                                                               section_name=category))
         schema_valid = CommonUtility.verify_secret_schema(source_secret)
 
         if schema_valid:
@@ -50,23 +194,17 @@ class SourceDatabase:
         self.password = source_secret.get(PASSWORD)
 
         self.db = create_database(self.db_type, self.host, self.port, self.database, self.username, self.password)
+        self.query_cache = get_query_cache()
 
-    def execute_query(self, query):
-        try:
-            return self.db.execute_query(text(query))
-        except Exception as e:
-            self.logger.error(f"An unexpected error occurred when trying to run the query: {e}")
-            self.logger.error("Exiting program.")
-            exit(1)
 
-
-class TargetDatabase:
-    def __init__(self) -> None:
+class TargetDatabase(ConfiguredDatabase):
+    def __init__(self, target_secret) -> None:
+        """
+        :param target_secret: Dictionary with the connection details of the secret of TARGET_SECRET_ID
+        """
         self.logger = get_logger(__name__)
 
         category = SECTION_TARGET
-        target_secret = CommonUtility.get_secret(CommonUtility.read_configurations(TARGET_SECRET_ID, CONFIG_FILE,
-                                                                                   section_name=category))
         CommonUtility.verify_secret_schema(target_secret)
         self.db_type = CommonUtility.read_configurations(TARGET_DATABASE_TYPE, CONFIG_FILE,
                                                          section_name=category)
@@ -77,15 +215,97 @@ class TargetDatabase:
         self.password = target_secret.get(PASSWORD)
 
         self.db = create_database(self.db_type, self.host, self.port, self.database, self.username, self.password)
+        self.query_cache = get_query_cache()
 
-    def execute_query(self, query):
-        try:
-            return self.db.execute_query(text(query))
-        except Exception as e:
-            self.logger.error(f"An unexpected error occurred when trying to run the query: {e}")
-            self.logger.error("Exiting program.")
-            exit(1)
+
+def create_databases():
+    """
+    Reads the secrets of the source and the target at the same time, whether they are cached or not, and creates
+    both databases
+    :return: Tuple with the SourceDatabase and the TargetDatabase objects
+    """
+    source_secret_id = CommonUtility.read_configurations(SOURCE_SECRET_ID, CONFIG_FILE, section_name=SECTION_SOURCE)
+    target_secret_id = CommonUtility.read_configurations(TARGET_SECRET_ID, CONFIG_FILE, section_name=SECTION_TARGET)
+    secrets = CommonUtility.get_secrets([source_secret_id, target_secret_id])
+    return SourceDatabase(secrets[source_secret_id]), TargetDatabase(secrets[target_secret_id])
+
+
+def get_engine_options():
+    """
+    Reads the connection pool settings from the configuration file. Settings which are not configured fall back to
+    the SQLAlchemy defaults
+    """
+    options = {}
+
+    pool_size = CommonUtility.read_configurations(POOL_SIZE, CONFIG_FILE, SECTION_CONNECTION_POOL)
+    if pool_size:
+        options['pool_size'] = int(pool_size)
+
+    max_overflow = CommonUtility.read_configurations(POOL_MAX_OVERFLOW, CONFIG_FILE, SECTION_CONNECTION_POOL)
+    if max_overflow:
+        options['max_overflow'] = int(max_overflow)
+
+    pre_ping = CommonUtility.read_boolean_configuration(POOL_PRE_PING, CONFIG_FILE, SECTION_CONNECTION_POOL,
+                                                        default=None)
+    if pre_ping is not None:
+        options['pool_pre_ping'] = pre_ping
+
+    recycle = CommonUtility.read_configurations(POOL_RECYCLE, CONFIG_FILE, SECTION_CONNECTION_POOL)
+    if recycle:
+        options['pool_recycle'] = int(recycle)
+
+    return options
+
+
+@lru_cache(maxsize=None)
+def get_query_cache():
+    """
+    Creates the query cache shared by the source and the target database, if it is enabled in the configuration
+    file. The time to live of the entries is configured in seconds
+    :return: QueryCache object, or None if the cache is disabled
+    """
+    if not CommonUtility.read_boolean_configuration(QUERY_CACHE_ENABLED, CONFIG_FILE, SECTION_QUERY_CACHE):
+        return None
+
+    ttl = int(CommonUtility.read_configurations(QUERY_CACHE_TTL, CONFIG_FILE, SECTION_QUERY_CACHE) or 3600)
+    path = os.path.join(CommonUtility.get_project_root(), OUTPUT_DIR, QUERY_CACHE_FILE)
+    return QueryCache(path, ttl)
+
+
+def get_configured_dialect(database_type):
+    """
+    :return: Dialect of the database type of the configuration file. The program exits if the type is unknown
+    """
+    dialect = get_dialect(database_type)
+    if dialect is None:
+        logger = get_logger(__name__)
+        logger.error(f"Unsupported database type: {database_type}. Install the package of its dialect, or use one "
+                     f"of {', '.join([MSSQL, MYSQL, ORACLE, POSTGRES])}")
+        logger.error("Exiting program.")
+        exit(1)
+
+    return dialect
 
 
 def create_database(database_type, host, port, database_name, username, password):
-    return DB_TYPE_MAPPING[database_type.lower()](host, port, database_name, username, password)
+    database_class = get_configured_dialect(database_type).get_database_class()
+    database = database_class(host, port, database_name, username, password, **get_engine_options())
+
+    chunk_size = CommonUtility.read_configurations(CHUNK_SIZE, CONFIG_FILE, SECTION_EXTRACTION)
+    if chunk_size:
+        database.chunk_size = int(chunk_size)
+
+    return database
+
+
+def create_async_database(database_type, host, port, database_name, username, password, database):
+    """
+    Creates the asyncio database for the database type. Types without an asyncio driver wrap the blocking database
+    """
+    async_database_class = get_configured_dialect(database_type).get_async_database_class()
+    if async_database_class is not None:
+        return async_database_class(host, port, database_name, username, password, **get_engine_options())
+
+    # Imported here so that the asyncio dependencies are only needed when the asyncio engine is used
+    from database.async_database_types import AsyncDatabaseThreaded
+    return AsyncDatabaseThreaded(database)
@@ -10,12 +10,36 @@ from database import MSSQL, POSTGRES, MYSQL, ORACLE
 #     }
 # Based on the database types defined in the configuration file/environment variables,
 # these queries will automatically be chosen
+#
+# The object queries (GET_TABLES to GET_SEQUENCES) filter on a list of schemas using "IN :schema_names", so that
+# the objects of several schemas can be fetched in a single round trip. Every row returns the schema_name
+# along with the object name, which is used to bucket the rows per schema.
+#
+# Values are never formatted into the queries. They are passed as bound parameters instead, so that the database
+# can reuse the execution plan of a query across schemas and runs. Every query can refer to these parameters:
+#     :username       - Username of the connection, which is the schema for Oracle
+#     :database_name  - Name of the database of the connection
+#     :schema_names   - List of schema names, only bound for the object queries
+#
+# Identifiers cannot be bound, so the table of GET_EXACT_ROW_COUNT is formatted into the query as {table}. The schema
+# and table names are quoted by the dialect of the database before they are formatted, using the schema_identifier
+# and table_identifier columns of GET_TABLE_ROW_COUNTS, which keep the case of the names. GET_SAMPLED_ROW_COUNT
+# also has the sample size formatted into it as {percent}, which is a number read from the configuration file.
+# GET_PARTITION_ROW_COUNT has the quoted columns of a row of GET_PARTITIONED_INDEX formatted into it: {partition},
+# {partition_table} for the partition qualified with its schema, {partition_function}, {partition_column} and the
+# {partition_number}.
+# GET_KEY_RANGE and GET_CHUNK_CHECKSUMS have the quoted table and {key} column formatted into them, along with the {row}
+# text built from CHECKSUM_ROW_TEXT and the integer bounds of the chunks. The decimal texts of CHECKSUM_COLUMN_TEXT have
+# the integer {scale} of the column formatted into them, along with Oracle's {integer_digits} and {fraction_digits}.
+# GET_SAMPLE_ROWS has the quoted {columns}, the quoted table and {key} column and the comma separated integer {keys} of
+# the sampled rows formatted into it.
 
 
 GET_TABLE_ROW_COUNTS = {
     MSSQL: """
         SELECT lower(SCHEMA_NAME(sOBJ.schema_id)) as schema_name , lower(sOBJ.name) AS [table_name]
         , SUM(sPTN.Rows) AS [row_count]
+        , SCHEMA_NAME(sOBJ.schema_id) AS [schema_identifier], sOBJ.name AS [table_identifier]
         FROM
         sys.objects AS sOBJ
         INNER JOIN sys.partitions AS sPTN
@@ -31,7 +55,8 @@ GET_TABLE_ROW_COUNTS = {
         """,
     POSTGRES: """
         SELECT
-        lower(nspname) AS schema_name, lower(relname) as table_name, reltuples::bigint as row_count
+        lower(nspname) AS schema_name, lower(relname) as table_name, reltuples::bigint as row_count,
+        nspname AS schema_identifier, relname AS table_identifier
         FROM pg_class C
         LEFT JOIN pg_namespace N ON (N.oid = C.relnamespace)
         WHERE
@@ -40,18 +65,48 @@ GET_TABLE_ROW_COUNTS = {
         ORDER BY 1 ,2  asc;
         """,
     ORACLE: """
-        select lower(owner) as schema_name, lower(table_name) as table_name, nvl(num_rows,-1)  as row_count
-        from all_tables WHERE lower(owner) = lower('{0}')
+        select lower(owner) as schema_name, lower(table_name) as table_name, nvl(num_rows,-1)  as row_count,
+        owner as schema_identifier, table_name as table_identifier
+        from all_tables WHERE lower(owner) = lower(:username)
         ORDER BY 1
         """,
     MYSQL: """
-        SELECT lower(TABLE_SCHEMA) as schema_name, lower(table_name) as table_name, table_rows as row_count
+        SELECT lower(TABLE_SCHEMA) as schema_name, lower(table_name) as table_name, table_rows as row_count,
+        TABLE_SCHEMA as schema_identifier, table_name as table_identifier
         FROM INFORMATION_SCHEMA.TABLES
-        WHERE lower(TABLE_SCHEMA) = lower('{0}')
+        WHERE lower(TABLE_SCHEMA) = lower(:database_name)
         order by 1,2, 3;
         """
 }
 
+GET_EXACT_ROW_COUNT = {
+    MSSQL: """
+        SELECT COUNT_BIG(*) AS row_count FROM {table}
+        """,
+    POSTGRES: """
+        SELECT count(*) AS row_count FROM {table}
+        """,
+    ORACLE: """
+        SELECT COUNT(*) AS row_count FROM {table}
+        """,
+    MYSQL: """
+        SELECT COUNT(*) AS row_count FROM {table}
+        """
+}
+
+# Estimates the number of rows from a sample of the blocks of the table. MySQL has no sampling clause
+GET_SAMPLED_ROW_COUNT = {
+    MSSQL: """
+        SELECT COUNT_BIG(*) * 100.0 / {percent} AS row_count FROM {table} TABLESAMPLE ({percent} PERCENT)
+        """,
+    POSTGRES: """
+        SELECT count(*) * 100.0 / {percent} AS row_count FROM {table} TABLESAMPLE SYSTEM ({percent})
+        """,
+    ORACLE: """
+        SELECT COUNT(*) * 100 / {percent} AS row_count FROM {table} SAMPLE BLOCK ({percent})
+        """
+}
+
 GET_VERSION = {
     MSSQL: """
         SELECT @@version as version
@@ -74,12 +129,12 @@ GET_DB_SIZE = {
             sys.master_files
         WHERE 
             type = 0 -- 0 = Data files
-            AND DB_NAME(database_id) = '{0}'
+            AND DB_NAME(database_id) = :database_name
         GROUP BY 
             database_id;
     """,
     POSTGRES: """
-        SELECT pg_size_pretty(pg_database_size('{0}')) as database_size
+        SELECT pg_size_pretty(pg_database_size(:database_name)) as database_size
     """,
     MYSQL: """
         SELECT  
@@ -92,7 +147,7 @@ GET_DB_SIZE = {
 
 GET_ENCODING = {
     MSSQL: """
-        SELECT CONVERT(sysname, DATABASEPROPERTYEX('{0}', 'Collation')) AS encoding;
+        SELECT CONVERT(sysname, DATABASEPROPERTYEX(:database_name, 'Collation')) AS encoding;
     """,
     POSTGRES: """
         SELECT 'Encoding = '||pg_encoding_to_char(encoding)||', Collation = '||datcollate "encoding" FROM pg_database WHERE datname = current_database();    
@@ -123,11 +178,11 @@ GET_SCHEMAS = {
     ORACLE: """
         SELECT lower(username) as schema_name
         FROM sys.dba_users
-        where lower(username)= lower('{0}') 
+        where lower(username)= lower(:username) 
         union 
         SELECT  lower(object_name)
         FROM dba_objects
-        WHERE lower(owner)=lower('{0}')
+        WHERE lower(owner)=lower(:username)
         and object_type in ('PACKAGE')  
         """,
     MYSQL: """
@@ -144,7 +199,7 @@ GET_TABLES = {
                    lower(table_name) AS table_name
             FROM   information_schema.tables
             WHERE  table_type = 'BASE TABLE'
-            AND lower(table_schema)  = lower('{0}')
+            AND lower(table_schema) IN :schema_names
             AND      lower(table_schema) NOT IN ('information_schema', 'pg_catalog', 'public','aws_sqlserver_ext')
             ORDER  BY table_schema,table_name; 
         """,
@@ -154,7 +209,7 @@ GET_TABLES = {
               lower(table_name) AS table_name
             FROM     information_schema.tables
             WHERE    table_type ='BASE TABLE'
-            AND      lower(table_schema)  = lower('{0}')
+            AND      lower(table_schema) IN :schema_names
             AND      lower(table_schema) NOT IN ('information_schema', 'pg_catalog', 'public','aws_sqlserver_ext', 
             'aws_sqlserver_ext_data')
             ORDER BY table_name;
@@ -168,7 +223,7 @@ GET_TABLES = {
             and (OBJECT_name not in (select mview_name from dba_mviews where object_type='TABLE'))
             and TEMPORARY!='Y'
             and object_type in ('TABLE')
-            AND lower(owner) = lower('{0}')
+            AND lower(owner) IN :schema_names
             ORDER BY 1,2
             """,
     MYSQL: """
@@ -176,7 +231,7 @@ GET_TABLES = {
             lower(table_name) as table_name
             from information_schema.tables
             where table_type = 'BASE TABLE'
-            and lower(table_schema) = lower('{0}')
+            and lower(table_schema) IN :schema_names
             order by 1,2; 
             """
 }
@@ -187,7 +242,7 @@ GET_VIEWS = {
        lower(table_name) AS view_name
         FROM   information_schema.TABLES
         WHERE  table_type = 'VIEW'
-               and  lower(table_schema) = lower('{0}')
+               and  lower(table_schema) IN :schema_names
          ORDER  BY table_name;
         """,
 
@@ -196,7 +251,7 @@ GET_VIEWS = {
         lower(table_name)  AS view_name
         FROM   information_schema.TABLES
         WHERE  table_type = 'VIEW'
-               and lower(table_schema) = lower('{0}')
+               and lower(table_schema) IN :schema_names
          ORDER  BY table_name; 
         """,
 
@@ -205,14 +260,14 @@ GET_VIEWS = {
         from dba_objects
         WHERE TEMPORARY!='Y'
         and object_type in ('MATERIALIZED_VIEW', 'VIEW')
-        AND lower(owner) = lower('{0}')
+        AND lower(owner) IN :schema_names
         ORDER BY 1,2
         """
     ,
     MYSQL: """
-        SELECT lower(TABLE_SCHEMA) as schema_name, lower(table_name)
+        SELECT lower(TABLE_SCHEMA) as schema_name, lower(table_name) as view_name
         FROM INFORMATION_SCHEMA.VIEWS
-        WHERE lower(TABLE_SCHEMA) = lower('{0}')
+        WHERE lower(TABLE_SCHEMA) IN :schema_names
         ORDER BY 1,2; 
         """
 }
@@ -223,7 +278,7 @@ GET_PROCEDURES = {
         name   AS procedure_name
         FROM   sys.objects
         WHERE  TYPE = 'P'
-        and lower(Schema_name(schema_id)) =lower('{0}')
+        and lower(Schema_name(schema_id)) IN :schema_names
         ORDER  BY name;
         """,
     POSTGRES: """
@@ -233,7 +288,7 @@ GET_PROCEDURES = {
                join pg_namespace n
                ON p.pronamespace = n.oid
         WHERE  p.prokind = 'p'
-        and lower(n.nspname) = lower('{0}')
+        and lower(n.nspname) IN :schema_names
         ORDER  BY p.proname; 
         """,
     ORACLE: """
@@ -241,13 +296,13 @@ GET_PROCEDURES = {
         from dba_objects
         WHERE TEMPORARY!='Y'
         and object_type in ('PROCEDURE')
-        AND lower(owner) = lower('{0}')
+        AND lower(owner) IN :schema_names
         ORDER BY 1,2
         """,
     MYSQL: """
         SELECT lower(ROUTINE_SCHEMA) as schema_name, lower(ROUTINE_NAME) procedure_name
         FROM INFORMATION_SCHEMA.ROUTINES
-        WHERE lower(ROUTINE_SCHEMA) = lower('{0}')
+        WHERE lower(ROUTINE_SCHEMA) IN :schema_names
         AND ROUTINE_TYPE = 'PROCEDURE'
         ORDER BY 1,2;
         """
@@ -258,7 +313,7 @@ GET_FUNCTIONS = {
             SELECT lower(Schema_name(schema_id)) AS schema_name,
                    lower(name)                   AS function_name
             FROM   sys.objects
-            WHERE  TYPE in( 'FN' ,'TF')  and lower(Schema_name(schema_id)) = lower('{0}')
+            WHERE  TYPE in( 'FN' ,'TF')  and lower(Schema_name(schema_id)) IN :schema_names
             ORDER  BY Schema_name(schema_id), name; 
         """,
     POSTGRES: """
@@ -267,20 +322,20 @@ GET_FUNCTIONS = {
         FROM   pg_proc p
                join pg_namespace n
                  ON p.pronamespace = n.oid
-        WHERE p.prokind = 'f' and lower(n.nspname) = lower('{0}') order by p.proname; 
+        WHERE p.prokind = 'f' and lower(n.nspname) IN :schema_names order by p.proname; 
         """,
     ORACLE: """
         select lower(owner) schema_name, lower(OBJECT_name) function_name
         from dba_objects
         WHERE TEMPORARY!='Y'
         and object_type in ('FUNCTION')
-        AND lower(owner) = lower('{0}')
+        AND lower(owner) IN :schema_names
         ORDER BY 1,2
         """,
     MYSQL: """
         SELECT lower(ROUTINE_SCHEMA) as schema_name, lower(ROUTINE_NAME) function_name
         FROM INFORMATION_SCHEMA.ROUTINES
-        WHERE lower(ROUTINE_SCHEMA) = lower('{0}')
+        WHERE lower(ROUTINE_SCHEMA) IN :schema_names
         AND ROUTINE_TYPE = 'FUNCTION'
         ORDER BY 1,2;
         """
@@ -298,14 +353,14 @@ GET_INDEXES = {
                        ON o.schema_id = sc.schema_id
         WHERE  i.name IS NOT NULL
                AND o.TYPE = 'U'
-               and lower(sc.name) = lower('{0}') 
+               and lower(sc.name) IN :schema_names 
         ORDER  BY sc.name,i.name,
                   i.type_desc
         """,
     POSTGRES: """
         SELECT lower(schemaname) as schema_name, lower(indexname) as index_name
         FROM   pg_indexes
-        WHERE    lower(schemaname) = lower('{0}')
+        WHERE    lower(schemaname) IN :schema_names
         ORDER  BY indexname; 
         """,
     ORACLE: """
@@ -313,13 +368,13 @@ GET_INDEXES = {
         from dba_indexes
         where index_type!='LOB'
         and index_name not like 'I_SNAP$%'
-        AND lower(owner) = lower('{0}')
+        AND lower(owner) IN :schema_names
         ORDER BY schema_name, index_name
         """,
     MYSQL: """
          SELECT lower(TABLE_SCHEMA) as schema_name, concat(lower(INDEX_NAME),'_',COLUMN_NAME) as index_name
         FROM INFORMATION_SCHEMA.STATISTICS
-        WHERE lower(TABLE_SCHEMA) = lower('{0}')
+        WHERE lower(TABLE_SCHEMA) IN :schema_names
         ORDER BY 1,2; """
 }
 
@@ -329,27 +384,27 @@ GET_TRIGGERS = {
         name            AS trigger_name
         FROM   sys.objects
         WHERE  TYPE = 'TR'
-        and Schema_name(schema_id)  = lower('{0}')
+        and lower(Schema_name(schema_id)) IN :schema_names
         ORDER  BY name; 
         """,
     POSTGRES: """
         SELECT lower(trigger_schema)      AS schema_name,
         lower(trigger_name)  AS trigger_name
         FROM   information_schema.TRIGGERS
-        WHERE lower(trigger_schema) =lower('{0}')
+        WHERE lower(trigger_schema) IN :schema_names
         ORDER  BY trigger_name;
         """,
     ORACLE: """
         Select lower(owner) schema_name ,lower(object_name) trigger_name
         from dba_objects
         where object_type='TRIGGER'
-        AND lower(owner) = lower('{0}')
+        AND lower(owner) IN :schema_names
         ORDER BY schema_name, object_name
         """,
     MYSQL: """
        SELECT lower(TRIGGER_SCHEMA) as schema_name, lower(TRIGGER_NAME) as trigger_name
         FROM INFORMATION_SCHEMA.TRIGGERS
-        WHERE lower(TRIGGER_SCHEMA) = lower('{0}') 
+        WHERE lower(TRIGGER_SCHEMA) IN :schema_names 
         ORDER BY 1,2; """
 }
 
@@ -363,7 +418,7 @@ GET_CONSTRAINTS = {
                                 AS constraint_type
             FROM   sys.objects
             WHERE  TYPE  IN  ('PK','F','UQ','C','D')
-            and lower(Schema_name(schema_id)) = lower('{0}')
+            and lower(Schema_name(schema_id)) IN :schema_names
             ORDER  BY  name,TYPE ;
         """,
     POSTGRES: """
@@ -378,7 +433,7 @@ GET_CONSTRAINTS = {
                  ON n.oid = c.connamespace
         WHERE  contype IN ( 'p','f','u','c' )
                AND conrelid :: regclass :: VARCHAR <> '-'
-                               and lower(n.nspname)  = lower('{0}')
+                               and lower(n.nspname) IN :schema_names
                AND lower(n.nspname) NOT IN ( 'aws_sqlserver_ext', 
         'aws_sqlserver_ext_data',  'pg_catalog' ) 
         union 
@@ -389,7 +444,7 @@ GET_CONSTRAINTS = {
                        AND col.table_schema NOT IN (
                            'aws_sqlserver_ext', 'aws_sqlserver_ext_data',
                            'pg_catalog' )
-                           and lower(col.table_schema) = lower('{0}') )
+                           and lower(col.table_schema) IN :schema_names )
                            select * from cte_final
                 ORDER  BY schema_name,constraint_name,constraint_type  
 
@@ -399,14 +454,14 @@ GET_CONSTRAINTS = {
         from dba_constraints cs
         where cs.CONSTRAINT_TYPE IN ('C')
         and upper(cs.search_condition_vc) not like '%IS NOT NULL'
-        AND lower(owner) = lower('{0}')
+        AND lower(owner) IN :schema_names
         ORDER BY 1
     """,
     MYSQL: """
             SELECT   lower(CONSTRAINT_SCHEMA) schema_name, concat(lower(CONSTRAINT_NAME),'_',TABLE_NAME) constraint_name  
             FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS 
             WHERE CONSTRAINT_TYPE in ( 'PRIMARY KEY','FOREIGN KEY','CHECK','UNIQUE' ) 
-            AND lower(CONSTRAINT_SCHEMA) = lower('{0}')  
+            AND lower(CONSTRAINT_SCHEMA) IN :schema_names  
             ORDER BY 1,2; """
 }
 
@@ -415,51 +470,103 @@ GET_SEQUENCES = {
         SELECT lower(Schema_name(schema_id)) AS schema_name,
         NAME            AS sequence_name
         FROM   sys.sequences
-        where   lower(Schema_name( schema_id)) = lower('{0}')
+        where   lower(Schema_name( schema_id)) IN :schema_names
         ORDER  BY NAME; 
         """,
     POSTGRES: """            
         SELECT relnamespace::regnamespace::text as schema_name,c.relname as sequence_name
         FROM pg_class c WHERE c.relkind = 'S'
-        and lower(relnamespace::regnamespace::text) =lower('{0}')
+        and lower(relnamespace::regnamespace::text) IN :schema_names
         order by sequence_name;
         """,
     ORACLE: """
         select lower(sequence_owner) schema_name , lower(sequence_name) sequence_name
         from dba_sequences
-        WHERE lower(sequence_owner) = lower('{0}')
+        WHERE lower(sequence_owner) IN :schema_names
         ORDER BY 1,2
         """,
     MYSQL: """
         SELECT  lower(table_schema) schema_name,  concat(lower(extra),'_',column_name) sequence_name 
         from information_schema.columns
         where extra like '%auto_increment%'
-        and lower(table_schema) = lower('{0}')
+        and lower(table_schema) IN :schema_names
         ORDER BY 1; 
         """
 }
 
 
+# One row per partition of the partitioned tables, numbered by position so that the partitions of both databases can
+# be matched. MSSQL partitions have no name and are counted through the partition function of the heap or clustered
+# index. PostgreSQL partitions are the leaf tables of the partition tree, numbered in the order they were created.
 GET_PARTITIONED_INDEX = {
     MSSQL: """
-            SELECT SCHEMA_NAME(o.schema_id) AS schema_name  
-              ,OBJECT_NAME(p.object_id) AS table_name  
-              ,i.name AS index_name  
-              ,p.partition_number  
-              ,rows   
-              FROM sys.partitions AS p  
-              INNER JOIN sys.indexes AS i ON p.object_id = i.object_id AND p.index_id = i.index_id  
-              INNER JOIN sys.partition_schemes ps ON i.data_space_id=ps.data_space_id  
-              INNER JOIN sys.objects AS o ON o.object_id = i.object_id  
-              ORDER BY index_name, partition_number;
-           """,
+        SELECT lower(SCHEMA_NAME(o.schema_id)) AS schema_name, lower(o.name) AS table_name
+        , p.partition_number AS partition_number, p.rows AS row_count
+        , SCHEMA_NAME(o.schema_id) AS schema_identifier, o.name AS table_identifier
+        , SCHEMA_NAME(o.schema_id) AS partition_schema, NULL AS partition_identifier
+        , pf.name AS partition_function, c.name AS partition_column
+        FROM sys.partitions AS p
+        INNER JOIN sys.indexes AS i ON p.object_id = i.object_id AND p.index_id = i.index_id
+        INNER JOIN sys.partition_schemes AS ps ON i.data_space_id = ps.data_space_id
+        INNER JOIN sys.partition_functions AS pf ON ps.function_id = pf.function_id
+        INNER JOIN sys.index_columns AS ic
+        ON ic.object_id = i.object_id AND ic.index_id = i.index_id AND ic.partition_ordinal = 1
+        INNER JOIN sys.columns AS c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+        INNER JOIN sys.objects AS o ON o.object_id = i.object_id
+        WHERE o.type = 'U' AND o.is_ms_shipped = 0x0
+        AND i.index_id < 2 -- 0:Heap, 1:Clustered
+        ORDER BY 1, 2, 3
+        """,
+    POSTGRES: """
+        SELECT lower(rn.nspname) AS schema_name, lower(r.relname) AS table_name
+        , row_number() OVER (PARTITION BY r.oid ORDER BY c.oid) AS partition_number, c.reltuples::bigint AS row_count
+        , rn.nspname AS schema_identifier, r.relname AS table_identifier
+        , n.nspname AS partition_schema, c.relname AS partition_identifier
+        , NULL AS partition_function, NULL AS partition_column
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_class r ON r.oid = pg_partition_root(c.oid)
+        JOIN pg_namespace rn ON rn.oid = r.relnamespace
+        WHERE c.relispartition AND c.relkind = 'r'
+        AND lower(rn.nspname) NOT IN ('public','information_schema','pg_catalog','aws_sqlserver_ext')
+        ORDER BY 1, 2, 3
+        """,
+    ORACLE: """
+        SELECT lower(table_owner) AS schema_name, lower(table_name) AS table_name
+        , partition_position AS partition_number, nvl(num_rows,-1) AS row_count
+        , table_owner AS schema_identifier, table_name AS table_identifier
+        , table_owner AS partition_schema, partition_name AS partition_identifier
+        , NULL AS partition_function, NULL AS partition_column
+        FROM all_tab_partitions
+        WHERE lower(table_owner) = lower(:username)
+        ORDER BY 1, 2, 3
+        """,
+    MYSQL: """
+        SELECT lower(table_schema) AS schema_name, lower(table_name) AS table_name
+        , partition_ordinal_position AS partition_number, SUM(table_rows) AS row_count
+        , table_schema AS schema_identifier, table_name AS table_identifier
+        , table_schema AS partition_schema, partition_name AS partition_identifier
+        , NULL AS partition_function, NULL AS partition_column
+        FROM information_schema.partitions
+        WHERE partition_name IS NOT NULL AND lower(table_schema) = lower(:database_name)
+        GROUP BY table_schema, table_name, partition_ordinal_position, partition_name
+        ORDER BY 1, 2, 3
+        """
+}
+
+GET_PARTITION_ROW_COUNT = {
+    MSSQL: """
+        SELECT COUNT_BIG(*) AS row_count FROM {table}
+        WHERE $PARTITION.{partition_function}({partition_column}) = {partition_number}
+        """,
     POSTGRES: """
-        select n.nspname  as schemaname  ,t.relname as tablename,  i.relname as indexname,  idx.indisprimary
-              from pg_class i
-              join pg_index idx on idx.indexrelid = i.oid
-              join pg_class t on t.oid = idx.indrelid
-              join pg_catalog.pg_namespace n on i.relnamespace= n."oid"
-              where i.relkind = 'I';
+        SELECT count(*) AS row_count FROM ONLY {partition_table}
+        """,
+    ORACLE: """
+        SELECT COUNT(*) AS row_count FROM {table} PARTITION ({partition})
+        """,
+    MYSQL: """
+        SELECT COUNT(*) AS row_count FROM {table} PARTITION ({partition})
         """
 }
 
@@ -485,7 +592,7 @@ GET_DATATYPE_COUNTS = {
     ORACLE: """
         SELECT  data_type ,COUNT(DATA_TYPE) count
         FROM dba_tab_columns
-        WHERE lower(OWNER) = lower('{0}')
+        WHERE lower(OWNER) = lower(:username)
         and table_name not in (select dba_objects.OBJECT_NAME from dba_objects where object_type = 'VIEW' AND dba_objects.owner = UPPER('crm_owner'))
         GROUP BY DATA_TYPE
         ORDER BY 1,2
@@ -493,7 +600,7 @@ GET_DATATYPE_COUNTS = {
     MYSQL: """
         SELECT distinct DATA_TYPE data_type, count(data_type) count 
         from INFORMATION_SCHEMA. COLUMNS  
-        where lower(table_schema) = lower('{0}')
+        where lower(table_schema) = lower(:database_name)
         group by data_type
         order by 1 """
 }
@@ -529,6 +636,331 @@ GET_DATATYPES = {
         """,
     MYSQL: """
         SELECT  table_schema as schema_name,table_name, column_name,DATA_TYPE  
-        from INFORMATION_SCHEMA. COLUMNS  where lower(table_schema) = lower('{0}')
+        from INFORMATION_SCHEMA. COLUMNS  where lower(table_schema) = lower(:database_name)
         order by 1,2,3,4 ; """
 }
+
+# Fingerprint of the DDL of each schema, used by the incremental mode to find the schemas which changed since the
+# previous run. Dropping an object does not leave a timestamp behind, so the number of objects is part of the marker.
+# MySQL changes the update time of a table with its data and keeps the creation time of a table when its indexes and
+# constraints change, so its marker is built from the creation times and a digest of the names of the objects, indexes
+# and constraints
+GET_SCHEMA_DDL_MARKERS = {
+    MSSQL: """
+        SELECT lower(Schema_name(schema_id)) AS schema_name,
+        CONVERT(varchar(33), MAX(modify_date), 126) + '_' + CAST(COUNT(*) AS varchar(20)) AS ddl_marker
+        FROM   sys.objects
+        WHERE  lower(Schema_name(schema_id)) IN :schema_names
+        GROUP  BY schema_id
+        """,
+    POSTGRES: """
+        SELECT lower(n.nspname) AS schema_name,
+        md5(coalesce((SELECT string_agg(c.oid::text || c.relname || c.relkind, ',' ORDER BY c.oid)
+                      FROM pg_class c WHERE c.relnamespace = n.oid), '')
+            || coalesce((SELECT string_agg(p.oid::text || p.proname, ',' ORDER BY p.oid)
+                         FROM pg_proc p WHERE p.pronamespace = n.oid), '')
+            || coalesce((SELECT string_agg(o.oid::text || o.conname, ',' ORDER BY o.oid)
+                         FROM pg_constraint o WHERE o.connamespace = n.oid), '')
+            || coalesce((SELECT string_agg(t.oid::text || t.tgname, ',' ORDER BY t.oid)
+                         FROM pg_trigger t JOIN pg_class c ON c.oid = t.tgrelid
+                         WHERE c.relnamespace = n.oid), '')) AS ddl_marker
+        FROM   pg_namespace n
+        WHERE  lower(n.nspname) IN :schema_names
+        """,
+    ORACLE: """
+        select lower(owner) schema_name,
+        to_char(max(last_ddl_time), 'YYYYMMDDHH24MISS') || '_' || count(*) ddl_marker
+        from dba_objects
+        WHERE lower(owner) IN :schema_names
+        GROUP BY owner
+        """,
+    MYSQL: """
+        SELECT schema_name, concat(coalesce(max(changed), ''), '_', sum(objects), '_', sum(digest)) as ddl_marker
+        FROM (
+            SELECT lower(table_schema) as schema_name, max(create_time) as changed, count(*) as objects,
+            sum(cast(conv(substring(md5(concat_ws(':', table_name, table_type)), 1, 14), 16, 10) AS unsigned))
+            as digest
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE lower(table_schema) IN :schema_names
+            GROUP BY table_schema
+            UNION ALL
+            SELECT lower(ROUTINE_SCHEMA), max(LAST_ALTERED), count(*),
+            sum(cast(conv(substring(md5(concat_ws(':', ROUTINE_NAME, ROUTINE_TYPE)), 1, 14), 16, 10) AS unsigned))
+            FROM INFORMATION_SCHEMA.ROUTINES
+            WHERE lower(ROUTINE_SCHEMA) IN :schema_names
+            GROUP BY ROUTINE_SCHEMA
+            UNION ALL
+            SELECT lower(TRIGGER_SCHEMA), max(CREATED), count(*),
+            sum(cast(conv(substring(md5(concat_ws(':', EVENT_OBJECT_TABLE, TRIGGER_NAME)), 1, 14), 16, 10)
+                AS unsigned))
+            FROM INFORMATION_SCHEMA.TRIGGERS
+            WHERE lower(TRIGGER_SCHEMA) IN :schema_names
+            GROUP BY TRIGGER_SCHEMA
+            UNION ALL
+            SELECT lower(CONSTRAINT_SCHEMA), NULL, count(*),
+            sum(cast(conv(substring(md5(concat_ws(':', TABLE_NAME, CONSTRAINT_NAME, CONSTRAINT_TYPE)), 1, 14), 16, 10)
+                AS unsigned))
+            FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS
+            WHERE lower(CONSTRAINT_SCHEMA) IN :schema_names
+            GROUP BY CONSTRAINT_SCHEMA
+            UNION ALL
+            SELECT lower(TABLE_SCHEMA), NULL, count(*),
+            sum(cast(conv(substring(md5(concat_ws(':', TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX, COLUMN_NAME)), 1, 14),
+                16, 10) AS unsigned))
+            FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE lower(TABLE_SCHEMA) IN :schema_names
+            GROUP BY TABLE_SCHEMA
+        ) markers
+        GROUP BY schema_name;
+        """
+}
+
+# Wraps an object query to return, per schema, the number of objects and an order independent digest of the object
+# names instead of the names themselves. The digest is the sum of the first 7 bytes of the MD5 hash of each lower
+# case name, which is computed the same way on every database type so that the digests of the source and the
+# target can be compared. {query} is the object query without its ORDER BY and {column} the object name column.
+# MSSQL hashes the UTF-8 bytes of the names like the other databases, through a UTF-8 collation which needs SQL Server
+# 2019, so that non-ASCII names have the same digests
+GET_OBJECT_DIGESTS = {
+    MSSQL: """
+        SELECT lower(objects.schema_name) AS schema_name, COUNT(*) AS object_count,
+        COUNT(DISTINCT lower(objects.{column})) AS distinct_count,
+        SUM(CAST(CAST(CAST(HASHBYTES('MD5', CAST(CAST(lower(objects.{column}) AS nvarchar(256))
+            COLLATE Latin1_General_100_BIN2_UTF8 AS varchar(1024))) AS binary(7)) AS bigint)
+            AS decimal(38, 0))) AS digest
+        FROM ({query}) objects
+        GROUP BY lower(objects.schema_name)
+        """,
+    POSTGRES: """
+        SELECT lower(objects.schema_name) AS schema_name, count(*) AS object_count,
+        count(DISTINCT lower(objects.{column})) AS distinct_count,
+        sum(('x' || substr(md5(lower(objects.{column})), 1, 14))::bit(56)::bigint) AS digest
+        FROM ({query}) objects
+        GROUP BY lower(objects.schema_name)
+        """,
+    ORACLE: """
+        select lower(objects.schema_name) schema_name, count(*) object_count,
+        count(DISTINCT lower(objects.{column})) distinct_count,
+        sum(to_number(substr(rawtohex(standard_hash(lower(objects.{column}), 'MD5')), 1, 14), 'XXXXXXXXXXXXXX')) digest
+        FROM ({query}) objects
+        GROUP BY lower(objects.schema_name)
+        """,
+    MYSQL: """
+        SELECT lower(objects.schema_name) AS schema_name, count(*) AS object_count,
+        count(DISTINCT lower(objects.{column})) AS distinct_count,
+        sum(cast(conv(substring(md5(lower(objects.{column})), 1, 14), 16, 10) AS unsigned)) AS digest
+        FROM ({query}) objects
+        GROUP BY lower(objects.schema_name)
+        """
+}
+
+# Columns of the user tables, for the checksums of the data validation. is_primary_key is 1 for the columns of the
+# primary key, and data_type is looked up in CHECKSUM_TYPE_FAMILIES once the length and precision are removed.
+# numeric_scale is the number of decimal digits of the numeric columns, or NULL if it is not fixed
+GET_CHECKSUM_COLUMNS = {
+    MSSQL: """
+        SELECT lower(s.name) AS schema_name, lower(t.name) AS table_name, lower(c.name) AS column_name
+        , s.name AS schema_identifier, t.name AS table_identifier, c.name AS column_identifier
+        , lower(TYPE_NAME(c.system_type_id)) AS data_type, c.scale AS numeric_scale
+        , CASE WHEN ic.column_id IS NULL THEN 0 ELSE 1 END AS is_primary_key
+        FROM sys.tables AS t
+        INNER JOIN sys.schemas AS s ON s.schema_id = t.schema_id
+        INNER JOIN sys.columns AS c ON c.object_id = t.object_id
+        LEFT JOIN sys.indexes AS i ON i.object_id = t.object_id AND i.is_primary_key = 1
+        LEFT JOIN sys.index_columns AS ic
+        ON ic.object_id = t.object_id AND ic.index_id = i.index_id AND ic.column_id = c.column_id
+        WHERE t.is_ms_shipped = 0
+        ORDER BY 1, 2, 3
+        """,
+    POSTGRES: """
+        SELECT lower(n.nspname) AS schema_name, lower(c.relname) AS table_name, lower(a.attname) AS column_name
+        , n.nspname AS schema_identifier, c.relname AS table_identifier, a.attname AS column_identifier
+        , lower(format_type(a.atttypid, NULL)) AS data_type
+        , CASE WHEN a.atttypid = 'numeric'::regtype AND a.atttypmod >= 4 THEN (a.atttypmod - 4) & 65535
+        END AS numeric_scale
+        , CASE WHEN a.attnum = ANY(k.conkey) THEN 1 ELSE 0 END AS is_primary_key
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+        LEFT JOIN pg_constraint k ON k.conrelid = c.oid AND k.contype = 'p'
+        WHERE c.relkind IN ('r', 'p') AND NOT c.relispartition
+        AND lower(n.nspname) NOT IN ('public','information_schema','pg_catalog','aws_sqlserver_ext')
+        ORDER BY 1, 2, 3
+        """,
+    ORACLE: """
+        SELECT lower(c.owner) AS schema_name, lower(c.table_name) AS table_name, lower(c.column_name) AS column_name
+        , c.owner AS schema_identifier, c.table_name AS table_identifier, c.column_name AS column_identifier
+        , lower(c.data_type) AS data_type, c.data_scale AS numeric_scale
+        , CASE WHEN kc.column_name IS NULL THEN 0 ELSE 1 END AS is_primary_key
+        FROM all_tab_columns c
+        JOIN all_tables t ON t.owner = c.owner AND t.table_name = c.table_name
+        LEFT JOIN all_constraints k ON k.owner = c.owner AND k.table_name = c.table_name AND k.constraint_type = 'P'
+        LEFT JOIN all_cons_columns kc
+        ON kc.owner = k.owner AND kc.constraint_name = k.constraint_name AND kc.column_name = c.column_name
+        WHERE lower(c.owner) = lower(:username)
+        ORDER BY 1, 2, 3
+        """,
+    MYSQL: """
+        SELECT lower(c.table_schema) AS schema_name, lower(c.table_name) AS table_name
+        , lower(c.column_name) AS column_name
+        , c.table_schema AS schema_identifier, c.table_name AS table_identifier, c.column_name AS column_identifier
+        , lower(c.data_type) AS data_type, c.numeric_scale AS numeric_scale
+        , CASE WHEN c.column_key = 'PRI' THEN 1 ELSE 0 END AS is_primary_key
+        FROM information_schema.columns c
+        JOIN information_schema.tables t
+        ON t.table_schema = c.table_schema AND t.table_name = c.table_name AND t.table_type = 'BASE TABLE'
+        WHERE lower(c.table_schema) = lower(:database_name)
+        ORDER BY 1, 2, 3
+        """
+}
+
+# Families of the data types whose text is rendered the same way by all databases by CHECKSUM_COLUMN_TEXT. Columns
+# of other types, such as floating point, binary and XML columns, are left out of the checksums. Integer types with
+# decimal digits, like Oracle NUMBER(10, 2), are in the decimal family
+CHECKSUM_TYPE_FAMILIES = {
+    MSSQL: {
+        'bigint': 'integer', 'int': 'integer', 'smallint': 'integer', 'tinyint': 'integer',
+        'decimal': 'decimal', 'numeric': 'decimal',
+        'char': 'string', 'varchar': 'string', 'nchar': 'string', 'nvarchar': 'string', 'text': 'string',
+        'ntext': 'string',
+        'date': 'date', 'datetime': 'timestamp', 'datetime2': 'timestamp', 'smalldatetime': 'timestamp',
+        'bit': 'boolean'
+    },
+    POSTGRES: {
+        'bigint': 'integer', 'integer': 'integer', 'smallint': 'integer',
+        'numeric': 'decimal',
+        'character': 'string', 'character varying': 'string', 'text': 'string',
+        'date': 'date', 'timestamp without time zone': 'timestamp',
+        'boolean': 'boolean'
+    },
+    ORACLE: {
+        'number': 'integer', 'integer': 'integer',
+        'char': 'string', 'varchar2': 'string', 'nchar': 'string', 'nvarchar2': 'string',
+        'date': 'timestamp', 'timestamp': 'timestamp'
+    },
+    MYSQL: {
+        'bigint': 'integer', 'int': 'integer', 'mediumint': 'integer', 'smallint': 'integer', 'tinyint': 'integer',
+        'decimal': 'decimal', 'numeric': 'decimal',
+        'char': 'string', 'varchar': 'string', 'text': 'string', 'tinytext': 'string', 'mediumtext': 'string',
+        'longtext': 'string',
+        'date': 'date', 'datetime': 'timestamp', 'timestamp': 'timestamp'
+    }
+}
+
+# Text of a column of each type family, which must be the same on all databases. Decimals are rendered with the larger
+# scale of both databases, so that 1.5 and 1.50 have the same text. MSSQL keeps the strings in Unicode, and the row
+# text is hashed as UTF-8 by GET_CHUNK_CHECKSUMS like on the other databases
+CHECKSUM_COLUMN_TEXT = {
+    MSSQL: {
+        'integer': "CAST({column} AS varchar(20))",
+        'decimal': "CAST(CAST({column} AS decimal(38, {scale})) AS varchar(40))",
+        'string': "CAST({column} AS nvarchar(max))",
+        'date': "CONVERT(varchar(10), {column}, 23)",
+        'timestamp': "CONVERT(varchar(19), {column}, 120)",
+        'boolean': "CAST(CAST({column} AS int) AS varchar(1))"
+    },
+    POSTGRES: {
+        'integer': "{column}::text",
+        'decimal': "round({column}, {scale})::text",
+        'string': "{column}::text",
+        'date': "to_char({column}, 'YYYY-MM-DD')",
+        'timestamp': "to_char({column}, 'YYYY-MM-DD HH24:MI:SS')",
+        'boolean': "CASE WHEN {column} THEN '1' WHEN NOT {column} THEN '0' END"
+    },
+    ORACLE: {
+        'integer': "TO_CHAR({column})",
+        'decimal': "TO_CHAR({column}, 'FM{integer_digits}0.{fraction_digits}')",
+        'string': "{column}",
+        'timestamp': "TO_CHAR({column}, 'YYYY-MM-DD HH24:MI:SS')"
+    },
+    MYSQL: {
+        'integer': "CAST({column} AS CHAR)",
+        'decimal': "CAST(CAST({column} AS DECIMAL(65, {scale})) AS CHAR)",
+        'string': "{column}",
+        'date': "DATE_FORMAT({column}, '%Y-%m-%d')",
+        'timestamp': "DATE_FORMAT({column}, '%Y-%m-%d %H:%i:%s')"
+    }
+}
+
+# Text of a whole row from the texts of its {columns}, which are each followed by a separator and have NULL replaced
+# by a marker, so that the row text is never empty. MSSQL adds the texts to an nvarchar(max), since CONCAT takes at
+# most 254 arguments and truncates its result to 4000 characters when none of them is nvarchar(max)
+CHECKSUM_ROW_TEXT = {
+    MSSQL: "(CAST(N'' AS nvarchar(max)) + {columns})",
+    POSTGRES: "({columns})",
+    ORACLE: "({columns})",
+    MYSQL: "CONCAT({columns})"
+}
+
+CHECKSUM_COLUMN_SEPARATOR = {
+    MSSQL: " + ",
+    POSTGRES: " || ",
+    ORACLE: " || ",
+    MYSQL: ", "
+}
+
+GET_KEY_RANGE = {
+    MSSQL: """
+        SELECT MIN({key}) AS min_key, MAX({key}) AS max_key FROM {table}
+        """,
+    POSTGRES: """
+        SELECT min({key}) AS min_key, max({key}) AS max_key FROM {table}
+        """,
+    ORACLE: """
+        SELECT MIN({key}) AS min_key, MAX({key}) AS max_key FROM {table}
+        """,
+    MYSQL: """
+        SELECT MIN({key}) AS min_key, MAX({key}) AS max_key FROM {table}
+        """
+}
+
+# Number of rows and sum of the hashes of the rows of each chunk of {width} keys, between the keys {low} included and
+# {high} excluded. The sum does not depend on the order of the rows, so both databases return the same checksums.
+# MSSQL converts the row text to varchar with a UTF-8 collation, which needs SQL Server 2019, so that it hashes the
+# same bytes as the other databases
+GET_CHUNK_CHECKSUMS = {
+    MSSQL: """
+        SELECT (CAST({key} AS bigint) - {low}) / {width} AS chunk, COUNT_BIG(*) AS row_count,
+        SUM(CAST(CAST(CAST(HASHBYTES('MD5', CAST({row} COLLATE Latin1_General_100_BIN2_UTF8 AS varchar(max)))
+        AS binary(7)) AS bigint) AS decimal(38, 0))) AS checksum
+        FROM {table}
+        WHERE {key} >= {low} AND {key} < {high}
+        GROUP BY (CAST({key} AS bigint) - {low}) / {width}
+        """,
+    POSTGRES: """
+        SELECT ({key}::bigint - {low}) / {width} AS chunk, count(*) AS row_count,
+        sum(('x' || substr(md5({row}), 1, 14))::bit(56)::bigint) AS checksum
+        FROM {table}
+        WHERE {key} >= {low} AND {key} < {high}
+        GROUP BY 1
+        """,
+    ORACLE: """
+        SELECT FLOOR(({key} - {low}) / {width}) AS chunk, COUNT(*) AS row_count,
+        SUM(TO_NUMBER(SUBSTR(RAWTOHEX(STANDARD_HASH({row}, 'MD5')), 1, 14), 'XXXXXXXXXXXXXX')) AS checksum
+        FROM {table}
+        WHERE {key} >= {low} AND {key} < {high}
+        GROUP BY FLOOR(({key} - {low}) / {width})
+        """,
+    MYSQL: """
+        SELECT ({key} - {low}) DIV {width} AS chunk, COUNT(*) AS row_count,
+        SUM(CAST(CONV(SUBSTRING(MD5({row}), 1, 14), 16, 10) AS UNSIGNED)) AS checksum
+        FROM {table}
+        WHERE {key} >= {low} AND {key} < {high}
+        GROUP BY 1
+        """
+}
+
+GET_SAMPLE_ROWS = {
+    MSSQL: """
+        SELECT {columns} FROM {table} WHERE {key} IN ({keys})
+        """,
+    POSTGRES: """
+        SELECT {columns} FROM {table} WHERE {key} IN ({keys})
+        """,
+    ORACLE: """
+        SELECT {columns} FROM {table} WHERE {key} IN ({keys})
+        """,
+    MYSQL: """
+        SELECT {columns} FROM {table} WHERE {key} IN ({keys})
+        """
+}
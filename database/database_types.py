@@ -1,14 +1,32 @@
 """
 Includes classes for different database types to serve as SOURCE/DESTINATION
 """
-import pandas as pd
 from abc import ABC
-from pandas import DataFrame
-from sqlalchemy import create_engine
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+from threading import Lock
+from time import perf_counter
+from uuid import uuid4
+from sqlalchemy import bindparam, create_engine, text
 
+from database import SCHEMA_NAMES
 from logger import get_logger
 
 
+@lru_cache(maxsize=None)
+def prepare_statement(query):
+    """
+    Parses the query into a text clause once. The schema list of the object queries is bound as an expanding
+    parameter, which is rendered as one placeholder per schema
+    """
+    statement = text(query)
+    if f":{SCHEMA_NAMES}" in query:
+        statement = statement.bindparams(bindparam(SCHEMA_NAMES, expanding=True))
+
+    return statement
+
+
 class Database(ABC):
     chunk_size = 5000
 
@@ -16,23 +34,201 @@ class Database(ABC):
         self.logger = get_logger(__name__)
         self.engine = None
         self.database_type = None
+        self.acquire_count = 0
+        self.acquire_time = 0.0
+        self.acquire_lock = Lock()
+        self.compiled_statements = {}
+        self.compile_lock = Lock()
 
-    def execute_query(self, query):
+    @contextmanager
+    def connect(self):
         """
-        execute_query method takes the sql query as input. It uses pandas data frame to process the data
-        :param query: Query to execute in the database e.g. "select * from table_name", The
-        chunk size is obtained from the property CHUNK_SIZE configured in configurations.ini file
-        :return: Returns pandas dataframe
+        Checks out a connection from the pool of the engine and returns it to the pool once done. The time spent
+        waiting for the connection is logged and added to the totals reported by close()
         """
-        data = None
+        start = perf_counter()
+        conn = self.engine.connect()
+        elapsed = perf_counter() - start
+        with self.acquire_lock:
+            self.acquire_count += 1
+            self.acquire_time += elapsed
+        self.logger.debug(f"Acquired {self.database_type} connection in {elapsed * 1000:.2f} ms")
         try:
-            conn = self.engine.connect()
-            data = pd.read_sql(query, conn, chunksize=int(self.chunk_size))
-            df = DataFrame()
-            for chunk in data:
-                df = pd.concat([df, chunk])
+            yield conn
+        finally:
             conn.close()
-            return df.to_dict('records')
+
+    def close(self):
+        """
+        Closes all the pooled connections of the engine
+        """
+        if self.engine is None:
+            return
+        self.logger.info(f"{self.database_type} connections acquired: {self.acquire_count}, total acquire time: "
+                         f"{self.acquire_time:.3f} s, pool status: {self.engine.pool.status()}")
+        self.engine.dispose()
+
+    def create_cursor(self, dbapi_connection):
+        """
+        Creates the DB-API cursor used for running the queries. Child classes override this to use the server side
+        cursor of their driver, so that the rows are fetched from the server in batches
+        """
+        return dbapi_connection.cursor()
+
+    def prepare_cursor(self, cursor, batch_size):
+        """
+        Sets the number of rows fetched from the server per round trip
+        """
+        cursor.arraysize = batch_size
+
+    def compile_query(self, query, params=None):
+        """
+        Compiles the query for the dialect of the engine. The compiled statement is cached per query, so that only
+        the parameters have to be bound when the same query is run again
+        :param query: Query with bound parameters e.g. "select * from table_name where owner = :username"
+        :param params: Dictionary with the values of the parameters. Parameters not used by the query are ignored
+        :return: The statement and its parameters in the paramstyle of the driver
+        """
+        compiled = self.compiled_statements.get(query)
+        if compiled is None:
+            # The queries run on several workers, so each query is compiled by a single one of them
+            with self.compile_lock:
+                compiled = self.compiled_statements.get(query)
+                if compiled is None:
+                    compiled = prepare_statement(query).compile(dialect=self.engine.dialect)
+                    self.compiled_statements[query] = compiled
+
+        state = compiled.construct_expanded_state(params or {})
+        if self.engine.dialect.positional:
+            return state.statement, tuple(state.parameters[name] for name in state.positiontup)
+
+        return state.statement, state.parameters
+
+    def get_column_names(self, cursor):
+        dialect = self.engine.dialect
+        names = [column[0] for column in cursor.description]
+        if dialect.requires_name_normalize:
+            names = [dialect.normalize_name(name) for name in names]
+
+        return names
+
+    def execute_query(self, query, params=None):
+        """
+        execute_query method takes the sql query as input and returns all the rows of the result
+        :param query: Query to execute in the database e.g. "select * from table_name"
+        :param params: Dictionary with the values of the bound parameters of the query
+        :return: Returns a list of dictionaries, one per row
+        """
+        records = []
+        for batch in self.execute_query_stream(query, params=params):
+            records.extend(row._asdict() for row in batch)
+
+        return records
+
+    def execute_query_stream(self, query, batch_size=None, params=None):
+        """
+        execute_query_stream method takes the sql query as input and yields the rows in fixed size batches straight
+        from the DB-API cursor, so that only a single batch is held in memory at any time
+        :param query: Query to execute in the database e.g. "select * from table_name"
+        :param batch_size: Number of rows per batch. Defaults to the chunk size of the database, which is obtained
+        from the property CHUNK_SIZE configured in configurations.ini file
+        :param params: Dictionary with the values of the bound parameters of the query
+        :return: Generator of lists of named tuples, one per row
+        """
+        batch_size = int(batch_size or self.chunk_size)
+        try:
+            statement, params = self.compile_query(query, params)
+            with self.connect() as conn:
+                cursor = self.create_cursor(conn.connection.dbapi_connection)
+                try:
+                    self.prepare_cursor(cursor, batch_size)
+                    cursor.execute(statement, params)
+                    row_class = None
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        # Server side cursors only describe the columns once the first rows are fetched
+                        if row_class is None:
+                            row_class = namedtuple('Row', self.get_column_names(cursor), rename=True)
+                        yield [row_class._make(row) for row in rows]
+                finally:
+                    cursor.close()
+        except Exception as e:
+            self.logger.error(f'Error occurred while executing the {self.database_type} query: {e}')
+            exit(0)
+
+    def quote_table(self, schema_name, table_name):
+        """
+        Quotes the schema and the table name for the dialect of the engine, for queries which have the table
+        formatted into them
+        """
+        return f"{self.quote_identifier(schema_name)}.{self.quote_identifier(table_name)}"
+
+    def quote_identifier(self, name):
+        return self.engine.dialect.identifier_preparer.quote_identifier(name)
+
+    def set_statement_timeout(self, dbapi_connection, cursor, timeout):
+        """
+        Limits the run time of the statements run on the connection to timeout seconds. Child classes implement this
+        with the setting of their driver or database
+        """
+
+    def reset_statement_timeout(self, dbapi_connection, cursor):
+        """
+        Removes the limit set by set_statement_timeout before the connection is returned to the pool
+        """
+
+    def execute_rows(self, query, timeout=None):
+        """
+        execute_rows method runs a query on a DB-API cursor, without binding any parameter. Unlike execute_query the
+        errors are raised to the caller, so that a query cancelled by the timeout does not end the program
+        :param query: Query to execute in the database e.g. "select count(*) from table_name"
+        :param timeout: Optional number of seconds after which the query is cancelled by the database
+        :return: List of tuples, one per row
+        """
+        with self.connect() as conn:
+            dbapi_connection = conn.connection.dbapi_connection
+            cursor = dbapi_connection.cursor()
+            try:
+                if timeout:
+                    self.set_statement_timeout(dbapi_connection, cursor, timeout)
+                try:
+                    cursor.execute(query)
+                    rows = cursor.fetchall()
+                finally:
+                    if timeout:
+                        self.reset_statement_timeout(dbapi_connection, cursor)
+            finally:
+                cursor.close()
+
+        return rows
+
+    def execute_scalar(self, query, timeout=None):
+        """
+        execute_scalar method runs a query which returns a single value, such as a count. The errors are raised to
+        the caller like in execute_rows
+        :return: Value of the first column of the first row
+        """
+        rows = self.execute_rows(query, timeout)
+        return rows[0][0] if rows else None
+
+    def execute_query_frame(self, query, params=None):
+        """
+        execute_query_frame method takes the sql query as input and uses pandas to read the data. This is slower than
+        execute_query and meant for analysing the results
+        :param query: Query to execute in the database e.g. "select * from table_name"
+        :param params: Dictionary with the values of the bound parameters of the query
+        :return: Returns pandas dataframe
+        """
+        # pandas takes long to import and is only needed here
+        import pandas as pd
+
+        try:
+            with self.connect() as conn:
+                chunks = list(pd.read_sql(prepare_statement(query), conn, params=params or {},
+                                          chunksize=int(self.chunk_size)))
+            return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
         # except sqlalchemy.exc.OperationalError as e:
         except Exception as e:
             self.logger.error(f'Error occurred while executing the {self.database_type} query: {e}')
@@ -42,7 +238,7 @@ class Database(ABC):
 class DatabaseMySQL(Database):
     chunk_size = 5000
 
-    def __init__(self, hostname, port, database, username, password) -> None:
+    def __init__(self, hostname, port, database, username, password, **engine_options) -> None:
         super().__init__()
         self.logger = get_logger(__name__)
         url = f'mysql+pymysql://{username}:{password}@{hostname}:{port}/{database}'
@@ -54,16 +250,27 @@ class DatabaseMySQL(Database):
 
         try:
             self.logger.info("Trying to create the MySQL DB engine")
-            self.engine = create_engine(url)
+            self.engine = create_engine(url, **engine_options)
         except Exception as e:
             self.logger.error(e)
             exit(0)
 
+    def create_cursor(self, dbapi_connection):
+        # The default PyMySQL cursor buffers the complete result on the client
+        from pymysql.cursors import SSCursor
+        return dbapi_connection.cursor(SSCursor)
+
+    def set_statement_timeout(self, dbapi_connection, cursor, timeout):
+        cursor.execute("SET SESSION max_execution_time = %s", (int(timeout * 1000),))
+
+    def reset_statement_timeout(self, dbapi_connection, cursor):
+        cursor.execute("SET SESSION max_execution_time = 0")
+
 
 class DatabaseMsSQL(Database):
     chunk_size = 5000
 
-    def __init__(self, hostname, port, database, username, password) -> None:
+    def __init__(self, hostname, port, database, username, password, **engine_options) -> None:
         super().__init__()
         self.logger = get_logger(__name__)
         self.database_type = 'MsSQL'
@@ -77,16 +284,23 @@ class DatabaseMsSQL(Database):
         # TLS1.2
         try:
             self.logger.info("Trying to create the MsSQL DB engine")
-            self.engine = create_engine(url)
+            self.engine = create_engine(url, **engine_options)
         except Exception as e:
             self.logger.error(e)
             exit()
 
+    def set_statement_timeout(self, dbapi_connection, cursor, timeout):
+        # Query timeout of pyodbc in seconds, 0 means no timeout
+        dbapi_connection.timeout = max(int(timeout), 1)
+
+    def reset_statement_timeout(self, dbapi_connection, cursor):
+        dbapi_connection.timeout = 0
+
 
 class DatabasePostgres(Database):
     chunk_size = 5000
 
-    def __init__(self, hostname, port, database, username, password) -> None:
+    def __init__(self, hostname, port, database, username, password, **engine_options) -> None:
         super().__init__()
         self.logger = get_logger(__name__)
         self.database_type = 'PostgreSQL'
@@ -100,16 +314,28 @@ class DatabasePostgres(Database):
 
         try:
             self.logger.info("Trying to create the PostgreSQL DB engine")
-            self.engine = create_engine(url)
+            self.engine = create_engine(url, **engine_options)
         except Exception as e:
             self.logger.error(e)
             exit()
 
+    def create_cursor(self, dbapi_connection):
+        # Named cursors are server side cursors in psycopg2
+        return dbapi_connection.cursor(name=f'schema_validator_{uuid4().hex}')
+
+    def prepare_cursor(self, cursor, batch_size):
+        super().prepare_cursor(cursor, batch_size)
+        cursor.itersize = batch_size
+
+    def set_statement_timeout(self, dbapi_connection, cursor, timeout):
+        # Only applies to the current transaction, which is rolled back when the connection is returned to the pool
+        cursor.execute("SET LOCAL statement_timeout = %s", (int(timeout * 1000),))
+
 
 class DatabaseOracle(Database):
     chunk_size = 5000
 
-    def __init__(self, hostname, port, database, username, password) -> None:
+    def __init__(self, hostname, port, database, username, password, **engine_options) -> None:
         # oracle_client_path = os.path.join(os.environ.get(PYTHONPATH), 'oracle_client')
         # cx_Oracle.init_oracle_client(oracle_client_path)
         super().__init__()
@@ -125,8 +351,20 @@ class DatabaseOracle(Database):
         url = f'oracle+oracledb://{username}:{password}@{hostname}:{port}/?service_name={database}'
         try:
             self.logger.info("Trying to create the Oracle DB engine")
-            self.engine = create_engine(url, max_identifier_length=128)
+            self.engine = create_engine(url, max_identifier_length=128, **engine_options)
             self.logger.info("Created the Oracle DB engine")
         except Exception as e:
             self.logger.error(f"An error occurred during creation of Oracle DB: {e}")
             exit()
+
+    def prepare_cursor(self, cursor, batch_size):
+        super().prepare_cursor(cursor, batch_size)
+        # Fetch the first batch in the same round trip as the execution of the query
+        cursor.prefetchrows = batch_size + 1
+
+    def set_statement_timeout(self, dbapi_connection, cursor, timeout):
+        # Timeout of each round trip to the database in milliseconds, 0 means no timeout
+        dbapi_connection.call_timeout = int(timeout * 1000)
+
+    def reset_statement_timeout(self, dbapi_connection, cursor):
+        dbapi_connection.call_timeout = 0
@@ -0,0 +1,126 @@
+"""
+Registry of the database dialects. A dialect bundles the database classes which create its engine, its queries, the
+mapping of its data types and the features it supports. The built-in dialects are registered below, and other dialects
+are loaded from the DIALECT_ENTRY_POINT_GROUP entry points of the installed packages. The classes of a dialect, and
+with them its driver, are only imported when a database of the dialect is created
+"""
+import importlib
+from importlib.metadata import entry_points
+
+from database import *
+from database import database_queries
+from src.datatype_mapping import DATATYPE_MAPPING_SQL_TO_PG, SPOT_CHECK_TYPE_FAMILIES
+
+
+class Dialect:
+    """
+    Describes a database dialect. A package adds a dialect by exposing a Dialect object as an entry point of the
+    DIALECT_ENTRY_POINT_GROUP group, named after the database type of the configuration file
+    """
+
+    def __init__(self, name, database_class, async_database_class=None, queries=None, type_families=None,
+                 type_mapping=None, capabilities=()):
+        """
+        :param name: Database type of the configuration file, in lower case
+        :param database_class: Database class, or its "module:class" path so that it is imported when it is used
+        :param async_database_class: Class or path of the asyncio database, or None to run database_class in a thread
+        :param queries: Dictionary with the query of the dialect for each query name of database_queries, such as
+        GET_TABLES. The built-in dialects have their queries in database_queries already
+        :param type_families: Families of the data types for the checksums, as in CHECKSUM_TYPE_FAMILIES
+        :param type_mapping: Dictionary with the PostgreSQL data type each data type of the dialect is migrated to,
+        which the spot check compares the values by, or None to compare them by their type family
+        :param capabilities: CAPABILITY_ constants of the features the dialect supports
+        """
+        self.name = name
+        self.database_class = database_class
+        self.async_database_class = async_database_class
+        self.queries = queries or {}
+        self.type_families = type_families
+        self.type_mapping = type_mapping
+        self.capabilities = frozenset(capabilities)
+
+    @staticmethod
+    def load_class(database_class):
+        if not isinstance(database_class, str):
+            return database_class
+
+        module_name, class_name = database_class.split(':')
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def get_database_class(self):
+        return self.load_class(self.database_class)
+
+    def get_async_database_class(self):
+        return self.load_class(self.async_database_class) if self.async_database_class is not None else None
+
+    def supports(self, capability):
+        return capability in self.capabilities
+
+
+DIALECTS = {}
+
+
+def register_dialect(dialect):
+    """
+    Adds the dialect to the registry, along with its queries and the families of its data types
+    """
+    for query_name, query in dialect.queries.items():
+        getattr(database_queries, query_name)[dialect.name] = query
+    if dialect.type_families is not None:
+        database_queries.CHECKSUM_TYPE_FAMILIES[dialect.name] = dialect.type_families
+
+    DIALECTS[dialect.name] = dialect
+
+
+def get_entry_points():
+    all_entry_points = entry_points()
+    # Python 3.8 and 3.9 return a dictionary of the entry points of each group, which has no select method
+    if not hasattr(all_entry_points, 'select'):
+        return all_entry_points.get(DIALECT_ENTRY_POINT_GROUP, [])
+    return all_entry_points.select(group=DIALECT_ENTRY_POINT_GROUP)
+
+
+def get_dialect(name):
+    """
+    Looks up a dialect, loading it from the entry points of the installed packages the first time it is needed
+    :return: Dialect object, or None if no dialect has the name
+    """
+    name = name.lower()
+    if name not in DIALECTS:
+        for entry_point in get_entry_points():
+            if entry_point.name.lower() == name:
+                register_dialect(entry_point.load())
+                break
+
+    return DIALECTS.get(name)
+
+
+def supports(name, capability):
+    """
+    :return: True if the dialect of the database type supports the capability
+    """
+    dialect = get_dialect(name)
+    return dialect is not None and dialect.supports(capability)
+
+
+register_dialect(Dialect(MSSQL, "database.database_types:DatabaseMsSQL",
+                         type_mapping=DATATYPE_MAPPING_SQL_TO_PG,
+                         capabilities=(CAPABILITY_BULK_CATALOG_QUERY, CAPABILITY_SERVER_SIDE_HASHING,
+                                       CAPABILITY_SAMPLED_ROW_COUNT, CAPABILITY_PARTITIONS,
+                                       CAPABILITY_DDL_MARKERS, CAPABILITY_OBJECT_DIGESTS)))
+register_dialect(Dialect(POSTGRES, "database.database_types:DatabasePostgres",
+                         "database.async_database_types:AsyncDatabasePostgres",
+                         type_mapping={data_type: data_type for data_type in SPOT_CHECK_TYPE_FAMILIES},
+                         capabilities=(CAPABILITY_BULK_CATALOG_QUERY, CAPABILITY_SERVER_SIDE_HASHING,
+                                       CAPABILITY_SAMPLED_ROW_COUNT, CAPABILITY_PARTITIONS,
+                                       CAPABILITY_PARTITION_TABLES, CAPABILITY_DDL_MARKERS,
+                                       CAPABILITY_OBJECT_DIGESTS)))
+register_dialect(Dialect(ORACLE, "database.database_types:DatabaseOracle",
+                         capabilities=(CAPABILITY_BULK_CATALOG_QUERY, CAPABILITY_SERVER_SIDE_HASHING,
+                                       CAPABILITY_SAMPLED_ROW_COUNT, CAPABILITY_PARTITIONS,
+                                       CAPABILITY_DDL_MARKERS, CAPABILITY_OBJECT_DIGESTS)))
+# MySQL has no sampling clause
+register_dialect(Dialect(MYSQL, "database.database_types:DatabaseMySQL",
+                         "database.async_database_types:AsyncDatabaseMySQL",
+                         capabilities=(CAPABILITY_BULK_CATALOG_QUERY, CAPABILITY_SERVER_SIDE_HASHING,
+                                       CAPABILITY_PARTITIONS, CAPABILITY_DDL_MARKERS, CAPABILITY_OBJECT_DIGESTS)))
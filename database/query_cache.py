@@ -0,0 +1,194 @@
+"""
+Local cache for the results of the catalog queries. The results are kept in an SQLite file in the output directory,
+so that repeated runs within the time to live read the metadata from disk instead of the databases. The results of
+streamed queries are stored and read back one batch at a time, so that caching them does not hold the whole result in
+memory
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import zlib
+from contextlib import contextmanager
+from threading import Lock
+from time import time
+from uuid import uuid4
+
+from logger import get_logger
+
+
+class QueryCache:
+    """
+    Each entry is keyed by the host, port, database, database type, query and parameters. The rows are stored as
+    a zlib compressed pickle of the column names and the row values. The entry of a streamed query has the id of its
+    batches instead of the row values, and each batch is stored in query_cache_batches
+    """
+
+    def __init__(self, path, ttl) -> None:
+        self.logger = get_logger(__name__)
+        self.path = path
+        self.ttl = ttl
+        self.lock = Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self.lock, self.connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS query_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    host TEXT,
+                    database_name TEXT,
+                    database_type TEXT,
+                    created_at REAL,
+                    payload BLOB
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS query_cache_batches (
+                    entry_id TEXT,
+                    batch_number INTEGER,
+                    host TEXT,
+                    database_name TEXT,
+                    created_at REAL,
+                    payload BLOB,
+                    PRIMARY KEY (entry_id, batch_number)
+                )
+            """)
+            conn.execute("DELETE FROM query_cache WHERE created_at < ?", (time() - self.ttl,))
+            # Also removes the batches of the streams which did not complete
+            conn.execute("DELETE FROM query_cache_batches WHERE created_at < ?", (time() - self.ttl,))
+
+    @contextmanager
+    def connect(self):
+        """
+        Opens the cache file for a single operation, which is committed once done
+        """
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def get_cache_key(database, query, params):
+        key = repr((database.host, database.port, database.database, database.db_type.lower(), query,
+                    sorted((params or {}).items())))
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def compress(data):
+        return zlib.compress(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def get_entry(self, database, query, params):
+        """
+        :return: Tuple with the column names and the rows, or the id of the batches, of the query. None if the query is
+        not cached or the entry is older than the time to live
+        """
+        cache_key = self.get_cache_key(database, query, params)
+        with self.lock, self.connect() as conn:
+            entry = conn.execute("SELECT payload FROM query_cache WHERE cache_key = ? AND created_at >= ?",
+                                 (cache_key, time() - self.ttl)).fetchone()
+
+        if entry is None:
+            return None
+
+        self.logger.debug(f"Query cache hit for {database.db_type} database {database.database}")
+        return pickle.loads(zlib.decompress(entry[0]))
+
+    def get(self, database, query, params=None):
+        """
+        Returns the cached rows of the query as a list of dictionaries, or None if the query is not cached or the
+        entry is older than the time to live
+        """
+        entry = self.get_entry(database, query, params)
+        if entry is None:
+            return None
+
+        columns, rows = entry
+        if isinstance(rows, str):
+            rows = [row for batch in self.read_batches(rows) for row in batch]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def get_stream(self, database, query, params, batch_size):
+        """
+        Returns the cached rows of the query in batches, which are read from the cache one at a time
+        :return: Tuple with the column names and a generator of lists of row tuples, or None if the query is not cached
+        """
+        entry = self.get_entry(database, query, params)
+        if entry is None:
+            return None
+
+        columns, rows = entry
+        if isinstance(rows, str):
+            return columns, self.read_batches(rows)
+        return columns, (rows[i:i + batch_size] for i in range(0, len(rows), batch_size))
+
+    def read_batches(self, entry_id):
+        batch_number = 0
+        while True:
+            with self.lock, self.connect() as conn:
+                batch = conn.execute("SELECT payload FROM query_cache_batches WHERE entry_id = ? AND batch_number = ?",
+                                     (entry_id, batch_number)).fetchone()
+            if batch is None:
+                return
+            yield pickle.loads(zlib.decompress(batch[0]))
+            batch_number += 1
+
+    def put(self, database, query, params, records):
+        """
+        Stores the rows of the query, given as a list of dictionaries
+        """
+        columns = list(records[0].keys()) if records else []
+        rows = [tuple(record.values()) for record in records]
+        self.put_entry(database, query, params, time(), self.compress((columns, rows)))
+
+    def put_entry(self, database, query, params, created_at, payload):
+        with self.lock, self.connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO query_cache VALUES (?, ?, ?, ?, ?, ?)",
+                         (self.get_cache_key(database, query, params), database.host, database.database,
+                          database.db_type.lower(), created_at, payload))
+
+    def put_stream(self, database, query, params, batches):
+        """
+        Stores each batch of rows of a streamed query as it is passed on to the caller. The entry is only stored once
+        the last batch is, so that a stream which fails or is not read to the end is not cached. It takes the time the
+        query started, so that its batches never expire before it
+        :param batches: Iterable of lists of named tuples
+        :return: Generator of the batches
+        """
+        created_at = time()
+        entry_id = uuid4().hex
+        columns = []
+        batch_number = 0
+        for batch in batches:
+            if batch and not columns:
+                columns = list(batch[0]._fields)
+            payload = self.compress([tuple(row) for row in batch])
+            with self.lock, self.connect() as conn:
+                conn.execute("INSERT INTO query_cache_batches VALUES (?, ?, ?, ?, ?, ?)",
+                             (entry_id, batch_number, database.host, database.database, created_at, payload))
+            batch_number += 1
+            yield batch
+
+        self.put_entry(database, query, params, created_at, self.compress((columns, entry_id)))
+
+    def invalidate(self, host=None, database_name=None):
+        """
+        Removes the cached entries of one database, or all the entries if no database is given
+        :return: Number of entries removed
+        """
+        conditions = "1 = 1"
+        params = []
+        if host is not None:
+            conditions += " AND host = ?"
+            params.append(host)
+        if database_name is not None:
+            conditions += " AND database_name = ?"
+            params.append(database_name)
+
+        with self.lock, self.connect() as conn:
+            removed = conn.execute(f"DELETE FROM query_cache WHERE {conditions}", params).rowcount
+            conn.execute(f"DELETE FROM query_cache_batches WHERE {conditions}", params)
+
+        self.logger.info(f"Removed {removed} entries from the query cache {os.path.basename(self.path)}")
+        return removed
@@ -1,12 +1,17 @@
+import atexit
+import itertools
+import json
 import os
 import logging
-from configparser import ConfigParser
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from threading import Lock
 
 from database import CONFIG_FILE
 from src import *
 from time import strftime, gmtime
 
-from src.utility import CONFIGURATION_DIR
+from src.utility.configuration import Configuration
 
 
 def get_project_root():
@@ -15,44 +20,105 @@ def get_project_root():
     return root_dir
 
 
-def read_configurations(property_name, config_file=None, section_name=None):
-    value = os.environ.get(property_name, None)
-
-    if not value:
-        # Reading the value from the config file
-        config_path = os.path.join(get_project_root() + "/conf")
-        if config_path:
-            path = config_path
-        else:
-            path = os.path.join(os.getcwd(), CONFIGURATION_DIR)
-
-        path = os.path.join(path, config_file)
-        config = ConfigParser()
-        config.read(path)
-        if section_name in config.sections():
-            value = config[section_name].get(property_name)
-        else:
-            value = ''
-    return value
-
-
 python_path = get_project_root()
 LOG_DIR = os.path.join(os.path.normpath(python_path) if python_path else '', 'logs')
-
-if not os.path.exists(LOG_DIR):
-    os.mkdir(LOG_DIR)
-
 LOG_FILE_NAME = os.path.join(LOG_DIR, LOG_FILE_FORMAT.format(strftime('%Y%m%d_%H%M%S', gmtime())))
 FORMAT = logging.Formatter(LOGGING_FORMAT)
-FILE_HANDLER = logging.FileHandler(LOG_FILE_NAME)
+# The log file is only created when the first record is written, so that importing the modules has no side effects
+FILE_HANDLER = logging.FileHandler(LOG_FILE_NAME, delay=True)
 FILE_HANDLER.setFormatter(FORMAT)
 stream_handler = logging.StreamHandler()
 
+queue_listener = None
+listener_lock = Lock()
+
+
+def start_queue_listener():
+    global queue_listener
+    with listener_lock:
+        if queue_listener is None:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            queue_listener = QueueListener(LOG_QUEUE, FILE_HANDLER, stream_handler, respect_handler_level=True)
+            queue_listener.start()
+            # Writes the records left on the queue before the interpreter exits
+            atexit.register(queue_listener.stop)
+
+
+class LogQueueHandler(QueueHandler):
+    """
+    Puts the records on a queue, from which the thread of the listener writes them to the file and stderr, so that
+    the extraction threads never wait on the disk or the terminal. The listener is started with the first record
+    """
+
+    def enqueue(self, record):
+        if queue_listener is None:
+            start_queue_listener()
+        super().enqueue(record)
+
+    def prepare(self, record):
+        # The record is put on the queue as it is, so that its message, and a DebugPayload in its arguments, is only
+        # formatted by the handlers on the thread of the listener
+        return record
+
+
+LOG_QUEUE = queue.SimpleQueue()
+QUEUE_HANDLER = LogQueueHandler(LOG_QUEUE)
+
 
 def get_logger(name, level=None):
-    level = level if level else read_configurations(DEBUG_LEVEL, CONFIG_FILE, LOGGING)
+    level = level if level else Configuration.get_instance().get(DEBUG_LEVEL, CONFIG_FILE, LOGGING)
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    logger.addHandler(FILE_HANDLER)
-    logger.addHandler(stream_handler)
+    if QUEUE_HANDLER not in logger.handlers:
+        logger.addHandler(QUEUE_HANDLER)
     return logger
+
+
+class DebugPayload:
+    """
+    Logs a data structure as JSON, for example logger.debug("%s", DebugPayload(data)). The payload is only serialized
+    when the record is written, which never happens below the DEBUG level, and only the first
+    DEBUG_PAYLOAD_SAMPLE_SIZE items of every dictionary and list are included, so that large results are not
+    serialized in full. A sample size of 0 includes every item
+    """
+    __slots__ = ('payload',)
+    sample_size = None
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    @classmethod
+    def get_sample_size(cls):
+        if cls.sample_size is None:
+            sample_size = Configuration.get_instance().get(DEBUG_PAYLOAD_SAMPLE_SIZE, CONFIG_FILE, LOGGING)
+            cls.sample_size = int(sample_size or DEFAULT_DEBUG_PAYLOAD_SAMPLE_SIZE)
+        return cls.sample_size
+
+    @classmethod
+    def sample(cls, payload, sample_size):
+        """
+        :return: Copy of the payload with at most sample_size items in every dictionary and iterable, followed by
+        the number of items left out
+        """
+        if isinstance(payload, (str, bytes, int, float, bool)) or payload is None:
+            return payload
+
+        if isinstance(payload, dict):
+            items = list(itertools.islice(payload.items(), sample_size or None))
+            sample = {str(key): cls.sample(value, sample_size) for key, value in items}
+            if len(items) < len(payload):
+                sample["..."] = f"{len(payload) - len(items)} more"
+            return sample
+
+        try:
+            values = iter(payload)
+        except TypeError:
+            return str(payload)
+
+        sample = [cls.sample(value, sample_size) for value in itertools.islice(values, sample_size or None)]
+        if sample_size and hasattr(payload, '__len__') and len(payload) > len(sample):
+            sample.append(f"... {len(payload) - len(sample)} more")
+        return sample
+
+    def __str__(self):
+        return json.dumps(self.sample(self.payload, self.get_sample_size()), indent=4, default=str)
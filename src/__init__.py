@@ -4,6 +4,9 @@ PYTHONPATH = "PYTHONPATH"
 OUTPUT_DIR = "output"
 LOGS_DIR = "logs"
 OUTPUT_FILE_FORMAT = "migration_summary_{}_to_{}_{}.{}"
+SNAPSHOT_FILE_FORMAT = "validation_snapshot_{}_to_{}_{}.pkl.gz"
+SNAPSHOT_VERSION = 1
+INCREMENTAL_STATE_FILE_FORMAT = "incremental_state_{}_to_{}_{}.pkl.gz"
 
 SCHEMA = "schema"
 TABLE = "table"
@@ -18,9 +21,60 @@ SEQUENCE = "sequence"
 VERSION = "version"
 DATABASE_SIZE = "database_size"
 ENCODING = "encoding"
+DDL_MARKER = "ddl_marker"
+DDL_MARKERS = "ddl_markers"
+OBJECT_COUNT = "object_count"
+DISTINCT_COUNT = "distinct_count"
+DIGEST = "digest"
+MATCHED_OBJECTS = "matched_objects"
 REASON = "reason"
 
+EXTRACTION_MODE_BULK = "bulk"
+EXTRACTION_MODE_SCHEMA = "schema"
+EXTRACTION_ENGINE_THREADS = "threads"
+EXTRACTION_ENGINE_ASYNCIO = "asyncio"
+SCHEMA_BATCH_SIZE = 500
+DEFAULT_CONCURRENCY = 4
+COMPARISON_BACKEND_PYTHON = "python"
+COMPARISON_BACKEND_COLUMNAR = "columnar"
+ROW_COUNT_MODE_ESTIMATE = "estimate"
+ROW_COUNT_MODE_EXACT = "exact"
+ROW_COUNT_MODE_TIERED = "tiered"
+DEFAULT_ROW_COUNT_TIMEOUT = 300
+DEFAULT_SAMPLE_PERCENT = 1
+DEFAULT_SAMPLE_TOLERANCE = 10
+DEFAULT_SAMPLE_MIN_ROWS = 1000000
+DEFAULT_CHECKSUM_CHUNK_ROWS = 1000000
+DEFAULT_CHECKSUM_MIN_CHUNK_ROWS = 1000
+DEFAULT_CHECKSUM_TIMEOUT = 3600
+# Number of chunks a mismatched chunk is split into at each level of the drill down
+CHECKSUM_DRILL_DOWN_FACTOR = 10
+CHECKSUM_NULL_MARKER = "\\N"
+CHECKSUM_SEPARATOR = "|"
+SECRETS_PROVIDER_SECRETS_MANAGER = "secretsmanager"
+SECRETS_PROVIDER_ENVIRONMENT = "environment"
+SECRETS_PROVIDER_FILE = "file"
+DEFAULT_SECRETS_CACHE_TTL = 3600
+SECRETS_CACHE_FILE = "secrets_cache.bin"
+# Environment variable holding the Fernet key of the secrets cache, and the prefix of the secrets of the environment
+SECRETS_CACHE_KEY = "SECRETS_CACHE_KEY"
+SECRET_ENVIRONMENT_PREFIX = "SECRET_"
+DEFAULT_SPOT_CHECK_SAMPLE_SIZE = 1000
+DEFAULT_SPOT_CHECK_CONFIDENCE = 95
+# Keys per IN list of a sample query, which is the limit of Oracle, and the most candidate keys drawn per sampled row
+# of a table whose keys have gaps
+SPOT_CHECK_BATCH_SIZE = 1000
+SPOT_CHECK_MAX_OVERSAMPLING = 10
+SPILL_DIRECTORY_PREFIX = "schema_validator_spill_"
+# Names per pickled chunk of a spill file, and the approximate memory taken by a buffered row besides its names
+SPILL_CHUNK_SIZE = 10000
+SPILL_RECORD_SIZE = 150
+# Spill file holding the objects of the previous run in the bounded memory mode of the incremental mode
+INCREMENTAL_STATE_SPILL_FILE = "incremental_state.spill"
+
 DEBUG_LEVEL = "DEBUG_LEVEL"
+DEBUG_PAYLOAD_SAMPLE_SIZE = "DEBUG_PAYLOAD_SAMPLE_SIZE"
+DEFAULT_DEBUG_PAYLOAD_SAMPLE_SIZE = 100
 LOGGING = "logging"
 LOG_FILE_FORMAT = "run_log_{}.log"
 LOGGING_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(module)s - %(message)s'
@@ -46,6 +100,27 @@ DATA_TYPE = "data_type"
 SCHEMA_NAME = "schema_name"
 TABLE_NAME = "table_name"
 ROW_COUNT = "row_count"
+SCHEMA_IDENTIFIER = "schema_identifier"
+TABLE_IDENTIFIER = "table_identifier"
+ROW_COUNT_TIER = "row_count_tier"
+TIER_ESTIMATE = "estimate"
+TIER_SAMPLE = "sample"
+TIER_EXACT = "exact"
+PARTITION_NUMBER = "partition_number"
+PARTITION_SCHEMA = "partition_schema"
+PARTITION_IDENTIFIER = "partition_identifier"
+PARTITION_FUNCTION = "partition_function"
+PARTITION_COLUMN = "partition_column"
+PARTITIONS = "partitions"
+KEY_COLUMN = "key_column"
+NUM_CHUNKS = "num_chunks"
+MISMATCHED_RANGES = "mismatched_ranges"
+SAMPLE_SIZE = "sample_size"
+MISMATCHED_ROWS = "mismatched_rows"
+MISMATCH_RATE = "mismatch_rate"
+MISMATCH_LOWER_BOUND = "mismatch_lower_bound"
+MISMATCH_UPPER_BOUND = "mismatch_upper_bound"
+MISMATCHED_COLUMNS = "mismatched_columns"
 TABLE_SCHEMA = "table_schema"
 DATATYPE_DETAILS = "datatype_details"
 DATATYPE_DETAILS_SOURCE = "datatype_details_source"
@@ -58,6 +133,7 @@ COLOR = "color"
 COLOR_GREEN = "green"
 COLOR_RED = "red"
 COLOR_YELLOW = "yellow"
+COLOR_ORANGE = "orange"
 
 COLUMN_NAME = "column_name"
 COUNT = "count"
@@ -0,0 +1,219 @@
+import asyncio
+from datetime import datetime
+
+from database import *
+from database.database_queries import *
+from database.dialects import supports
+from src import *
+from src.catalog import ObjectNames
+from src.report_generator import MigrationSummaryObject
+from src.row_counter import ExactRowCounter
+
+
+class AsyncMigrationSummaryObject(MigrationSummaryObject):
+    """
+    Runs the extraction on asyncio instead of the thread pools of the ExtractionScheduler. Every catalog query of
+    both databases is scheduled at once and the number of queries in flight against each database is limited by
+    SOURCE_CONCURRENCY and TARGET_CONCURRENCY. The validation and comparison logic is shared with
+    MigrationSummaryObject.
+    """
+
+    def __init__(self, file_format):
+        super().__init__(file_format)
+        self.semaphores = None
+
+    async def execute_query(self, database, category, query, params=None, use_cache=True):
+        async with self.semaphores[category]:
+            return await database.execute_query_async(query, params, use_cache)
+
+    async def get_row_counts_async(self, database, db_type, category):
+        self.logger.info(f"Getting table row counts for {category}")
+        row_counts = await self.execute_query(database, category, GET_TABLE_ROW_COUNTS[db_type])
+        partitions = await self.execute_query(database, category, GET_PARTITIONED_INDEX[db_type]) \
+            if self.partition_row_count and supports(db_type, CAPABILITY_PARTITIONS) else []
+        if isinstance(self.row_counter, ExactRowCounter):
+            # The counts run on the worker pool of the counter, which limits the number of tables counted at once
+            return await asyncio.get_running_loop().run_in_executor(None, self.row_counter.count_partitioned_tables,
+                                                                    database, db_type, row_counts, partitions,
+                                                                    category)
+
+        return row_counts, partitions
+
+    async def get_database_detail_async(self, database, db_type, category):
+        version, database_size, encoding = await asyncio.gather(
+            self.execute_query(database, category, GET_VERSION[db_type]),
+            self.execute_query(database, category, GET_DB_SIZE[db_type]),
+            self.execute_query(database, category, GET_ENCODING[db_type])
+        )
+        return self.build_database_detail(database, db_type, version, database_size, encoding)
+
+    async def get_schema_list_async(self, database, db_type, category):
+        """
+        Gets the names for the schemas of one database.
+        Note: If the database type is Oracle, the username for the database is used as the schema
+        """
+        return await self.execute_query(database, category, GET_SCHEMAS[db_type])
+
+    async def fetch_objects_async(self, database, category, query, db_object, params, spill=None):
+        if spill is not None:
+            # The asyncio drivers return the whole result at once, so in the bounded memory mode the rows are
+            # streamed in batches to the spill on a worker thread instead
+            async with self.semaphores[category]:
+                return await asyncio.get_running_loop().run_in_executor(None, self.spill_objects, spill, database,
+                                                                        query, db_object, params)
+
+        rows = await self.execute_query(database, category, query, params)
+        return ObjectNames.group_by_schema((row[SCHEMA_NAME], row[db_object + '_name']) for row in rows)
+
+    async def get_schema_objects_async(self, database, db_type, schema_names, category, object_schemas=None):
+        """
+        Same as get_schema_objects, with all the object queries of the database in flight at once
+        """
+        schema_objects = {schema.lower(): {obj: ObjectNames() for obj in self.objects} for schema in schema_names}
+        spill = self.create_catalog_spill(category)
+
+        tasks = []
+        for obj in self.objects:
+            if obj not in self.object_query_mapping:
+                continue
+
+            for schema_batch in self.get_schema_batches(db_type, schema_names if object_schemas is None
+                                                        else object_schemas.get(obj, [])):
+                query = self.object_query_mapping[obj][db_type]
+                tasks.append((obj, self.fetch_objects_async(database, category, query, obj,
+                                                            self.get_schema_parameters(schema_batch), spill)))
+
+        self.logger.info(f"Running {len(tasks)} object queries for {len(schema_names)} {category} schema(s)")
+        results = await asyncio.gather(*[task for _, task in tasks])
+
+        for (obj, _), objects in zip(tasks, results):
+            for schema_name, object_names in objects.items():
+                if schema_name in schema_objects:
+                    schema_objects[schema_name][obj] = object_names
+
+        if spill is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.add_spilled_objects, schema_objects, spill)
+
+        return schema_objects
+
+    async def get_object_digests_async(self, database, db_type, schema_names, category):
+        """
+        Same as get_object_digests, with the queries run on the event loop
+        """
+        queries = [(obj, schema_batch) for obj in self.objects if obj in self.object_query_mapping
+                   for schema_batch in self.get_schema_batches(db_type, schema_names)]
+        results = await asyncio.gather(*[
+            self.execute_query(database, category, self.get_digest_query(db_type, obj),
+                               self.get_schema_parameters(schema_batch))
+            for obj, schema_batch in queries
+        ])
+
+        digests = {}
+        for (obj, _), rows in zip(queries, results):
+            digests.update(self.build_object_digests(rows, obj))
+        return digests
+
+    async def get_digest_compared_objects_async(self, source_names, target_names):
+        """
+        Same as get_digest_compared_objects, with the queries run on the event loop
+        """
+        source_digests, target_digests = await asyncio.gather(
+            self.get_object_digests_async(self.source_db, self.db_type_source, source_names, SECTION_SOURCE),
+            self.get_object_digests_async(self.target_db, self.db_type_target, target_names, SECTION_TARGET)
+        )
+        matched_digests, source_object_schemas, target_object_schemas = \
+            self.compare_object_digests(source_names, target_names, source_digests, target_digests)
+
+        source_objects, target_objects = await asyncio.gather(
+            self.get_schema_objects_async(self.source_db, self.db_type_source, source_names, SECTION_SOURCE,
+                                          source_object_schemas),
+            self.get_schema_objects_async(self.target_db, self.db_type_target, target_names, SECTION_TARGET,
+                                          target_object_schemas)
+        )
+
+        return (self.add_object_digests(source_objects, matched_digests),
+                self.add_object_digests(target_objects, matched_digests))
+
+    async def get_changed_schema_objects_async(self, database, db_type, schema_names, category):
+        """
+        Same as get_changed_schema_objects, with the queries run on the event loop
+        """
+        if not self.incremental or not supports(db_type, CAPABILITY_DDL_MARKERS):
+            return await self.get_schema_objects_async(database, db_type, schema_names, category)
+
+        results = await asyncio.gather(*[
+            self.execute_query(database, category, GET_SCHEMA_DDL_MARKERS[db_type],
+                               self.get_schema_parameters(schema_names[i:i + SCHEMA_BATCH_SIZE]), use_cache=False)
+            for i in range(0, len(schema_names), SCHEMA_BATCH_SIZE)
+        ])
+        markers = self.build_ddl_markers(schema_names, [row for rows in results for row in rows])
+        changed_schemas = self.get_changed_schemas(category, markers)
+        schema_objects = await self.get_schema_objects_async(database, db_type, changed_schemas, category) \
+            if changed_schemas else {}
+
+        return self.merge_schema_objects(category, markers, schema_objects)
+
+    async def generate_report_data_async(self):
+        self.semaphores = {category: asyncio.Semaphore(limit) for category, limit in self.concurrency.items()}
+
+        self.logger.info("\n*** Getting row counts, database details and schemas ***\n")
+        (source_counts, target_counts, source_details, target_details,
+         source_schemas, target_schemas) = await asyncio.gather(
+            self.get_row_counts_async(self.source_db, self.db_type_source, SECTION_SOURCE),
+            self.get_row_counts_async(self.target_db, self.db_type_target, SECTION_TARGET),
+            self.get_database_detail_async(self.source_db, self.db_type_source, SECTION_SOURCE),
+            self.get_database_detail_async(self.target_db, self.db_type_target, SECTION_TARGET),
+            self.get_schema_list_async(self.source_db, self.db_type_source, SECTION_SOURCE),
+            self.get_schema_list_async(self.target_db, self.db_type_target, SECTION_TARGET)
+        )
+        # The tiered counts of both databases need the estimates of both, so they run after the gather
+        self.combined_row_count_data = await asyncio.get_running_loop().run_in_executor(
+            None, self.build_row_count_data, source_counts, target_counts)
+        if self.data_validator is not None:
+            self.logger.info("\n*** Validating the data of the tables ***\n")
+            self.data_validation_data = await asyncio.get_running_loop().run_in_executor(
+                None, self.get_data_validation_data)
+        if self.spot_checker is not None:
+            self.logger.info("\n*** Spot checking the data of the tables ***\n")
+            self.spot_check_data = await asyncio.get_running_loop().run_in_executor(None, self.get_spot_check_data)
+        self.database_summary = {
+            "source": source_details,
+            "target": target_details
+        }
+        self.missing_schemas = list(set([x[SCHEMA_NAME] for x in source_schemas]) -
+                                    set([x[SCHEMA_NAME] for x in target_schemas]))
+
+        self.logger.info("\n*** Getting data for all objects ***\n")
+        source_names = [x[SCHEMA_NAME] for x in source_schemas]
+        target_names = [x[SCHEMA_NAME] for x in target_schemas]
+
+        if self.use_digest_comparison():
+            source_objects, target_objects = await self.get_digest_compared_objects_async(source_names, target_names)
+        else:
+            source_objects, target_objects = await asyncio.gather(
+                self.get_changed_schema_objects_async(self.source_db, self.db_type_source, source_names,
+                                                      SECTION_SOURCE),
+                self.get_changed_schema_objects_async(self.target_db, self.db_type_target, target_names,
+                                                      SECTION_TARGET)
+            )
+            self.save_incremental_state()
+
+        await asyncio.gather(self.source_db.close_async(), self.target_db.close_async())
+
+        return self.prepare_data(source_schemas, target_schemas, source_objects, target_objects)
+
+    def generate_report_data(self):
+        start_time = datetime.now()
+        self.logger.info(f"STARTED EXECUTION: {start_time}")
+
+        source_data, target_data = asyncio.run(self.generate_report_data_async())
+
+        self.logger.info("\n**Getting validation data**\n")
+        # Summary page
+        self.validation_data, self.comparison_data = self.compare_objects(source_data, target_data)
+
+        self.scheduler.shutdown()
+        self.source_db.close()
+        self.target_db.close()
+
+        self.logger.info(f"\nTOTAL TIME TAKEN: {datetime.now() - start_time}")
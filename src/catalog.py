@@ -0,0 +1,52 @@
+"""
+Compact representation of the object names of a catalog. Large data warehouses have millions of indexes and
+constraints, so the names of each (schema, object type) are packed in a single string instead of a list of strings
+"""
+
+
+class ObjectNames:
+    """
+    Sorted object names of one schema and object type, separated by NUL characters, which no supported database
+    allows in an identifier. Iterating over it yields the names, so it can be used wherever a list of names was used
+    """
+    __slots__ = ('packed', 'count')
+    separator = '\x00'
+
+    def __init__(self, names=()):
+        names = sorted(names)
+        self.packed = self.separator.join(names)
+        self.count = len(names)
+
+    @classmethod
+    def group_by_schema(cls, rows):
+        """
+        Groups the (schema name, object name) rows of an object query by schema, in lower case
+        :return: Dictionary with the ObjectNames of each schema
+        """
+        names = {}
+        for schema_name, object_name in rows:
+            names.setdefault(schema_name.lower(), []).append(object_name.lower())
+
+        return {schema_name: cls(object_names) for schema_name, object_names in names.items()}
+
+    def __iter__(self):
+        return iter(self.packed.split(self.separator) if self.count else ())
+
+    def __len__(self):
+        return self.count
+
+    def __eq__(self, other):
+        if isinstance(other, ObjectNames):
+            return self.count == other.count and self.packed == other.packed
+        return list(self) == list(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __getstate__(self):
+        return self.packed, self.count
+
+    def __setstate__(self, state):
+        self.packed, self.count = state
@@ -0,0 +1,115 @@
+"""
+Columnar backend of the diff engine for catalogs with millions of objects. The object names of both sides are loaded
+into NumPy columns and the joins and group-bys are run on integer codes instead of Python sets
+"""
+import numpy as np
+import pandas as pd
+
+from src import *
+from src.catalog import ObjectNames
+from src.diff_engine import DiffEngine
+
+
+class ColumnarDiffEngine(DiffEngine):
+    """
+    Every (schema, object type) bucket gets a categorical code, and every distinct object name a code in the sort
+    order of the names. A name in a bucket is then a single int64 key, so that the hash join of the Python backend
+    becomes a sorted set operation on two integer arrays. The validation and comparison data are assembled per bucket
+    by DiffEngine, in exactly the same structure.
+    """
+
+    def join_buckets(self, all_schemas, source_data, target_data):
+        buckets = [(schema, obj) for schema in all_schemas for obj in self.objects]
+
+        source_names, source_codes = self.get_name_column(buckets, source_data, OBJECTS_SOURCE)
+        target_names, target_codes = self.get_name_column(buckets, target_data, OBJECTS_TARGET)
+
+        # sort=True numbers the names in their sort order, so sorted keys list the names of a bucket alphabetically
+        name_codes, names = pd.factorize(np.concatenate([source_names, target_names]), sort=True)
+        names = np.asarray(names, dtype=object)
+        num_names = max(len(names), 1)
+
+        source_keys = self.get_unique_keys(source_codes * num_names + name_codes[:len(source_names)])
+        target_keys = self.get_unique_keys(target_codes * num_names + name_codes[len(source_names):])
+
+        matched = np.isin(source_keys, target_keys, assume_unique=True)
+        extra_keys = target_keys[~np.isin(target_keys, source_keys, assume_unique=True)]
+        missing_keys = source_keys[~matched]
+
+        num_matches = np.bincount(source_keys[matched] // num_names, minlength=len(buckets))
+        missing_objects = self.split_by_bucket(missing_keys, num_names, names, len(buckets))
+        extra_objects = self.split_by_bucket(extra_keys, num_names, names, len(buckets))
+
+        return {bucket: (int(num_matches[i]), missing_objects[i], extra_objects[i])
+                for i, bucket in enumerate(buckets)}
+
+    def get_name_column(self, buckets, data, objects_key):
+        """
+        Flattens the object names of one side into a column, along with the code of the bucket of each name
+        """
+        names = []
+        lengths = np.zeros(len(buckets), dtype=np.int64)
+        for i, (schema, obj) in enumerate(buckets):
+            bucket = self.get_bucket(data.get(schema), obj)
+            if bucket is not None and bucket[objects_key]:
+                names.extend(bucket[objects_key])
+                lengths[i] = len(bucket[objects_key])
+
+        return np.asarray(names, dtype=object), np.repeat(np.arange(len(buckets), dtype=np.int64), lengths)
+
+    @staticmethod
+    def get_unique_keys(keys):
+        """
+        Sorts the keys and drops the duplicated names within a bucket
+        """
+        keys = np.sort(keys)
+        return keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+
+    @staticmethod
+    def split_by_bucket(keys, num_names, names, num_buckets):
+        """
+        Splits sorted keys in the ObjectNames of each bucket
+        """
+        bucket_codes = keys // num_names
+        bounds = np.searchsorted(bucket_codes, np.arange(num_buckets + 1))
+        object_names = names[keys % num_names].tolist()
+        return [ObjectNames(object_names[bounds[i]:bounds[i + 1]]) for i in range(num_buckets)]
+
+    @staticmethod
+    def get_row_count_frame(data, columns, key_columns):
+        return pd.DataFrame({column: pd.Series([x[column] for x in data], dtype=object) for column in columns}) \
+            .drop_duplicates(key_columns, keep='last')
+
+    @staticmethod
+    def get_keys(frame, key_columns):
+        return zip(*[frame[column].tolist() for column in key_columns])
+
+    @staticmethod
+    def compare_row_counts(data_source, data_target, key_columns=(SCHEMA_NAME, TABLE_NAME)):
+        key_columns = list(key_columns)
+        # The tier which decided each row count is only there when the counts were verified in tiers
+        tiered = any(ROW_COUNT_TIER in x for x in data_source)
+        columns = key_columns + [ROW_COUNT] + ([ROW_COUNT_TIER] if tiered else [])
+        source = ColumnarDiffEngine.get_row_count_frame(data_source, columns, key_columns)
+        target = ColumnarDiffEngine.get_row_count_frame(data_target, columns, key_columns)
+
+        joined = source.merge(target, on=key_columns, how='left', suffixes=('', '_target'), indicator=True)
+        present = (joined['_merge'] == 'both').to_numpy()
+        # The row counts are kept as Python objects, so that NULL and Decimal counts compare like the Python backend
+        equal = joined[ROW_COUNT].to_numpy() == joined[ROW_COUNT + '_target'].to_numpy()
+        unknown = (joined[ROW_COUNT].isna() | joined[ROW_COUNT + '_target'].isna()).to_numpy()
+        colors = np.select([~present, unknown, equal], [COLOR_RED, COLOR_ORANGE, COLOR_GREEN], COLOR_YELLOW)
+
+        data_source_dict = {key: {ROW_COUNT: row_count, COLOR: color}
+                            for key, row_count, color in zip(ColumnarDiffEngine.get_keys(joined, key_columns),
+                                                             joined[ROW_COUNT].tolist(), colors.tolist())}
+        data_target_dict = {key: {ROW_COUNT: row_count}
+                            for key, row_count in zip(ColumnarDiffEngine.get_keys(target, key_columns),
+                                                      target[ROW_COUNT].tolist())}
+        if tiered:
+            for key, tier in zip(ColumnarDiffEngine.get_keys(joined, key_columns), joined[ROW_COUNT_TIER].tolist()):
+                data_source_dict[key][ROW_COUNT_TIER] = tier
+            for key, tier in zip(ColumnarDiffEngine.get_keys(target, key_columns), target[ROW_COUNT_TIER].tolist()):
+                data_target_dict[key][ROW_COUNT_TIER] = tier
+
+        return data_source_dict, data_target_dict
@@ -0,0 +1,300 @@
+"""
+Validation of the data of the tables with checksums computed by the databases. Each table is split in chunks of its
+integer primary key, and both databases return the number of rows and the sum of the hashes of the rows of every chunk
+in a single GROUP BY query. Only the digests of the chunks cross the network, and only the chunks whose digests differ
+are split and compared again, until the ranges of keys which differ are small enough to be synchronized
+"""
+import math
+import re
+
+from database import SECTION_SOURCE, SECTION_TARGET
+from database.database_queries import (CHECKSUM_COLUMN_SEPARATOR, CHECKSUM_COLUMN_TEXT, CHECKSUM_ROW_TEXT,
+                                       CHECKSUM_TYPE_FAMILIES, GET_CHECKSUM_COLUMNS, GET_CHUNK_CHECKSUMS,
+                                       GET_KEY_RANGE)
+from logger import get_logger
+from src import *
+
+
+class TableValidator:
+    """
+    Shared by the validators of the data of the tables. The tables are read from the catalogs of both databases, and
+    the queries on the tables run at once on the source and target workers of the scheduler. A query which fails is
+    returned as its exception, so that only its table is reported as not validated
+    """
+
+    def __init__(self, timeout):
+        self.logger = get_logger(__name__)
+        self.timeout = timeout
+
+    @staticmethod
+    def get_tables(columns, db_type):
+        """
+        Groups the rows of GET_CHECKSUM_COLUMNS by table
+        :return: Dictionary with the identifiers, the columns with the family of their type and their data type, the
+        scale of the numeric columns and the primary key columns of each (schema name, table name)
+        """
+        tables = {}
+        for row in columns:
+            table = tables.setdefault((row[SCHEMA_NAME], row[TABLE_NAME]), {
+                SCHEMA_IDENTIFIER: row[SCHEMA_IDENTIFIER], TABLE_IDENTIFIER: row[TABLE_IDENTIFIER], 'columns': {},
+                'scales': {}, 'keys': []
+            })
+            data_type = re.sub(r'\(.*\)', '', row[DATA_TYPE]).strip()
+            family = CHECKSUM_TYPE_FAMILIES[db_type].get(data_type)
+            scale = int(row['numeric_scale']) if row['numeric_scale'] is not None else None
+            # Oracle has a single NUMBER type for integers and decimals
+            if family == 'integer' and scale:
+                family = 'decimal'
+            table['columns'][row['column_name']] = (row['column_identifier'], family, data_type)
+            table['scales'][row['column_name']] = scale
+            if row['is_primary_key']:
+                table['keys'].append(row['column_name'])
+
+        return tables
+
+    def get_catalogs(self, submit, databases, db_types):
+        """
+        :return: Tuple with the tables of the source and of the target
+        """
+        futures = {category: submit(category, databases[category].execute_query, GET_CHECKSUM_COLUMNS[db_type])
+                   for category, db_type in db_types.items()}
+        return tuple(self.get_tables(futures[category].result(), db_types[category])
+                     for category in (SECTION_SOURCE, SECTION_TARGET))
+
+    @staticmethod
+    def get_key(source_table, target_table):
+        """
+        :return: Tuple with the name of the single integer primary key column of the table and None, or with None and
+        the reason the table is not validated
+        """
+        if target_table is None:
+            return None, "Table not found on the target"
+
+        if len(source_table['keys']) != 1 or source_table['keys'] != target_table['keys']:
+            return None, "No single column primary key on both databases"
+
+        key = source_table['keys'][0]
+        if source_table['columns'][key][1] != 'integer' or target_table['columns'][key][1] != 'integer':
+            return None, "The primary key is not an integer"
+
+        return key, None
+
+    @staticmethod
+    def get_table_names(database, table, key):
+        """
+        :return: Quoted names of the table and of its key column, formatted into the queries of one side
+        """
+        return {
+            'table': database.quote_table(table[SCHEMA_IDENTIFIER], table[TABLE_IDENTIFIER]),
+            'key': database.quote_identifier(table['columns'][key][0])
+        }
+
+    def run_level(self, submit, databases, queries):
+        """
+        Runs the queries of every task on both databases
+        :param databases: Dictionary with the database of the source and the target
+        :param queries: List with the queries of the source and the target of each task
+        :return: List of the rows of the source and the target, or of the exception raised by the query
+        """
+        futures = [{category: submit(category, self.run_query, database, task_queries[category])
+                    for category, database in databases.items()} for task_queries in queries]
+        return [(task_futures[SECTION_SOURCE].result(), task_futures[SECTION_TARGET].result())
+                for task_futures in futures]
+
+    def run_query(self, database, query):
+        try:
+            return database.execute_rows(query, self.timeout)
+        except Exception as e:
+            return e
+
+    @staticmethod
+    def set_error(result, source_rows, target_rows):
+        """
+        Marks the table as not validated when a query failed on one of the databases
+        :return: True if a query failed
+        """
+        for category, rows in ((SECTION_SOURCE, source_rows), (SECTION_TARGET, target_rows)):
+            if isinstance(rows, Exception):
+                result.update({REASON: f"Query failed on the {category}: {rows}", COLOR: COLOR_ORANGE})
+                return True
+
+        return False
+
+
+class ChecksumValidator(TableValidator):
+    """
+    Compares the tables of the source with the tables of the target level by level. The queries of every level run at
+    once on the source and target workers of the scheduler, so the tables and the chunk ranges are compared in
+    parallel. A table which cannot be validated, because it has no single integer primary key or because a query
+    failed, is reported with the reason
+    """
+
+    def __init__(self, chunk_rows, min_chunk_rows, timeout):
+        super().__init__(timeout)
+        self.chunk_rows = chunk_rows
+        self.min_chunk_rows = min_chunk_rows
+
+    @staticmethod
+    def get_column_text(database, db_type, identifier, family, scale):
+        """
+        :param scale: Number of decimal digits the decimals are rendered with, or None to render them as they are
+        """
+        column = database.quote_identifier(identifier)
+        if family == 'decimal' and scale is None:
+            # Only PostgreSQL has decimals without a fixed scale, whose text is the same on both databases
+            return CHECKSUM_COLUMN_TEXT[db_type]['integer'].format(column=column)
+
+        return CHECKSUM_COLUMN_TEXT[db_type][family].format(column=column, scale=scale,
+                                                            integer_digits='9' * max(37 - (scale or 0), 0),
+                                                            fraction_digits='0' * (scale or 0))
+
+    @staticmethod
+    def get_row_text(database, db_type, columns):
+        """
+        :param columns: List of the identifiers of the columns, the family of their type and their scale
+        :return: Expression of the text of a row
+        """
+        texts = []
+        for identifier, family, scale in columns:
+            text = ChecksumValidator.get_column_text(database, db_type, identifier, family, scale)
+            texts.append(f"COALESCE({text}, '{CHECKSUM_NULL_MARKER}')")
+            texts.append(f"'{CHECKSUM_SEPARATOR}'")
+
+        return CHECKSUM_ROW_TEXT[db_type].format(columns=CHECKSUM_COLUMN_SEPARATOR[db_type].join(texts))
+
+    @staticmethod
+    def get_checksum_columns(source_table, source_type, target_table, target_type):
+        """
+        Only the columns whose text is the same on both databases are part of the checksums. The decimals of both
+        databases are rendered with the larger of their fixed scales
+        :return: Dictionary with the scale of each column of the checksums, sorted by name
+        """
+        names = sorted(name for name, (_, family, _) in source_table['columns'].items()
+                       if name in target_table['columns'] and family is not None and
+                       family == target_table['columns'][name][1] and family in CHECKSUM_COLUMN_TEXT[source_type]
+                       and family in CHECKSUM_COLUMN_TEXT[target_type])
+        scales = {}
+        for name in names:
+            fixed_scales = [scale for scale in (source_table['scales'][name], target_table['scales'][name])
+                            if scale is not None]
+            scales[name] = max(fixed_scales) if fixed_scales else None
+        return scales
+
+    def get_side(self, database, db_type, table, key, columns):
+        """
+        :param columns: Dictionary with the scale of each column of the checksums
+        :return: Names formatted into the queries of one side of a table
+        """
+        names = self.get_table_names(database, table, key)
+        names['row'] = self.get_row_text(database, db_type, [(table['columns'][name][0], table['columns'][name][1],
+                                                              scale) for name, scale in columns.items()])
+        return names
+
+    @staticmethod
+    def get_chunks(rows):
+        return {int(chunk): (int(row_count), int(checksum or 0)) for chunk, row_count, checksum in rows}
+
+    def validate(self, submit, source_db, source_type, target_db, target_type, row_counts):
+        """
+        :param submit: Function running a function on the workers of the source or the target
+        :param row_counts: Row count data of the source tables, which sets the number of chunks of each table
+        :return: Dictionary with the result of each (schema name, table name) of the source
+        """
+        databases = {SECTION_SOURCE: source_db, SECTION_TARGET: target_db}
+        db_types = {SECTION_SOURCE: source_type, SECTION_TARGET: target_type}
+        source_tables, target_tables = self.get_catalogs(submit, databases, db_types)
+
+        data = {}
+        queries = {}
+        for name, source_table in source_tables.items():
+            target_table = target_tables.get(name)
+            key, reason = self.get_key(source_table, target_table)
+            if reason is not None:
+                data[name] = {KEY_COLUMN: None, NUM_CHUNKS: 0, MISMATCHED_RANGES: [], REASON: reason,
+                              COLOR: COLOR_RED if target_table is None else COLOR_ORANGE}
+                continue
+
+            columns = self.get_checksum_columns(source_table, source_type, target_table, target_type)
+            data[name] = {KEY_COLUMN: key, NUM_CHUNKS: 0, MISMATCHED_RANGES: [], REASON: None, COLOR: COLOR_GREEN}
+            queries[name] = {SECTION_SOURCE: self.get_side(source_db, source_type, source_table, key, columns),
+                             SECTION_TARGET: self.get_side(target_db, target_type, target_table, key, columns)}
+
+        self.logger.info(f"Validating the data of {len(queries)} of {len(source_tables)} tables")
+        tasks = self.get_first_level(submit, databases, db_types, queries, row_counts, data)
+
+        level = 0
+        while tasks:
+            level += 1
+            self.logger.info(f"Comparing the checksums of {len(tasks)} key ranges at level {level}")
+            results = self.run_level(submit, databases, [
+                {category: GET_CHUNK_CHECKSUMS[db_type].format(**queries[name][category], low=low, high=high,
+                                                               width=width)
+                 for category, db_type in db_types.items()} for name, low, high, width in tasks])
+            tasks = self.compare_level(tasks, results, data)
+
+        for result in data.values():
+            result[MISMATCHED_RANGES].sort()
+        mismatched = sum(1 for result in data.values() if result[COLOR] == COLOR_YELLOW)
+        self.logger.info(f"The data of {mismatched} tables differs")
+        return data
+
+    def get_first_level(self, submit, databases, db_types, queries, row_counts, data):
+        """
+        Reads the range of the keys of every table on both databases and splits it in chunks of about chunk_rows rows
+        :return: List of the (table, low key, high key, chunk width) to compare
+        """
+        names = list(queries)
+        results = self.run_level(submit, databases, [
+            {category: GET_KEY_RANGE[db_type].format(**queries[name][category])
+             for category, db_type in db_types.items()} for name in names])
+
+        tasks = []
+        for name, (source_rows, target_rows) in zip(names, results):
+            if self.set_error(data[name], source_rows, target_rows):
+                continue
+
+            bounds = [row for row in source_rows + target_rows if row[0] is not None]
+            if not bounds:
+                continue
+
+            low = min(int(row[0]) for row in bounds)
+            high = max(int(row[1]) for row in bounds) + 1
+            row_count = (row_counts.get(name) or {}).get(ROW_COUNT)
+            num_chunks = max(1, math.ceil((row_count or 0) / self.chunk_rows))
+            width = max(1, math.ceil((high - low) / num_chunks))
+            tasks.append((name, low, high, width))
+
+        return tasks
+
+    def compare_level(self, tasks, results, data):
+        """
+        Compares the chunk checksums of both databases. A chunk which differs is split again, unless it has no more
+        than min_chunk_rows rows or a single key, in which case its key range is reported
+        :return: List of the tasks of the next level
+        """
+        next_tasks = []
+        for (name, low, high, width), (source_rows, target_rows) in zip(tasks, results):
+            result = data[name]
+            if result[COLOR] == COLOR_ORANGE or self.set_error(result, source_rows, target_rows):
+                continue
+
+            source_chunks = self.get_chunks(source_rows)
+            target_chunks = self.get_chunks(target_rows)
+            result[NUM_CHUNKS] += math.ceil((high - low) / width)
+
+            for chunk in sorted(source_chunks.keys() | target_chunks.keys()):
+                source_count, source_checksum = source_chunks.get(chunk, (0, 0))
+                target_count, target_checksum = target_chunks.get(chunk, (0, 0))
+                if source_count == target_count and source_checksum == target_checksum:
+                    continue
+
+                chunk_low = low + chunk * width
+                chunk_high = min(chunk_low + width, high)
+                result[COLOR] = COLOR_YELLOW
+                if width == 1 or max(source_count, target_count) <= self.min_chunk_rows:
+                    result[MISMATCHED_RANGES].append([chunk_low, chunk_high - 1, source_count, target_count])
+                else:
+                    next_tasks.append((name, chunk_low, chunk_high,
+                                       max(1, math.ceil(width / CHECKSUM_DRILL_DOWN_FACTOR))))
+
+        return next_tasks
@@ -0,0 +1,41 @@
+"""
+Mappings of the data types of SQL Server to the data types of PostgreSQL, shared by the report of the data types and
+the comparison of the sampled rows
+"""
+
+# Data types of PostgreSQL and the data types of SQL Server converted to them
+DATATYPE_MAPPING = {'bigint': ['bigint'], 'bytea': ['binary', 'image', 'varbinarymax'], 'boolean': ['bit'],
+                    'character': ['char'], 'date': ['date'],
+                    'timestamp without time zone': ['datetime', 'smalldatetime', 'datetime2'],
+                    'numeric': ['decimal', 'money', 'numeric', 'smallmoney'],
+                    'double precision': ['float'], 'integer': ['int'],
+                    'text': ['ntext', 'nvarcharmax', 'text', 'varcharmax'],
+                    'character varying': ['nvarchar', 'varchar', 'nchar'], 'real': ['real'],
+                    'smallint': ['smallint', 'tinyint'], 'uuid': ['uniqueidentifier'],
+                    'xml': ['xml', 'xmlmax']}
+
+# Data type of PostgreSQL each data type of SQL Server is converted to, or None if it has no equivalent
+DATATYPE_MAPPING_SQL_TO_PG = {'bigint': 'bigint', 'binary': 'bytea', 'bit': 'boolean', 'char': 'character',
+                              'date': 'date', 'datetime': 'timestamp without time zone',
+                              'datetime2': 'timestamp without time zone', 'decimal': 'numeric',
+                              'float': 'double precision', 'image': 'bytea', 'int': 'integer',
+                              'money': 'numeric',
+                              'ntext': 'text', 'numeric': 'numeric', 'nvarchar': 'character varying',
+                              'nvarcharmax': 'text', 'real': 'real',
+                              'smalldatetime': 'timestamp without time zone', 'smallint': 'smallint',
+                              'smallmoney': 'numeric', 'text': 'text', 'tinyint': 'smallint',
+                              'uniqueidentifier': 'uuid', 'varbinarymax': 'bytea',
+                              'varchar': 'character varying',
+                              'varcharmax': 'text', 'xml': 'xml',
+                              "xmlmax": "xml",  # Added on my own
+                              "hierarchyid": None,  # Added on my own
+                              "nchar": "character varying",  # Added on my own
+                              "time": None,  # Added on my own
+                              "geographymax": None
+                              }
+
+# Families of the data types of PostgreSQL, which decide how the sampled values are normalized before they are compared
+SPOT_CHECK_TYPE_FAMILIES = {'bigint': 'integer', 'integer': 'integer', 'smallint': 'integer', 'numeric': 'decimal',
+                            'double precision': 'float', 'real': 'float', 'boolean': 'boolean',
+                            'character': 'string', 'character varying': 'string', 'text': 'string',
+                            'date': 'date', 'timestamp without time zone': 'timestamp', 'uuid': 'uuid'}
@@ -0,0 +1,222 @@
+"""
+Compares the objects of the source and the target catalog in a single pass and builds both the validation data of the
+summary page and the comparison data of the schema pages
+"""
+from src import *
+from src.catalog import ObjectNames
+
+
+class DiffEngine:
+    """
+    The catalogs are given in the structure built by MigrationSummaryObject.prepare_data:
+    {
+        "SCHEMA_NAME": {"OBJECT_TYPE": {OBJECTS_SOURCE: ObjectNames(["object_name", ...]), NUM_SOURCE: 1}}
+    }
+    The object names are lower cased when they are fetched, so every (schema, object type) bucket is joined on the
+    names as they are. The input dictionaries are not modified, and the names of the source are shared with the
+    validation data instead of being copied.
+    """
+
+    def __init__(self, objects):
+        self.objects = objects
+
+    def compare(self, source_data, target_data):
+        """
+        :return: Tuple with the validation data and the comparison data
+        """
+        validation_data = {
+            SCHEMA: self.compare_schemas(source_data, target_data),
+            OBJECTS: {}
+        }
+        comparison_data = {}
+
+        all_schemas = list(source_data)
+        all_schemas.extend(schema for schema in target_data if schema not in source_data)
+        joined_buckets = self.join_buckets(all_schemas, source_data, target_data)
+
+        for schema in all_schemas:
+            source_schema = source_data.get(schema)
+            target_schema = target_data.get(schema)
+
+            schema_validation = {VALIDATION_PERCENT: 0}
+            schema_comparison = {}
+            num_source = 0
+            num_target = 0
+            num_missing_objects = 0
+            source_total_object_count = 0
+            target_total_object_count = 0
+
+            for obj in self.objects:
+                source_bucket = self.get_bucket(source_schema, obj)
+                target_bucket = self.get_bucket(target_schema, obj)
+                source_objects = source_bucket[OBJECTS_SOURCE] if source_bucket is not None else []
+                target_objects = target_bucket[OBJECTS_TARGET] if target_bucket is not None else []
+                source_count = source_bucket[NUM_SOURCE] if source_bucket is not None else 0
+                target_count = target_bucket[NUM_TARGET] if target_bucket is not None else 0
+                num_matches, missing_objects, extra_objects = joined_buckets[schema, obj]
+
+                source_total_object_count += source_count
+                target_total_object_count += target_count
+                schema_comparison[obj] = {
+                    OBJECTS_SOURCE: missing_objects,
+                    NUM_SOURCE: source_count,
+                    OBJECTS_TARGET: extra_objects,
+                    NUM_TARGET: target_count
+                }
+
+                if source_bucket is None:
+                    continue
+
+                if MATCHED_OBJECTS in source_bucket:
+                    # The digests of both sides matched, so every object is present on the target
+                    num_source += source_count
+                    num_target += source_count
+                    schema_validation[obj] = self.get_matched_validation(source_bucket)
+                elif target_schema:
+                    num_source += len(source_objects)
+                    num_target += len(target_objects)
+                    num_missing_objects += len(missing_objects)
+                    schema_validation[obj] = self.get_object_validation(source_objects, target_objects, num_matches,
+                                                                        missing_objects)
+                else:
+                    num_source += len(source_objects)
+                    schema_validation[obj] = {
+                        MISSING_ITEMS: source_objects,
+                        ALL_ITEMS: [],
+                        VALIDATION_PERCENT: 0.00,
+                        REASON: 'Schema absent on destination'
+                    }
+
+            comparison_data[schema] = {
+                DISPLAY_FLAG: bool(source_total_object_count and target_total_object_count),
+                ALL_ITEMS: schema_comparison
+            }
+
+            if source_schema is not None:
+                schema_validation[DISPLAY_FLAG] = bool(num_target or num_source)
+                schema_validation[VALIDATION_PERCENT] = self.get_schema_percent(num_source, num_target,
+                                                                                num_missing_objects)
+                validation_data[OBJECTS][schema] = schema_validation
+
+        return validation_data, comparison_data
+
+    @staticmethod
+    def get_bucket(schema_data, obj):
+        return schema_data.get(obj) if schema_data else None
+
+    def join_buckets(self, all_schemas, source_data, target_data):
+        """
+        Joins the object names of the source and the target in every (schema, object type) bucket. Each side is
+        turned into a set exactly once
+        :return: Dictionary with the number of matched names, and the ObjectNames of the missing and extra names of
+        each (schema, object type)
+        """
+        joined_buckets = {}
+        for schema in all_schemas:
+            source_schema = source_data.get(schema)
+            target_schema = target_data.get(schema)
+
+            for obj in self.objects:
+                source_bucket = self.get_bucket(source_schema, obj)
+                target_bucket = self.get_bucket(target_schema, obj)
+                source_set = set(source_bucket[OBJECTS_SOURCE]) if source_bucket is not None else set()
+                target_set = set(target_bucket[OBJECTS_TARGET]) if target_bucket is not None else set()
+                matches = source_set & target_set
+
+                joined_buckets[schema, obj] = (len(matches), ObjectNames(source_set - matches),
+                                               ObjectNames(target_set - matches))
+
+        return joined_buckets
+
+    @staticmethod
+    def get_row_count(row):
+        """
+        :return: Row count of a table, with the tier which decided it when the counts were verified in tiers
+        """
+        if ROW_COUNT_TIER in row:
+            return {ROW_COUNT: row[ROW_COUNT], ROW_COUNT_TIER: row[ROW_COUNT_TIER]}
+        return {ROW_COUNT: row[ROW_COUNT]}
+
+    @staticmethod
+    def compare_row_counts(data_source, data_target, key_columns=(SCHEMA_NAME, TABLE_NAME)):
+        """
+        Colors the row count of each source table by comparing it with the target table
+        :param key_columns: Columns identifying a table, or a partition
+        """
+        # schema_name , table_name, row_count
+        data_source_dict = {tuple(x[column] for column in key_columns): DiffEngine.get_row_count(x)
+                            for x in data_source}
+        data_target_dict = {tuple(x[column] for column in key_columns): DiffEngine.get_row_count(x)
+                            for x in data_target}
+
+        for key in data_source_dict:
+            if key in data_target_dict:
+                if data_source_dict[key][ROW_COUNT] is None or data_target_dict[key][ROW_COUNT] is None:
+                    data_source_dict[key][COLOR] = COLOR_ORANGE
+                elif data_source_dict[key][ROW_COUNT] != data_target_dict[key][ROW_COUNT]:
+                    data_source_dict[key][COLOR] = COLOR_YELLOW
+                else:
+                    data_source_dict[key][COLOR] = COLOR_GREEN
+            else:
+                data_source_dict[key][COLOR] = COLOR_RED
+
+        return data_source_dict, data_target_dict
+
+    @staticmethod
+    def compare_schemas(source_data, target_data):
+        missing_schemas = [schema for schema in source_data if schema not in target_data]
+        validation_percent = (1 - (len(missing_schemas) / len(source_data))) * 100 if source_data else 0.0
+
+        return {
+            MISSING_ITEMS: missing_schemas,
+            ALL_ITEMS: list(source_data),
+            VALIDATION_PERCENT: round(validation_percent, 2),
+            TOTAL_SOURCE: 0,
+            TOTAL_TARGET: 0
+        }
+
+    @staticmethod
+    def get_matched_validation(source_bucket):
+        object_count = source_bucket[NUM_SOURCE]
+        return {
+            MISSING_ITEMS: [],
+            ALL_ITEMS: [],
+            VALIDATION_PERCENT: round(source_bucket[MATCHED_OBJECTS] / object_count * 100, 2) if object_count
+            else 0.00,
+            REASON: "Counts and names matched" if object_count else "No objects at source or target"
+        }
+
+    @staticmethod
+    def get_object_validation(source_objects, target_objects, num_matches, missing_objects):
+        num_source = len(source_objects)
+        num_target = len(target_objects)
+
+        # Duplicated names on the source lower the percentage, and it is capped at 100
+        validation_percent = min(num_matches / num_source * 100, 100.00) if num_source else 0.00
+
+        if num_source == 0 and num_target > 0:
+            reason = "Only present on target"
+        elif num_source > 0 and num_target == 0:
+            reason = "No objects were migrated"
+        elif not num_source and not num_target:
+            reason = "No objects at source or target"
+        elif num_source == num_target and missing_objects:
+            reason = "Count matched, names didn't"
+        elif num_source != num_target and missing_objects:
+            reason = "Partially migrated"
+        else:
+            reason = "Counts and names matched"
+
+        return {
+            MISSING_ITEMS: missing_objects,
+            ALL_ITEMS: source_objects,
+            VALIDATION_PERCENT: round(validation_percent, 2),
+            REASON: reason
+        }
+
+    @staticmethod
+    def get_schema_percent(num_source, num_target, num_missing_objects):
+        if not num_target or not num_source:
+            return 'NA'
+
+        return round(min((1 - num_missing_objects / num_source) * 100, 100.00), 2)
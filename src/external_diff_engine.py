@@ -0,0 +1,90 @@
+"""
+Bounded memory backend of the diff engine. The object names of both sides are read in sorted order and joined with a
+merge, and the missing and extra names are written to spill files instead of being kept in memory
+"""
+import itertools
+import os
+
+from src import *
+from src.diff_engine import DiffEngine
+from src.spill import SpillWriter
+
+# Marks the end of the names of one side in merge_join
+_END = object()
+
+
+class ExternalDiffEngine(DiffEngine):
+    """
+    The names of every (schema, object type) are sorted, whether they are SpilledNames read from the merged runs or
+    ObjectNames, so both sides are joined in one pass holding a single name of each side in memory
+    """
+
+    def __init__(self, objects, directory):
+        super().__init__(objects)
+        self.directory = directory
+
+    def join_buckets(self, all_schemas, source_data, target_data):
+        missing_writer = SpillWriter(os.path.join(self.directory, "missing_objects.spill"))
+        extra_writer = SpillWriter(os.path.join(self.directory, "extra_objects.spill"))
+
+        joined_buckets = {}
+        try:
+            for schema in all_schemas:
+                source_schema = source_data.get(schema)
+                target_schema = target_data.get(schema)
+
+                for obj in self.objects:
+                    source_bucket = self.get_bucket(source_schema, obj)
+                    target_bucket = self.get_bucket(target_schema, obj)
+                    source_names = self.get_sorted_names(source_bucket[OBJECTS_SOURCE]) if source_bucket is not None \
+                        else ()
+                    target_names = self.get_sorted_names(target_bucket[OBJECTS_TARGET]) if target_bucket is not None \
+                        else ()
+
+                    num_matches = self.merge_join(source_names, target_names, missing_writer, extra_writer)
+                    joined_buckets[schema, obj] = (num_matches, missing_writer.end(), extra_writer.end())
+        finally:
+            missing_writer.close()
+            extra_writer.close()
+
+        return joined_buckets
+
+    @staticmethod
+    def get_sorted_names(names):
+        # Plain lists come from the placeholders of absent schemas and from incremental states of older versions
+        return sorted(names) if isinstance(names, list) else names
+
+    @staticmethod
+    def merge_join(source_names, target_names, missing_writer, extra_writer):
+        """
+        Joins two sorted sequences of names, ignoring duplicated names. The names which are only on the source are
+        appended to missing_writer and the names which are only on the target to extra_writer
+        :return: Number of names present on both sides
+        """
+        source_iter = (name for name, _ in itertools.groupby(source_names))
+        target_iter = (name for name, _ in itertools.groupby(target_names))
+        source_name = next(source_iter, _END)
+        target_name = next(target_iter, _END)
+
+        num_matches = 0
+        while source_name is not _END and target_name is not _END:
+            if source_name == target_name:
+                num_matches += 1
+                source_name = next(source_iter, _END)
+                target_name = next(target_iter, _END)
+            elif source_name < target_name:
+                missing_writer.append(source_name)
+                source_name = next(source_iter, _END)
+            else:
+                extra_writer.append(target_name)
+                target_name = next(target_iter, _END)
+
+        while source_name is not _END:
+            missing_writer.append(source_name)
+            source_name = next(source_iter, _END)
+
+        while target_name is not _END:
+            extra_writer.append(target_name)
+            target_name = next(target_iter, _END)
+
+        return num_matches
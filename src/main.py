@@ -11,32 +11,59 @@ except ValueError:
     os.environ['PYTHONPATH'] = cwd
 
 import argparse
-from database import CONFIG_FILE, FILE_FORMAT, SECTION_FILE_FORMAT
+import importlib
+from database import CONFIG_FILE, FILE_FORMAT, SAVE_SNAPSHOT, SECTION_FILE_FORMAT, EXTRACTION_ENGINE, SECTION_EXTRACTION
 from logger import get_logger
-from src import DEBUG_LEVEL, LOGGING, OUTPUT_DIR, LOGS_DIR
-from src.report_generator import MigrationSummaryObject
-from src.templates.pdf_template import PDFTemplate
-from src.templates.html_template import HTMLTemplate
-from src.templates.excel_template import ExcelTemplate
+from src import DEBUG_LEVEL, LOGGING, OUTPUT_DIR, LOGS_DIR, EXTRACTION_ENGINE_ASYNCIO
+from src.utility.configuration import Configuration
 from src.utility.utils import CommonUtility
 
+# Module and class of the template of each format. Only the template of the chosen format and the writer of the format
+# are imported, and the report generator after them, so that --help and invalid formats return at once
 format_mapping = {
-    "pdf": PDFTemplate,
-    "xlsx": ExcelTemplate,
-    "html": HTMLTemplate
+    "pdf": ("src.templates.pdf_template", "PDFTemplate"),
+    "xlsx": ("src.templates.excel_template", "ExcelTemplate"),
+    "html": ("src.templates.html_template", "HTMLTemplate")
 }
 
 
+def get_template_class(file_format):
+    module_name, class_name = format_mapping[file_format]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
 def set_arguments():
     parser = argparse.ArgumentParser()
     parser.add_argument("--file-format", dest="file_format",
                         help="xlsx - Create an Excel report\n"
                              "pdf - Create a PDF report\n"
-                             "html - Create n HTML report", default='xlsx')
+                             "html - Create n HTML report\n"
+                             "Overrides FILE_FORMAT of the configuration file")
+    parser.add_argument("--clear-cache", dest="clear_cache", action="store_true",
+                        help="Remove the cached query results so that the metadata is read from the databases again")
+    parser.add_argument("--from-snapshot", dest="from_snapshot",
+                        help="Create the report from a snapshot saved by a previous run, without connecting to the "
+                             "databases")
+    parser.add_argument("--config", dest="config", action="append", default=[], metavar="NAME=VALUE",
+                        help="Overrides a property of the configuration file and of the environment variables, such "
+                             "as --config SOURCE_CONCURRENCY=8. Can be repeated")
 
     return parser.parse_args()
 
 
+def set_configuration_overrides(args):
+    overrides = {FILE_FORMAT: args.file_format}
+    for option in args.config:
+        name, separator, value = option.partition('=')
+        if not separator:
+            print(f"Invalid configuration override: {option}. Use NAME=VALUE")
+            print("Exiting..")
+            exit()
+        overrides[name.strip()] = value.strip()
+
+    Configuration.get_instance().set_overrides(overrides)
+
+
 def create_directories():
     if not os.path.exists(OUTPUT_DIR):
         logger.info("Output directory doesn't currently exist. Creating  now...")
@@ -45,21 +72,44 @@ def create_directories():
 
 
 if __name__ == '__main__':
+    args = set_arguments()
+    set_configuration_overrides(args)
     logger = get_logger(__name__)
     logger.info("STARTING EXECUTION")
-    args = set_arguments()
 
     file_format = CommonUtility.read_configurations(FILE_FORMAT, CONFIG_FILE, SECTION_FILE_FORMAT).lower()
 
     create_directories()
 
+    if args.clear_cache:
+        from database.database_engine import get_query_cache
+        query_cache = get_query_cache()
+        if query_cache is not None:
+            query_cache.invalidate()
+
     if file_format not in format_mapping.keys():
         print("Select format as one of xlsx, pdf, html")
         print("Exiting..")
         exit()
 
-    migration_summary = MigrationSummaryObject(file_format=file_format)
-    migration_summary.generate_report_data()
-    report = format_mapping[file_format](migration_summary)
+    template_class = get_template_class(file_format)
+    from src.report_generator import MigrationSummaryObject
+
+    extraction_engine = CommonUtility.read_configurations(EXTRACTION_ENGINE, CONFIG_FILE, SECTION_EXTRACTION).lower()
+    if extraction_engine == EXTRACTION_ENGINE_ASYNCIO:
+        from src.async_report_generator import AsyncMigrationSummaryObject
+        summary_class = AsyncMigrationSummaryObject
+    else:
+        summary_class = MigrationSummaryObject
+
+    if args.from_snapshot:
+        migration_summary = MigrationSummaryObject.from_snapshot(args.from_snapshot, file_format)
+    else:
+        migration_summary = summary_class(file_format=file_format)
+        migration_summary.generate_report_data()
+        if CommonUtility.read_boolean_configuration(SAVE_SNAPSHOT, CONFIG_FILE, SECTION_FILE_FORMAT):
+            migration_summary.save_snapshot()
+
+    report = template_class(migration_summary)
 
     logger.info(f"\n\nFINISHED EXECUTION: File - {migration_summary.output_file_name}")
@@ -1,36 +1,80 @@
-import json
+import gzip
+import hashlib
 import os.path
+import re
+import tempfile
+from collections import namedtuple
 from datetime import datetime
+from functools import partial
 from time import strftime, gmtime
-from sqlalchemy import text
 from database import *
-from database.database_engine import SourceDatabase, TargetDatabase
+from database.database_engine import create_databases
 from database.database_queries import *
+from database.dialects import supports
 from src import *
-from logger import get_logger
+from src.catalog import ObjectNames
+from src.data_validator import ChecksumValidator
+from src.diff_engine import DiffEngine
+from src.external_diff_engine import ExternalDiffEngine
+from src.row_counter import ExactRowCounter, TieredRowCounter
+from src.spill import CatalogSpill, dump_spilled, load_spilled
+from src.scheduler import ExtractionScheduler
+from logger import DebugPayload, get_logger
 from src.utility.utils import CommonUtility
 
+# Number of objects of one type in a schema and the digest of their names, as returned by GET_OBJECT_DIGESTS
+ObjectDigest = namedtuple('ObjectDigest', [OBJECT_COUNT, DISTINCT_COUNT, DIGEST])
+
 
 class MigrationSummaryObject:
     objects = ['table', 'view', 'procedure', 'function', 'index', 'trigger', 'constraint',
                'sequence']
+    # Attributes saved to the snapshot, which are all that the templates need for creating the report
+    snapshot_attributes = ['db_type_source', 'db_type_target', 'combined_row_count_data', 'database_summary',
+                           'missing_schemas', 'validation_data', 'comparison_data', 'data_validation_data',
+                           'spot_check_data']
 
     def __init__(self, file_format):
         self.database_summary = None
         self.logger = get_logger(__name__)
 
-        self.source_db = SourceDatabase()
-        self.target_db = TargetDatabase()
+        self.source_db, self.target_db = create_databases()
 
         self.db_type_source = self.source_db.db_type
         self.db_type_target = self.target_db.db_type
 
+        self.extraction_mode = CommonUtility.read_configurations(EXTRACTION_MODE, CONFIG_FILE,
+                                                                 SECTION_EXTRACTION).lower()
+        self.incremental = CommonUtility.read_boolean_configuration(INCREMENTAL, CONFIG_FILE, SECTION_EXTRACTION)
+        self.digest_comparison = CommonUtility.read_boolean_configuration(DIGEST_COMPARISON, CONFIG_FILE,
+                                                                          SECTION_EXTRACTION)
+        comparison_backend = CommonUtility.read_configurations(COMPARISON_BACKEND, CONFIG_FILE, SECTION_COMPARISON)
+        self.comparison_backend = comparison_backend.strip().lower() if comparison_backend \
+            else COMPARISON_BACKEND_PYTHON
+        # Memory budget in bytes of the bounded memory mode, which is off when no budget is configured
+        memory_budget = CommonUtility.read_configurations(MEMORY_BUDGET, CONFIG_FILE, SECTION_COMPARISON)
+        self.memory_budget = int(memory_budget or 0) * 1024 * 1024
+        self.spill_directory = None
+        self.row_counter = self.create_row_counter()
+        self.partition_row_count = CommonUtility.read_boolean_configuration(PARTITION_ROW_COUNT, CONFIG_FILE,
+                                                                            SECTION_ROW_COUNT)
+        self.data_validator = self.create_data_validator()
+        self.spot_checker = self.create_spot_checker()
+        source_concurrency = CommonUtility.read_configurations(SOURCE_CONCURRENCY, CONFIG_FILE, SECTION_EXTRACTION)
+        target_concurrency = CommonUtility.read_configurations(TARGET_CONCURRENCY, CONFIG_FILE, SECTION_EXTRACTION)
+        self.concurrency = {
+            SECTION_SOURCE: int(source_concurrency or DEFAULT_CONCURRENCY),
+            SECTION_TARGET: int(target_concurrency or DEFAULT_CONCURRENCY)
+        }
+        self.scheduler = ExtractionScheduler(self.concurrency[SECTION_SOURCE], self.concurrency[SECTION_TARGET])
+
         self.output_directory = os.path.join(CommonUtility.get_project_root(), OUTPUT_DIR)
-        self.output_file_name = os.path.join(self.output_directory, OUTPUT_FILE_FORMAT.format(self.source_db.db_type,
-                                                                                              self.target_db.db_type,
-                                                                                              strftime('%Y%m%d_%H%M%S',
-                                                                                                       gmtime()),
-                                                                                              file_format))
+        self.timestamp = strftime('%Y%m%d_%H%M%S', gmtime())
+        self.output_file_name = self.get_output_file_name(OUTPUT_FILE_FORMAT, file_format)
+
+        # Markers and objects of the previous run, and of this run, for the incremental mode
+        self.incremental_state = self.load_incremental_state() if self.incremental else {}
+        self.next_incremental_state = {}
 
         self.object_query_mapping = {
             SCHEMA: GET_SCHEMAS,
@@ -48,12 +92,177 @@ class MigrationSummaryObject:
 
         # Data
         self.combined_row_count_data = None
+        self.data_validation_data = None
+        self.spot_check_data = None
         self.validation_data = None
         self.comparison_data = None
         self.missing_schemas = []
 
         self.database_details = {}
 
+    def get_output_file_name(self, file_name_format, *args):
+        return os.path.join(self.output_directory, file_name_format.format(self.db_type_source, self.db_type_target,
+                                                                           self.timestamp, *args))
+
+    @classmethod
+    def from_snapshot(cls, snapshot_path, file_format):
+        """
+        Creates the summary object from a snapshot saved by save_snapshot. No connection is made to the databases,
+        the report is created from the data in the snapshot
+        """
+        summary = cls.__new__(cls)
+        summary.logger = get_logger(__name__)
+
+        try:
+            with gzip.open(snapshot_path, 'rb') as snapshot_file:
+                snapshot = load_spilled(snapshot_file)
+        except Exception as e:
+            summary.logger.error(f"Unable to read the snapshot {snapshot_path}: {e}")
+            exit(0)
+
+        if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+            summary.logger.error(f"The snapshot {snapshot_path} was created by an incompatible version of the tool")
+            exit(0)
+
+        # Attributes added after the version was last changed are missing from older snapshots
+        for attribute in cls.snapshot_attributes:
+            setattr(summary, attribute, snapshot.get(attribute))
+
+        summary.output_directory = os.path.join(CommonUtility.get_project_root(), OUTPUT_DIR)
+        summary.timestamp = strftime('%Y%m%d_%H%M%S', gmtime())
+        summary.output_file_name = summary.get_output_file_name(OUTPUT_FILE_FORMAT, file_format)
+        summary.logger.info(f"Loaded the report data from the snapshot {snapshot_path}")
+        return summary
+
+    def save_snapshot(self):
+        """
+        Saves the report data to a compressed snapshot in the output directory. The report can be created again
+        from the snapshot in any format with --from-snapshot
+        :return: Path of the snapshot
+        """
+        snapshot = {attribute: getattr(self, attribute) for attribute in self.snapshot_attributes}
+        snapshot['version'] = SNAPSHOT_VERSION
+
+        snapshot_path = self.get_output_file_name(SNAPSHOT_FILE_FORMAT)
+        with gzip.open(snapshot_path, 'wb') as snapshot_file:
+            # The object names spilled in the bounded memory mode are streamed to the snapshot from the spill files
+            dump_spilled(snapshot, snapshot_file)
+
+        self.logger.info(f"Saved the report data to the snapshot {snapshot_path}")
+        return snapshot_path
+
+    def get_incremental_state_path(self):
+        """
+        The incremental state is kept per pair of source and target database
+        """
+        databases = repr([(database.host, database.port, database.database)
+                          for database in (self.source_db, self.target_db)])
+        key = hashlib.sha256(databases.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.output_directory,
+                            INCREMENTAL_STATE_FILE_FORMAT.format(self.db_type_source, self.db_type_target, key))
+
+    def load_incremental_state(self):
+        """
+        Loads the DDL markers and the objects of each schema from the previous run
+        """
+        state_path = self.get_incremental_state_path()
+        if not os.path.exists(state_path):
+            self.logger.info("No previous run found for the incremental mode, all the schemas are read")
+            return {}
+
+        try:
+            # In the bounded memory mode the objects of the previous run are copied to a spill file instead of being
+            # loaded in memory
+            spill_path = os.path.join(self.get_spill_directory(), INCREMENTAL_STATE_SPILL_FILE) \
+                if self.memory_budget else None
+            with gzip.open(state_path, 'rb') as state_file:
+                state = load_spilled(state_file, spill_path)
+        except Exception as e:
+            self.logger.warning(f"Unable to read the incremental state {state_path}, all the schemas are read: {e}")
+            return {}
+
+        if not isinstance(state, dict) or state.get('version') != SNAPSHOT_VERSION:
+            self.logger.warning(f"Ignoring the incremental state {state_path} of an incompatible version")
+            return {}
+
+        return state
+
+    def save_incremental_state(self):
+        """
+        Saves the DDL markers and the objects of each schema read in this run, for the next incremental run
+        """
+        if not self.incremental or not self.next_incremental_state:
+            return
+
+        state = dict(self.next_incremental_state)
+        state['version'] = SNAPSHOT_VERSION
+
+        state_path = self.get_incremental_state_path()
+        # Written to a temporary file first, so that an interrupted run does not leave a corrupt state behind
+        with gzip.open(state_path + '.tmp', 'wb') as state_file:
+            dump_spilled(state, state_file)
+        os.replace(state_path + '.tmp', state_path)
+
+    @staticmethod
+    def build_ddl_markers(schema_names, rows):
+        """
+        Maps each schema to its DDL marker. Schemas without any objects do not return a row and get an empty marker
+        """
+        markers = {schema.lower(): '' for schema in schema_names}
+        markers.update({row[SCHEMA_NAME].lower(): str(row[DDL_MARKER]) for row in rows})
+        return markers
+
+    def get_ddl_markers(self, database, db_type, schema_names):
+        rows = []
+        for i in range(0, len(schema_names), SCHEMA_BATCH_SIZE):
+            # Bypass the query cache, the markers have to be read from the database on every run
+            rows.extend(database.execute_query(GET_SCHEMA_DDL_MARKERS[db_type],
+                                               self.get_schema_parameters(schema_names[i:i + SCHEMA_BATCH_SIZE]),
+                                               use_cache=False))
+
+        return self.build_ddl_markers(schema_names, rows)
+
+    def get_changed_schemas(self, category, markers):
+        """
+        Gets the schemas which are new or whose DDL marker differs from the previous run
+        """
+        previous = self.incremental_state.get(category, {})
+        previous_markers = previous.get(DDL_MARKERS, {})
+        previous_objects = previous.get(OBJECTS, {})
+
+        changed_schemas = [schema for schema, marker in markers.items()
+                           if schema not in previous_objects or previous_markers.get(schema) != marker]
+        self.logger.info(f"{len(changed_schemas)} of {len(markers)} {category} schema(s) changed since the previous "
+                         f"run")
+        return changed_schemas
+
+    def merge_schema_objects(self, category, markers, schema_objects):
+        """
+        Takes the objects of the unchanged schemas from the previous run and keeps the result for the next run
+        """
+        previous_objects = self.incremental_state.get(category, {}).get(OBJECTS, {})
+        merged_objects = {schema: schema_objects[schema] if schema in schema_objects else previous_objects[schema]
+                          for schema in markers}
+
+        self.next_incremental_state[category] = {DDL_MARKERS: markers, OBJECTS: merged_objects}
+        return merged_objects
+
+    def get_changed_schema_objects(self, database, db_type, schema_names, category):
+        """
+        Same as get_schema_objects. In the incremental mode only the schemas which changed since the previous run
+        are read from the database
+        """
+        if not self.incremental or not supports(db_type, CAPABILITY_DDL_MARKERS):
+            return self.get_schema_objects(database, db_type, schema_names, category)
+
+        # The markers are read before the objects, so that changes made during the run are picked up by the next run
+        markers = self.get_ddl_markers(database, db_type, schema_names)
+        changed_schemas = self.get_changed_schemas(category, markers)
+        schema_objects = self.get_schema_objects(database, db_type, changed_schemas, category) \
+            if changed_schemas else {}
+
+        return self.merge_schema_objects(category, markers, schema_objects)
+
     def __repr__(self):
         print(f"Validation data: \n{self.validation_data}")
         print(f"Comparison data: \n{self.comparison_data}")
@@ -63,54 +272,148 @@ class MigrationSummaryObject:
         Gets the names for the schemas for the source database.
         Note: If the database type is Oracle, the username for the database is used as the schema
         """
-        if self.db_type_source == ORACLE:
-            query = GET_SCHEMAS[self.db_type_source].format(self.source_db.username)
-            source_schemas = self.source_db.execute_query(query)
-        else:
-            source_schemas = self.source_db.execute_query(GET_SCHEMAS[self.db_type_source])
-
-        return source_schemas
+        return self.source_db.execute_query(GET_SCHEMAS[self.db_type_source])
 
     def get_target_schemas(self):
         """
         Gets the names for the schemas for the target database.
         Note: If the database type is Oracle, the username for the database is used as the schema
         """
-        if self.db_type_target == ORACLE:
-            query = GET_SCHEMAS[self.db_type_target].format(self.target_db.username)
-            target_schemas = self.target_db.execute_query(query)
-        else:
-            target_schemas = self.target_db.execute_query(GET_SCHEMAS[self.db_type_target])
+        return self.target_db.execute_query(GET_SCHEMAS[self.db_type_target])
 
-        return target_schemas
+    @staticmethod
+    def get_schema_parameters(schema_names):
+        """
+        Binds the schema names to the "IN :schema_names" filter of the object queries
+        """
+        return {SCHEMA_NAMES: [schema.lower() for schema in schema_names]}
 
-    def get_source_data(self, schema, db_object):
-        self.logger.debug(f"Source data for SCHEMA: {schema} OBJECT: {db_object}")
-        data = self.source_db.execute_query(
-            self.object_query_mapping[db_object][self.db_type_source].format(schema))
-        self.logger.debug(f"{json.dumps(data, indent=4)}")
-        return data
+    def get_schema_batches(self, db_type, schema_names):
+        """
+        In the bulk extraction mode the schemas are split in batches of SCHEMA_BATCH_SIZE, otherwise every schema is
+        a batch of its own. Dialects whose object queries cannot filter on a list of schemas are always read per schema
+        """
+        if self.extraction_mode == EXTRACTION_MODE_SCHEMA or not supports(db_type, CAPABILITY_BULK_CATALOG_QUERY):
+            return [[schema] for schema in schema_names]
+
+        return [schema_names[i:i + SCHEMA_BATCH_SIZE] for i in range(0, len(schema_names), SCHEMA_BATCH_SIZE)]
 
-    def get_target_data(self, schema, db_object):
-        self.logger.debug(f"Target data for SCHEMA: {schema} OBJECT: {db_object}")
-        data = self.target_db.execute_query(
-            self.object_query_mapping[db_object][self.db_type_target].format(schema))
-        self.logger.debug(f"{json.dumps(data, indent=4)}")
-        return data
+    def get_schema_objects(self, database, db_type, schema_names, category, object_schemas=None):
+        """
+        Gets the names of all the objects for the given schemas in the following structure:
+        {
+            "SCHEMA_NAME": {"OBJECT_TYPE": ObjectNames(["object_name", ...])}
+        }
+        In the bulk extraction mode each object type is fetched for a whole batch of schemas in a single query and
+        the rows are bucketed by schema. Otherwise one query is run per schema and object type.
+        :param object_schemas: Optional dictionary with the schemas to read for each object type. By default every
+        object type is read for all the schemas
+        """
+        schema_objects = {schema.lower(): {obj: ObjectNames() for obj in self.objects} for schema in schema_names}
+        spill = self.create_catalog_spill(category)
+        fetch_objects = partial(self.spill_objects, spill) if spill is not None else self.fetch_objects
+
+        # The object types and schema batches are independent of each other, so they are queried in parallel up to
+        # the concurrency limit of the database
+        futures = []
+        for obj in self.objects:
+            if obj not in self.object_query_mapping:
+                continue
+
+            for schema_batch in self.get_schema_batches(db_type, schema_names if object_schemas is None
+                                                        else object_schemas.get(obj, [])):
+                self.logger.info(f"Getting {obj.upper()} objects for {len(schema_batch)} {category} schema(s)")
+                query = self.object_query_mapping[obj][db_type]
+                futures.append((obj, self.scheduler.submit(category, fetch_objects, database, query, obj,
+                                                           self.get_schema_parameters(schema_batch))))
+
+        # The schema batches do not overlap, so every schema and object type is read by a single query
+        for obj, future in futures:
+            for schema_name, object_names in future.result().items():
+                if schema_name in schema_objects:
+                    schema_objects[schema_name][obj] = object_names
+
+        if spill is not None:
+            self.add_spilled_objects(schema_objects, spill)
+
+        self.logger.debug("%s", DebugPayload(schema_objects))
+        return schema_objects
+
+    @staticmethod
+    def fetch_objects(database, query, db_object, params):
+        """
+        Runs an object query and returns the names of the objects of each schema in lower case, as ObjectNames
+        """
+        rows = (row for batch in database.execute_query_stream(query, params=params) for row in batch)
+        return ObjectNames.group_by_schema((row.schema_name, getattr(row, db_object + '_name')) for row in rows)
+
+    def get_spill_directory(self):
+        """
+        Creates the temporary directory of the spill files the first time it is needed. It is removed when the
+        program exits, once the report has been written
+        """
+        if self.spill_directory is None:
+            self.spill_directory = tempfile.TemporaryDirectory(prefix=SPILL_DIRECTORY_PREFIX)
+            self.logger.info(f"Spilling the catalogs to {self.spill_directory.name}")
+        return self.spill_directory.name
+
+    def create_catalog_spill(self, category):
+        """
+        In the bounded memory mode the objects are spilled to disk as they are read. The budget is shared by all the
+        object queries which can run at once on both databases
+        :return: CatalogSpill object, or None if no memory budget is configured
+        """
+        if not self.memory_budget:
+            return None
+
+        run_size = self.memory_budget // (self.concurrency[SECTION_SOURCE] + self.concurrency[SECTION_TARGET])
+        return CatalogSpill(self.get_spill_directory(), category, run_size)
+
+    @staticmethod
+    def spill_objects(spill, database, query, db_object, params):
+        """
+        Same as fetch_objects, with the rows written to the spill instead of being returned
+        """
+        rows = (row for batch in database.execute_query_stream(query, params=params) for row in batch)
+        spill.add(db_object, ((row.schema_name, getattr(row, db_object + '_name')) for row in rows))
+        return {}
+
+    @staticmethod
+    def add_spilled_objects(schema_objects, spill):
+        for (schema_name, obj), object_names in spill.merge().items():
+            if schema_name in schema_objects:
+                schema_objects[schema_name][obj] = object_names
+
+        return schema_objects
+
+    @staticmethod
+    def get_datatype_details(database, query):
+        """
+        Streams the datatype details and keeps only the columns used in the report
+        """
+        details = []
+        for batch in database.execute_query_stream(query):
+            details.extend({SCHEMA_NAME: row.schema_name, TABLE_NAME: row.table_name,
+                            COLUMN_NAME: row.column_name, DATA_TYPE: row.data_type} for row in batch)
+        return details
 
     def get_datatype_data(self):
-        data_source = self.source_db.execute_query(self.object_query_mapping[DATATYPE_COUNT][self.db_type_source])
-        data_target = self.target_db.execute_query(self.object_query_mapping[DATATYPE_COUNT][self.db_type_target])
+        data_source, data_target = self.scheduler.run_both(
+            partial(self.source_db.execute_query, self.object_query_mapping[DATATYPE_COUNT][self.db_type_source]),
+            partial(self.target_db.execute_query, self.object_query_mapping[DATATYPE_COUNT][self.db_type_target])
+        )
 
         count_data = {
             DATATYPE_COUNT_SOURCE: data_source,
             DATATYPE_COUNT_TARGET: data_target
         }
 
-        datatype_details_source = self.source_db.execute_query(self.object_query_mapping[DATATYPE_DETAILS]
-                                                               [self.db_type_source])
-        datatype_details_target = self.target_db.execute_query(self.object_query_mapping[DATATYPE_DETAILS]
-                                                               [self.db_type_target])
+        datatype_details_source, datatype_details_target = self.scheduler.run_both(
+            partial(self.get_datatype_details, self.source_db,
+                    self.object_query_mapping[DATATYPE_DETAILS][self.db_type_source]),
+            partial(self.get_datatype_details, self.target_db,
+                    self.object_query_mapping[DATATYPE_DETAILS][self.db_type_target])
+        )
 
         datatype_details = {
             DATATYPE_DETAILS_SOURCE: datatype_details_source,
@@ -118,7 +421,134 @@ class MigrationSummaryObject:
         }
         return count_data, datatype_details
 
+    def use_digest_comparison(self):
+        """
+        The digest comparison needs a digest query for both database types. The incremental mode stores the object
+        names of every schema, so it takes precedence over the digest comparison
+        """
+        return self.digest_comparison and not self.incremental and \
+            supports(self.db_type_source, CAPABILITY_OBJECT_DIGESTS) and \
+            supports(self.db_type_target, CAPABILITY_OBJECT_DIGESTS)
+
+    def get_digest_query(self, db_type, obj):
+        """
+        Wraps the object query in the digest query of the database type. The ORDER BY of the object query is
+        removed, as it is not allowed in a derived table on every database type
+        """
+        query = self.object_query_mapping[obj][db_type].strip().rstrip(';')
+        order_by = list(re.finditer(r'\border\s+by\b', query, re.IGNORECASE))
+        if order_by and ')' not in query[order_by[-1].start():]:
+            query = query[:order_by[-1].start()]
+
+        return GET_OBJECT_DIGESTS[db_type].format(query=query, column=obj + '_name')
+
+    @staticmethod
+    def build_object_digests(rows, db_object):
+        """
+        Keys the rows of a digest query by (schema name, object type)
+        """
+        return {(row[SCHEMA_NAME].lower(), db_object): ObjectDigest(int(row[OBJECT_COUNT]), int(row[DISTINCT_COUNT]),
+                                                                    int(row[DIGEST] or 0))
+                for row in rows}
+
+    def fetch_object_digests(self, database, query, db_object, params):
+        return self.build_object_digests(database.execute_query(query, params), db_object)
+
+    def get_object_digests(self, database, db_type, schema_names, category):
+        """
+        Gets the digest of the object names for every schema and object type
+        :return: Dictionary with the ObjectDigest of each (schema name, object type)
+        """
+        futures = []
+        for obj in self.objects:
+            if obj not in self.object_query_mapping:
+                continue
+
+            for schema_batch in self.get_schema_batches(db_type, schema_names):
+                futures.append(self.scheduler.submit(category, self.fetch_object_digests, database,
+                                                     self.get_digest_query(db_type, obj), obj,
+                                                     self.get_schema_parameters(schema_batch)))
+
+        digests = {}
+        for future in futures:
+            digests.update(future.result())
+        return digests
+
+    def compare_object_digests(self, source_names, target_names, source_digests, target_digests):
+        """
+        Compares the digests of the schemas present on both sides. The names only have to be read for the object
+        types whose digests differ, and for the schemas which are only present on one side
+        :return: The matching digests of each (schema name, object type), and the schemas to read for each object type
+        on the source and the target
+        """
+        common_schemas = set(x.lower() for x in source_names).intersection(x.lower() for x in target_names)
+        empty_digest = ObjectDigest(0, 0, 0)
+
+        matched_digests = {}
+        for schema in common_schemas:
+            for obj in self.objects:
+                source_digest = source_digests.get((schema, obj), empty_digest)
+                if source_digest == target_digests.get((schema, obj), empty_digest):
+                    matched_digests[(schema, obj)] = source_digest
+
+        source_object_schemas = {obj: [schema for schema in source_names if (schema.lower(), obj) not in
+                                       matched_digests] for obj in self.objects}
+        target_object_schemas = {obj: [schema for schema in target_names if (schema.lower(), obj) not in
+                                       matched_digests] for obj in self.objects}
+
+        self.logger.info(f"Digests matched for {len(matched_digests)} of {len(common_schemas) * len(self.objects)} "
+                         f"object types in the common schemas")
+        return matched_digests, source_object_schemas, target_object_schemas
+
+    @staticmethod
+    def add_object_digests(schema_objects, matched_digests):
+        for (schema, obj), digest in matched_digests.items():
+            if schema in schema_objects:
+                schema_objects[schema][obj] = digest
+
+        return schema_objects
+
+    def get_digest_compared_objects(self, source_names, target_names):
+        """
+        Reads the objects in two phases. First the digests of the object names are computed on both databases, then
+        the names are only read where the digests differ
+        """
+        source_digests, target_digests = self.scheduler.run_both(
+            partial(self.get_object_digests, self.source_db, self.db_type_source, source_names, SECTION_SOURCE),
+            partial(self.get_object_digests, self.target_db, self.db_type_target, target_names, SECTION_TARGET)
+        )
+        matched_digests, source_object_schemas, target_object_schemas = \
+            self.compare_object_digests(source_names, target_names, source_digests, target_digests)
+
+        source_objects, target_objects = self.scheduler.run_both(
+            partial(self.get_schema_objects, self.source_db, self.db_type_source, source_names, SECTION_SOURCE,
+                    source_object_schemas),
+            partial(self.get_schema_objects, self.target_db, self.db_type_target, target_names, SECTION_TARGET,
+                    target_object_schemas)
+        )
+
+        return (self.add_object_digests(source_objects, matched_digests),
+                self.add_object_digests(target_objects, matched_digests))
+
     def get_data(self, source_schemas, target_schemas):
+        self.logger.info("\n****** Getting data for the SOURCE and TARGET database ******")
+        source_names = [x[SCHEMA_NAME] for x in source_schemas]
+        target_names = [x[SCHEMA_NAME] for x in target_schemas]
+
+        if self.use_digest_comparison():
+            source_objects, target_objects = self.get_digest_compared_objects(source_names, target_names)
+        else:
+            source_objects, target_objects = self.scheduler.run_both(
+                partial(self.get_changed_schema_objects, self.source_db, self.db_type_source, source_names,
+                        SECTION_SOURCE),
+                partial(self.get_changed_schema_objects, self.target_db, self.db_type_target, target_names,
+                        SECTION_TARGET)
+            )
+            self.save_incremental_state()
+
+        return self.prepare_data(source_schemas, target_schemas, source_objects, target_objects)
+
+    def prepare_data(self, source_schemas, target_schemas, source_objects, target_objects):
         # Prepares a structure similar to this:
         # {
         #     "SCHEMA_NAME": {}
@@ -132,10 +562,8 @@ class MigrationSummaryObject:
 
         schema_level_counts = dict()
 
-        self.logger.info("\n****** Getting data for the SOURCE database ******")
         # For each schema in SQL get the different objects
         for schema in source_schemas:
-            self.logger.info(f"\n\nGetting SOURCE data for Schema: {schema[SCHEMA_NAME]}")
             schema_name = schema[SCHEMA_NAME]
             schema_name_lower = schema_name.lower()
 
@@ -145,38 +573,24 @@ class MigrationSummaryObject:
 
             all_object_count = 0
             for obj in self.objects:
-                self.logger.info(f"Getting {obj.upper()} objects for source")
-                data = self.get_source_data(schema_name, obj) if obj in self.object_query_mapping else []
-                final_data = []
-                for row in data:
-                    final_data.append(row[obj + '_name'].lower())
-
-                source_data[schema_name_lower][obj] = {}
-                source_data[schema_name_lower][obj][OBJECTS_SOURCE] = final_data
-                source_data[schema_name_lower][obj][NUM_SOURCE] = len(final_data)
+                final_data = source_objects[schema_name_lower][obj]
+
+                source_data[schema_name_lower][obj] = self.build_object_data(final_data, OBJECTS_SOURCE, NUM_SOURCE)
                 all_object_count += source_data[schema_name_lower][obj][NUM_SOURCE]
 
             schema_level_counts[schema_name_lower][NUM_SOURCE] = all_object_count
             schema_level_counts[schema_name_lower][NUM_TARGET] = 0
 
-        self.logger.info("\n\n****** Getting data for the TARGET database ******")
         # For each schema in PG get the different objects
         for schema in target_schemas:
-            self.logger.info(f"\n\nGetting TARGET data for Schema: {schema[SCHEMA_NAME]}")
             schema_name = schema[SCHEMA_NAME]
             schema_name_lower = schema_name.lower()
 
             all_object_count = 0
             for obj in self.objects:
-                self.logger.info(f"Getting {obj.upper()} objects for target")
-                data = self.get_target_data(schema_name, obj) if obj in self.object_query_mapping else []
-                final_data = []
-                for row in data:
-                    final_data.append(row[obj + '_name'].lower())
-
-                target_data[schema_name_lower][obj] = {}
-                target_data[schema_name_lower][obj][OBJECTS_TARGET] = final_data
-                target_data[schema_name_lower][obj][NUM_TARGET] = len(final_data)
+                final_data = target_objects[schema_name_lower][obj]
+
+                target_data[schema_name_lower][obj] = self.build_object_data(final_data, OBJECTS_TARGET, NUM_TARGET)
                 all_object_count += target_data[schema_name_lower][obj][NUM_TARGET]
 
             # Only add the total count when the schema is also present in the source
@@ -207,216 +621,213 @@ class MigrationSummaryObject:
 
         return source_data_final, target_data_final
 
-    def get_table_row_count_data(self):
+    @staticmethod
+    def build_object_data(objects, objects_key, count_key):
         """
-        Gets data for number of rows available in each of the tables
+        The names of the objects are not read when the digests of both sides matched. Only the number of objects is
+        kept in that case, along with the number of distinct names under MATCHED_OBJECTS
         """
+        if isinstance(objects, ObjectDigest):
+            return {objects_key: [], count_key: objects.object_count, MATCHED_OBJECTS: objects.distinct_count}
 
-        self.logger.info(f"Getting table row counts for source")
-        if self.db_type_source == ORACLE:
-            data_source = self.source_db.execute_query(
-                GET_TABLE_ROW_COUNTS[self.db_type_source].format(self.source_db.username)
-            )
-            self.logger.info(data_source)
-        else:
-            data_source = self.source_db.execute_query(GET_TABLE_ROW_COUNTS[self.db_type_source])
-
-        self.logger.info("Getting table row counts for target")
-        if self.db_type_target == ORACLE:
-            data_target = self.target_db.execute_query(
-                GET_TABLE_ROW_COUNTS[self.db_type_target].format(self.target_db.username)
-            )
-        else:
-            data_target = self.target_db.execute_query(GET_TABLE_ROW_COUNTS[self.db_type_target])
-
-        # schema_name , table_name, row_count
-        data_source_dict = {(x[SCHEMA_NAME], x[TABLE_NAME]): {ROW_COUNT: x[ROW_COUNT]} for x in data_source}
-        data_target_dict = {(x[SCHEMA_NAME], x[TABLE_NAME]): {ROW_COUNT: x[ROW_COUNT]} for x in data_target}
-
-        for key in data_source_dict:
-            if key in data_target_dict:
-                if data_source_dict[key] != data_target_dict[key]:
-                    data_source_dict[key][COLOR] = COLOR_YELLOW
-                else:
-                    data_source_dict[key][COLOR] = COLOR_GREEN
-            else:
-                data_source_dict[key][COLOR] = COLOR_RED
-
-        return data_source_dict, data_target_dict
+        return {objects_key: objects, count_key: len(objects)}
 
-    def prepare_comparison_data(self, source_data, target_data):
-        source_schemas_lower = [x.lower() for x in list(source_data.keys())]
-        target_schemas_lower = [x.lower() for x in list(target_data.keys())]
+    @staticmethod
+    def create_row_counter():
+        """
+        Creates the counter of the exact or tiered row counts. The concurrency is the number of tables counted at once
+        on each database and the timeout is in seconds per table
+        :return: ExactRowCounter or TieredRowCounter object, or None if the estimates of the catalog are used
+        """
+        row_count_mode = CommonUtility.read_configurations(ROW_COUNT_MODE, CONFIG_FILE, SECTION_ROW_COUNT)
+        row_count_mode = row_count_mode.strip().lower() if row_count_mode else ROW_COUNT_MODE_ESTIMATE
+        if row_count_mode not in (ROW_COUNT_MODE_EXACT, ROW_COUNT_MODE_TIERED):
+            return None
+
+        concurrency = CommonUtility.read_configurations(ROW_COUNT_CONCURRENCY, CONFIG_FILE, SECTION_ROW_COUNT)
+        timeout = CommonUtility.read_configurations(ROW_COUNT_TIMEOUT, CONFIG_FILE, SECTION_ROW_COUNT)
+        counter = ExactRowCounter(int(concurrency or DEFAULT_CONCURRENCY), int(timeout or DEFAULT_ROW_COUNT_TIMEOUT))
+        if row_count_mode == ROW_COUNT_MODE_EXACT:
+            return counter
+
+        sample_percent = CommonUtility.read_configurations(ROW_COUNT_SAMPLE_PERCENT, CONFIG_FILE, SECTION_ROW_COUNT)
+        tolerance = CommonUtility.read_configurations(ROW_COUNT_SAMPLE_TOLERANCE, CONFIG_FILE, SECTION_ROW_COUNT)
+        min_sample_rows = CommonUtility.read_configurations(ROW_COUNT_SAMPLE_MIN_ROWS, CONFIG_FILE, SECTION_ROW_COUNT)
+        return TieredRowCounter(counter, float(sample_percent or DEFAULT_SAMPLE_PERCENT),
+                                float(tolerance or DEFAULT_SAMPLE_TOLERANCE),
+                                int(min_sample_rows or DEFAULT_SAMPLE_MIN_ROWS))
 
-        all_schemas = list(set(source_schemas_lower).union(set(target_schemas_lower)))
+    @staticmethod
+    def create_data_validator():
+        """
+        Creates the validator of the data of the tables. The chunk sizes are numbers of rows and the timeout is in
+        seconds per query
+        :return: ChecksumValidator object, or None if the data is not validated
+        """
+        if not CommonUtility.read_boolean_configuration(DATA_VALIDATION, CONFIG_FILE, SECTION_DATA_VALIDATION):
+            return None
+
+        chunk_rows = CommonUtility.read_configurations(CHECKSUM_CHUNK_ROWS, CONFIG_FILE, SECTION_DATA_VALIDATION)
+        min_chunk_rows = CommonUtility.read_configurations(CHECKSUM_MIN_CHUNK_ROWS, CONFIG_FILE,
+                                                           SECTION_DATA_VALIDATION)
+        timeout = CommonUtility.read_configurations(CHECKSUM_TIMEOUT, CONFIG_FILE, SECTION_DATA_VALIDATION)
+        return ChecksumValidator(int(chunk_rows or DEFAULT_CHECKSUM_CHUNK_ROWS),
+                                 int(min_chunk_rows or DEFAULT_CHECKSUM_MIN_CHUNK_ROWS),
+                                 int(timeout or DEFAULT_CHECKSUM_TIMEOUT))
+
+    def get_data_validation_data(self):
+        """
+        Compares the checksums of the data of the tables of both databases
+        :return: Dictionary with the result of each table, or None if a dialect cannot compute the checksums
+        """
+        for db_type in (self.db_type_source, self.db_type_target):
+            if not supports(db_type, CAPABILITY_SERVER_SIDE_HASHING):
+                self.logger.warning(f"The data is not validated, as {db_type} databases cannot compute checksums")
+                return None
 
-        final_data = dict(zip(all_schemas, [{} for _ in range(len(all_schemas))]))
+        return self.data_validator.validate(self.scheduler.submit, self.source_db, self.db_type_source,
+                                            self.target_db, self.db_type_target,
+                                            self.combined_row_count_data[SECTION_SOURCE])
 
-        lst = []
-        for schema in all_schemas:
-            schema_data = {}
-            source_total_object_count = 0
-            target_total_object_count = 0
+    @staticmethod
+    def create_spot_checker():
+        """
+        Creates the spot checker of the data of the tables, whose queries have the timeout of the checksum queries
+        :return: SpotChecker object, or None if the data is not spot checked
+        """
+        if not CommonUtility.read_boolean_configuration(SPOT_CHECK, CONFIG_FILE, SECTION_DATA_VALIDATION):
+            return None
+
+        sample_size = CommonUtility.read_configurations(SPOT_CHECK_SAMPLE_SIZE, CONFIG_FILE, SECTION_DATA_VALIDATION)
+        confidence = CommonUtility.read_configurations(SPOT_CHECK_CONFIDENCE, CONFIG_FILE, SECTION_DATA_VALIDATION)
+        timeout = CommonUtility.read_configurations(CHECKSUM_TIMEOUT, CONFIG_FILE, SECTION_DATA_VALIDATION)
+        from src.spot_checker import SpotChecker
+        return SpotChecker(int(sample_size or DEFAULT_SPOT_CHECK_SAMPLE_SIZE),
+                           float(confidence or DEFAULT_SPOT_CHECK_CONFIDENCE),
+                           int(timeout or DEFAULT_CHECKSUM_TIMEOUT))
+
+    def get_spot_check_data(self):
+        """
+        Compares a random sample of the rows of the tables of both databases
+        """
+        return self.spot_checker.validate(self.scheduler.submit, self.source_db, self.db_type_source,
+                                          self.target_db, self.db_type_target,
+                                          self.combined_row_count_data[SECTION_SOURCE])
 
-            for obj in self.objects:
-                empty_source = {OBJECTS_SOURCE: [''], NUM_SOURCE: 0}
-                empty_target = {OBJECTS_TARGET: [''], NUM_TARGET: 0}
+    def get_partitions(self, database, db_type, category):
+        """
+        Gets the partitions of the partitioned tables of one database, with their estimated row counts
+        """
+        if not self.partition_row_count or not supports(db_type, CAPABILITY_PARTITIONS):
+            return []
 
-                source_data_ = source_data[schema][obj] if schema in source_data else empty_source
-                target_data_ = target_data[schema][obj] if schema in target_data and obj in \
-                                                           target_data[schema] else empty_target
+        self.logger.info(f"Getting partition row counts for {category}")
+        return database.execute_query(GET_PARTITIONED_INDEX[db_type])
 
-                # Update totals:
-                source_total_object_count += source_data_[NUM_SOURCE]
-                target_total_object_count += target_data_[NUM_TARGET]
+    def get_row_counts(self, database, db_type, category):
+        """
+        Gets the number of rows available in each of the tables and partitions of one database
+        :return: Tuple with the row counts of the tables and of the partitions
+        """
+        self.logger.info(f"Getting table row counts for {category}")
+        row_counts = database.execute_query(GET_TABLE_ROW_COUNTS[db_type])
+        partitions = self.get_partitions(database, db_type, category)
+        if isinstance(self.row_counter, ExactRowCounter):
+            return self.row_counter.count_partitioned_tables(database, db_type, row_counts, partitions, category)
 
-                source_data_set = set(source_data_[OBJECTS_SOURCE])
-                target_data_set = set(target_data_[OBJECTS_TARGET])
-                intersection_set = set(source_data_set).intersection(set(target_data_set))
+        return row_counts, partitions
 
-                # Remove the objects that occur in both
-                source_data_[OBJECTS_SOURCE] = list(source_data_set - intersection_set)
-                target_data_[OBJECTS_TARGET] = list(target_data_set - intersection_set)
+    def get_table_row_count_data(self):
+        """
+        Gets data for number of rows available in each of the tables
+        """
+        source_counts, target_counts = self.scheduler.run_both(
+            partial(self.get_row_counts, self.source_db, self.db_type_source, SECTION_SOURCE),
+            partial(self.get_row_counts, self.target_db, self.db_type_target, SECTION_TARGET)
+        )
 
-                source_data_[OBJECTS_SOURCE].sort()
-                target_data_[OBJECTS_TARGET].sort()
+        return self.build_row_count_data(source_counts, target_counts)
 
-                source_data_.update(target_data_)
-                schema_data[obj] = source_data_
-            final_data[schema][
-                DISPLAY_FLAG] = True if source_total_object_count and target_total_object_count else False
-            final_data[schema][ALL_ITEMS] = schema_data
-            lst.append((schema, schema_data))
+    def build_row_count_data(self, source_counts, target_counts):
+        """
+        Verifies the row counts in tiers in the tiered mode, then compares the row counts of both databases
+        :param source_counts: Tuple with the row counts of the tables and of the partitions of the source
+        :return: Dictionary with the row count data of the source and the target, and of their partitions when the
+        partitions are counted
+        """
+        (data_source, source_partitions), (data_target, target_partitions) = source_counts, target_counts
+        if isinstance(self.row_counter, TieredRowCounter):
+            data_source, data_target = self.row_counter.count_tables(
+                self.scheduler.run_both, self.source_db, self.db_type_source, data_source, self.target_db,
+                self.db_type_target, data_target)
+            source_partitions, target_partitions = self.row_counter.count_partitions(
+                self.scheduler.run_both, self.source_db, self.db_type_source, source_partitions, self.target_db,
+                self.db_type_target, target_partitions, data_source, data_target)
+
+        source_row_count, target_row_count = self.compare_row_counts(data_source, data_target)
+        row_count_data = {
+            SECTION_SOURCE: source_row_count,
+            SECTION_TARGET: target_row_count
+        }
+        if self.partition_row_count:
+            source_partition_count, target_partition_count = self.compare_row_counts(
+                source_partitions, target_partitions, (SCHEMA_NAME, TABLE_NAME, PARTITION_NUMBER))
+            row_count_data[PARTITIONS] = {
+                SECTION_SOURCE: source_partition_count,
+                SECTION_TARGET: target_partition_count
+            }
 
-        return final_data
+        return row_count_data
 
-    @staticmethod
-    def get_validation_data(source_data, target_data):
+    def compare_row_counts(self, data_source, data_target, key_columns=(SCHEMA_NAME, TABLE_NAME)):
         """
-        For each schema in the data:
-            for each object:
-                turn all object names to lower case first
+        Colors the row count of each source table by comparing it with the target table
+        :param key_columns: Columns identifying a table, or a partition
         """
+        return self.get_diff_engine().compare_row_counts(data_source, data_target, key_columns)
 
-        validation_data = {
-            SCHEMA: {
-                MISSING_ITEMS: [],
-                ALL_ITEMS: [],
-                VALIDATION_PERCENT: 0.0,
-                TOTAL_SOURCE: 0,
-                TOTAL_TARGET: 0
-            },
-            OBJECTS: {
+    def get_diff_engine(self):
+        """
+        Creates the diff engine of the configured comparison backend. The columnar backend is meant for catalogs with
+        millions of objects. In the bounded memory mode the names are joined with a merge of the sorted spill files
+        """
+        if self.memory_budget:
+            return ExternalDiffEngine(self.objects, self.get_spill_directory())
 
-            }
-        }
+        if self.comparison_backend == COMPARISON_BACKEND_COLUMNAR:
+            # The columnar backend needs pandas, which is only imported when it is configured
+            from src.columnar_diff_engine import ColumnarDiffEngine
+            return ColumnarDiffEngine(self.objects)
 
-        # Schema validation
-        source_schemas = set(x.lower() for x in list(source_data.keys()))
-        target_schemas = set(x.lower() for x in list(target_data.keys()))
-
-        missing_schemas = source_schemas - target_schemas
-        validation_data[SCHEMA][MISSING_ITEMS] = list(missing_schemas)
-        validation_data[SCHEMA][ALL_ITEMS] = list(source_schemas)
-        validation_data[SCHEMA][VALIDATION_PERCENT] = (1 - (len(missing_schemas) / len(source_schemas))) * 100
-        validation_data[SCHEMA][VALIDATION_PERCENT] = round(validation_data[SCHEMA][VALIDATION_PERCENT], 2)
-
-        # Object validation
-        for schema in source_data:
-            validation_data[OBJECTS][schema] = {VALIDATION_PERCENT: 0}
-            num_source = 0
-            num_target = 0
-            num_missing_objects = 0
-            for obj in source_data[schema]:
-                validation_data[OBJECTS][schema][obj] = dict()
-                if schema in target_data and target_data[schema]:
-                    # Get the data for the particular object type
-                    source_objects = source_data[schema][obj][OBJECTS_SOURCE]
-                    target_objects = target_data[schema][obj][OBJECTS_TARGET]
-
-                    num_source += len(source_objects)
-                    num_target += len(target_objects)
-
-                    # Update overall counts for the schema
-
-                    source_objects_set = set(x.lower() for x in source_objects)
-                    target_objects_set = set(x.lower() for x in target_objects)
-
-                    missing_objects = source_objects_set - target_objects_set
-                    matches = source_objects_set.intersection(target_objects_set)
-
-                    num_missing_objects += len(missing_objects)
-                    validation_data[OBJECTS][schema][obj][MISSING_ITEMS] = list(missing_objects)
-                    validation_data[OBJECTS][schema][obj][ALL_ITEMS] = list(source_objects)
-                    validation_data[OBJECTS][schema][obj][VALIDATION_PERCENT] = (
-                                                                                        len(matches) / len(
-                                                                                    source_objects)) * 100 if len(
-                        source_objects) else 0.00
-
-                    # If the validation percent is greater than 100, set it to 100 only
-                    validation_data[OBJECTS][schema][obj][VALIDATION_PERCENT] = 100.00 if \
-                        validation_data[OBJECTS][schema][obj][VALIDATION_PERCENT] > 100 else \
-                        validation_data[OBJECTS][schema][obj][VALIDATION_PERCENT]
-
-                    validation_data[OBJECTS][schema][obj][VALIDATION_PERCENT] = \
-                        round(validation_data[OBJECTS][schema][obj][VALIDATION_PERCENT], 2)
-
-                    """
-                    validation_data[OBJECTS][schema][obj][REASON] = ("Count on source was 0" if len(source_objects) == 0 else
-                                                                     "Names didn't match") if len(
-                        missing_objects) != 0 or len(source_objects) == 0 \
-                        else ''
-
-                    
-                    if len(source_objects) == 0:
-                        validation_data[OBJECTS][schema][obj][REASON] = "Count on source was 0"
-                    elif len(target_objects) == 0:
-                        validation_data[OBJECTS][schema][obj][REASON] = "Count on target was 0"
-                    elif len(missing_objects) != 0 or len(source_objects) == 0:
-                        validation_data[OBJECTS][schema][obj][REASON] = "Object names didn't match"
-
-                    """
-                    if len(source_objects) == 0 and len(target_objects) > 0:
-                        reason = "Only present on target"
-                    elif len(source_objects) > 0 and len(target_objects) == 0:
-                        reason = "No objects were migrated"
-                    elif not len(source_objects) and not len(target_objects):
-                        reason = "No objects at source or target"
-                    elif len(source_objects) == len(target_objects) and missing_objects:
-                        reason = "Count matched, names didn't"
-                    elif len(source_objects) != len(target_objects) and missing_objects:
-                        reason = "Partially migrated"
-                    else:
-                        reason = "Counts and names matched"
-
-                    validation_data[OBJECTS][schema][obj][REASON] = reason
-                else:
-                    source_objects = source_data[schema][obj][OBJECTS_SOURCE]
-                    num_source += len(source_objects)
-
-                    validation_data[OBJECTS][schema][obj][MISSING_ITEMS] = list(source_objects)
-                    validation_data[OBJECTS][schema][obj][ALL_ITEMS] = []
-
-                    validation_data[OBJECTS][schema][obj][VALIDATION_PERCENT] = 0.00
-                    validation_data[OBJECTS][schema][obj][REASON] = 'Schema absent on destination'
-
-            if not num_target and not num_source:
-                validation_data[OBJECTS][schema][DISPLAY_FLAG] = False
-            else:
-                validation_data[OBJECTS][schema][DISPLAY_FLAG] = True
+        return DiffEngine(self.objects)
 
-            missing_fraction = num_missing_objects / num_source if num_source else 1
-            validation_data[OBJECTS][schema][VALIDATION_PERCENT] = (1 - missing_fraction) * 100 if \
-                num_target and num_source else 'NA'
+    def compare_objects(self, source_data, target_data):
+        """
+        Builds the validation data of the summary page and the comparison data of the schema pages
+        :return: Tuple with the validation data and the comparison data
+        """
+        return self.get_diff_engine().compare(source_data, target_data)
 
-            if validation_data[OBJECTS][schema][VALIDATION_PERCENT] != 'NA':
-                validation_data[OBJECTS][schema][VALIDATION_PERCENT] = 100.00 if \
-                    validation_data[OBJECTS][schema][VALIDATION_PERCENT] > 100 else \
-                    round(validation_data[OBJECTS][schema][VALIDATION_PERCENT], 2)
-                validation_data[OBJECTS][schema][VALIDATION_PERCENT] = \
-                    round(validation_data[OBJECTS][schema][VALIDATION_PERCENT], 2)
+    def get_database_detail(self, database, db_type, category):
+        """
+        Gets the version, size and encoding of one database. The three queries are run in parallel
+        """
+        version = self.scheduler.submit(category, database.execute_query, GET_VERSION[db_type])
+        database_size = self.scheduler.submit(category, database.execute_query, GET_DB_SIZE[db_type])
+        encoding = self.scheduler.submit(category, database.execute_query, GET_ENCODING[db_type])
+        return self.build_database_detail(database, db_type, version.result(), database_size.result(),
+                                          encoding.result())
 
-        return validation_data
+    @staticmethod
+    def build_database_detail(database, db_type, version, database_size, encoding):
+        return {
+            "type": db_type.upper(),
+            "name": database.database,
+            "host": database.host,
+            "version": version[0][VERSION],
+            "database_size": database_size[0][DATABASE_SIZE],
+            "encoding": encoding[0][ENCODING],
+        }
 
     def get_database_details(self):
         """
@@ -425,41 +836,17 @@ class MigrationSummaryObject:
         2. Schema sizes
         3. Encoding
         """
+        source_details, target_details = self.scheduler.run_both(
+            partial(self.get_database_detail, self.source_db, self.db_type_source, SECTION_SOURCE),
+            partial(self.get_database_detail, self.target_db, self.db_type_target, SECTION_TARGET)
+        )
         self.database_summary = {
-            "source": {
-                "type": self.db_type_source.upper(),
-                "name": self.source_db.database,
-                "host": self.source_db.host,
-                "version": self.source_db.execute_query(
-                    GET_VERSION[self.db_type_source]
-                )[0][VERSION],
-                "database_size": self.source_db.execute_query(
-                    GET_DB_SIZE[self.db_type_source].format(self.source_db.database)
-                )[0][DATABASE_SIZE],
-                "encoding": self.source_db.execute_query(
-                    GET_ENCODING[self.db_type_source].format(self.source_db.database)
-                )[0][ENCODING],
-            },
-            "target": {
-                "type": self.db_type_target.upper(),
-                "name": self.target_db.database,
-                "host": self.target_db.host,
-                "version": self.target_db.execute_query(
-                    GET_VERSION[self.db_type_target]
-                )[0][VERSION],
-                "database_size": self.target_db.execute_query(
-                    GET_DB_SIZE[self.db_type_target].format(self.target_db.database)
-                )[0][DATABASE_SIZE],
-                "encoding": self.target_db.execute_query(
-                    GET_ENCODING[self.db_type_target]
-                )[0][ENCODING],
-            }
+            "source": source_details,
+            "target": target_details
         }
 
     def get_schemas(self):
-        # Get source schemas
-        source_schemas = self.get_source_schemas()
-        target_schemas = self.get_target_schemas()
+        source_schemas, target_schemas = self.scheduler.run_both(self.get_source_schemas, self.get_target_schemas)
         missing_on_target = list(set([x[SCHEMA_NAME] for x in source_schemas]) - set([x[SCHEMA_NAME] for x in target_schemas]))
 
         return source_schemas, target_schemas, missing_on_target
@@ -468,11 +855,15 @@ class MigrationSummaryObject:
         start_time = datetime.now()
         self.logger.info(f"STARTED EXECUTION: {start_time}")
 
-        source_row_count, target_row_count = self.get_table_row_count_data()
-        self.combined_row_count_data = {
-            SECTION_SOURCE: source_row_count,
-            SECTION_TARGET: target_row_count
-        }
+        self.combined_row_count_data = self.get_table_row_count_data()
+
+        if self.data_validator is not None:
+            self.logger.info("\n*** Validating the data of the tables ***\n")
+            self.data_validation_data = self.get_data_validation_data()
+
+        if self.spot_checker is not None:
+            self.logger.info("\n*** Spot checking the data of the tables ***\n")
+            self.spot_check_data = self.get_spot_check_data()
 
         self.logger.info("\n*** Getting database details ***\n")
         self.get_database_details()
@@ -485,8 +876,10 @@ class MigrationSummaryObject:
 
         self.logger.info("\n**Getting validation data**\n")
         # Summary page
-        self.validation_data = self.get_validation_data(source_data, target_data)
+        self.validation_data, self.comparison_data = self.compare_objects(source_data, target_data)
 
-        self.comparison_data = self.prepare_comparison_data(source_data, target_data)
+        self.scheduler.shutdown()
+        self.source_db.close()
+        self.target_db.close()
 
         self.logger.info(f"\nTOTAL TIME TAKEN: {datetime.now() - start_time}")
\ No newline at end of file
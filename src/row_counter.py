@@ -0,0 +1,276 @@
+"""
+Exact and tiered row counts of the tables. The estimates kept in the catalogs of the databases are stale or missing
+right after a load, so the row count validation can count the rows of every table instead, or only of the tables whose
+estimates do not settle the comparison
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from time import perf_counter
+
+from database import CAPABILITY_PARTITION_TABLES, CAPABILITY_SAMPLED_ROW_COUNT, SECTION_SOURCE, SECTION_TARGET
+from database.database_queries import GET_EXACT_ROW_COUNT, GET_PARTITION_ROW_COUNT, GET_SAMPLED_ROW_COUNT
+from database.dialects import supports
+from logger import get_logger
+from src import *
+
+
+class ExactRowCounter:
+    """
+    Runs COUNT(*) on the tables of a database on a pool of concurrency workers. The tables with the largest
+    estimates are counted first, so that they do not end up running on their own at the end. A count which runs
+    into the timeout is cancelled by the database, and the table is reported without a row count
+    """
+
+    def __init__(self, concurrency, timeout):
+        self.logger = get_logger(__name__)
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    @staticmethod
+    def get_estimate(table):
+        # Tables which were never analyzed may be large, so they are scheduled with the largest tables
+        estimate = table[ROW_COUNT]
+        return float('inf') if estimate is None or estimate < 0 else estimate
+
+    @staticmethod
+    def get_query_arguments(database, table):
+        """
+        Quotes the names formatted into the counting queries. Rows of GET_PARTITIONED_INDEX also have the names of
+        the partition
+        """
+        arguments = {'table': database.quote_table(table[SCHEMA_IDENTIFIER], table[TABLE_IDENTIFIER])}
+        if PARTITION_NUMBER in table:
+            arguments[PARTITION_NUMBER] = int(table[PARTITION_NUMBER])
+            for key, argument in ((PARTITION_IDENTIFIER, 'partition'), (PARTITION_FUNCTION, PARTITION_FUNCTION),
+                                  (PARTITION_COLUMN, PARTITION_COLUMN)):
+                if table[key] is not None:
+                    arguments[argument] = database.quote_identifier(table[key])
+            if table[PARTITION_IDENTIFIER] is not None:
+                arguments['partition_table'] = database.quote_table(table[PARTITION_SCHEMA],
+                                                                    table[PARTITION_IDENTIFIER])
+        return arguments
+
+    def count_table(self, database, query, table, category):
+        """
+        :return: Number of rows of the table, or None if it could not be counted within the timeout
+        """
+        arguments = self.get_query_arguments(database, table)
+        table_name = arguments['table'] if PARTITION_NUMBER not in table else \
+            f"{arguments['table']} partition {arguments[PARTITION_NUMBER]}"
+        start = perf_counter()
+        try:
+            row_count = database.execute_scalar(query.format(**arguments), self.timeout)
+        except Exception as e:
+            self.logger.warning(f"Unable to count the rows of the {category} table {table_name} after "
+                                f"{perf_counter() - start:.1f} s: {e}")
+            return None
+
+        self.logger.debug(f"Counted {row_count} rows in the {category} table {table_name} in "
+                          f"{perf_counter() - start:.1f} s")
+        return int(row_count)
+
+    def count_rows(self, database, tables, category):
+        """
+        :param tables: Pairs of a table or partition and the query counting its rows
+        :return: The row counts, in the same order
+        """
+        self.logger.info(f"Counting the rows of {len(tables)} {category} tables with {self.concurrency} workers")
+        start = perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f"{category}_count") as executor:
+            futures = {id(table): executor.submit(self.count_table, database, query, table, category)
+                       for table, query in sorted(tables, key=lambda unit: self.get_estimate(unit[0]),
+                                                  reverse=True)}
+            row_counts = [futures[id(table)].result() for table, _ in tables]
+
+        uncounted = row_counts.count(None)
+        self.logger.info(f"Counted the rows of {len(tables) - uncounted} of {len(tables)} {category} tables in "
+                         f"{perf_counter() - start:.1f} s")
+        return row_counts
+
+    def count_tables(self, database, db_type, tables, category, query=None):
+        """
+        :param tables: Rows of GET_TABLE_ROW_COUNTS, with the estimated row counts
+        :param query: Optional counting query with the {table} placeholder. Defaults to GET_EXACT_ROW_COUNT
+        :return: The rows with the exact row counts, in the same order
+        """
+        query = query or GET_EXACT_ROW_COUNT[db_type]
+        row_counts = self.count_rows(database, [(table, query) for table in tables], category)
+        return [{SCHEMA_NAME: table[SCHEMA_NAME], TABLE_NAME: table[TABLE_NAME], ROW_COUNT: row_count}
+                for table, row_count in zip(tables, row_counts)]
+
+    def count_partitions(self, database, db_type, partitions, category):
+        """
+        :param partitions: Rows of GET_PARTITIONED_INDEX, with the estimated row counts
+        :return: The rows with the exact row counts of the partitions, in the same order
+        """
+        query = GET_PARTITION_ROW_COUNT[db_type]
+        row_counts = self.count_rows(database, [(partition, query) for partition in partitions], category)
+        return [{SCHEMA_NAME: partition[SCHEMA_NAME], TABLE_NAME: partition[TABLE_NAME],
+                 PARTITION_NUMBER: partition[PARTITION_NUMBER], ROW_COUNT: row_count}
+                for partition, row_count in zip(partitions, row_counts)]
+
+    def count_partitioned_tables(self, database, db_type, tables, partitions, category):
+        """
+        Counts the tables, and the partitions of the partitioned tables instead of the whole tables, all on the same
+        workers. The row count of a partitioned table is the sum of its partitions. For the dialects whose partitions
+        are tables of their own, like PostgreSQL, these tables take the row count of their partition. The partition
+        names of the other dialects are not table names, and a table of the same name is counted as usual
+        :param partitions: Rows of GET_PARTITIONED_INDEX, with the estimated row counts
+        :return: Tuple with the rows with the exact row counts of the tables and of the partitions
+        """
+        if not partitions:
+            return self.count_tables(database, db_type, tables, category), []
+
+        partition_tables = {(partition[SCHEMA_NAME], partition[TABLE_NAME]) for partition in partitions}
+        partitions_are_tables = supports(db_type, CAPABILITY_PARTITION_TABLES)
+        partition_names = {(partition[PARTITION_SCHEMA].lower(), partition[PARTITION_IDENTIFIER].lower())
+                           for partition in partitions if partition[PARTITION_IDENTIFIER] is not None} \
+            if partitions_are_tables else set()
+        counted_tables = [table for table in tables if (table[SCHEMA_NAME], table[TABLE_NAME]) not in
+                          partition_tables and (table[SCHEMA_NAME], table[TABLE_NAME]) not in partition_names]
+
+        exact_query = GET_EXACT_ROW_COUNT[db_type]
+        partition_query = GET_PARTITION_ROW_COUNT[db_type]
+        row_counts = self.count_rows(database, [(table, exact_query) for table in counted_tables] +
+                                     [(partition, partition_query) for partition in partitions], category)
+        table_counts = {(table[SCHEMA_NAME], table[TABLE_NAME]): row_count
+                        for table, row_count in zip(counted_tables, row_counts)}
+
+        partition_counts = []
+        for partition, row_count in zip(partitions, row_counts[len(counted_tables):]):
+            partition_counts.append({SCHEMA_NAME: partition[SCHEMA_NAME], TABLE_NAME: partition[TABLE_NAME],
+                                     PARTITION_NUMBER: partition[PARTITION_NUMBER], ROW_COUNT: row_count})
+            key = (partition[SCHEMA_NAME], partition[TABLE_NAME])
+            # A partition which could not be counted leaves the row count of its table unknown
+            table_counts[key] = None if row_count is None or (key in table_counts and table_counts[key] is None) \
+                else table_counts.get(key, 0) + row_count
+            if partitions_are_tables:
+                table_counts[partition[PARTITION_SCHEMA].lower(), partition[PARTITION_IDENTIFIER].lower()] = row_count
+
+        return [{SCHEMA_NAME: table[SCHEMA_NAME], TABLE_NAME: table[TABLE_NAME],
+                 ROW_COUNT: table_counts[table[SCHEMA_NAME], table[TABLE_NAME]]} for table in tables], \
+            partition_counts
+
+
+class TieredRowCounter:
+    """
+    Verifies the row counts in up to three tiers, so that only the tables which cannot be decided otherwise are
+    counted in full:
+        estimate - The estimates of both databases are equal, or the table is only present on one side
+        sample   - The counts estimated from a sample of both tables differ by more than the tolerance
+        exact    - The rows of the table were counted on both databases
+    The tier which decided each table is kept with its row count under ROW_COUNT_TIER
+    """
+
+    def __init__(self, counter, sample_percent, tolerance, min_sample_rows):
+        self.logger = get_logger(__name__)
+        self.counter = counter
+        self.sample_percent = sample_percent
+        self.tolerance = tolerance
+        self.min_sample_rows = min_sample_rows
+
+    @staticmethod
+    def get_row_counts(rows, tier):
+        return {(row[SCHEMA_NAME], row[TABLE_NAME]): {SCHEMA_NAME: row[SCHEMA_NAME], TABLE_NAME: row[TABLE_NAME],
+                                                      ROW_COUNT: row[ROW_COUNT], ROW_COUNT_TIER: tier,
+                                                      SCHEMA_IDENTIFIER: row[SCHEMA_IDENTIFIER],
+                                                      TABLE_IDENTIFIER: row[TABLE_IDENTIFIER]}
+                for row in rows}
+
+    @staticmethod
+    def estimates_match(source_count, target_count):
+        # Tables which were never analyzed have an estimate of 0 or -1, which does not tell anything about the table
+        return source_count is not None and source_count == target_count and source_count > 0
+
+    def is_sampled(self, source_count, target_count):
+        # Small tables are cheaper to count than to sample accurately
+        return max(source_count or 0, target_count or 0) >= self.min_sample_rows
+
+    def samples_differ(self, source_count, target_count):
+        if source_count is None or target_count is None:
+            return False
+
+        return abs(source_count - target_count) > max(source_count, target_count) * self.tolerance / 100
+
+    def count_tier(self, run_both, source, target, pending, queries):
+        """
+        Counts the pending tables on both databases in parallel
+        :param source: Tuple with the database, database type and row counts of the source
+        :return: Row counts of the source and the target, in the order of pending
+        """
+        (source_db, source_type, source_counts), (target_db, target_type, target_counts) = source, target
+        source_rows, target_rows = run_both(
+            partial(self.counter.count_tables, source_db, source_type, [source_counts[key] for key in pending],
+                    SECTION_SOURCE, queries.get(source_type)),
+            partial(self.counter.count_tables, target_db, target_type, [target_counts[key] for key in pending],
+                    SECTION_TARGET, queries.get(target_type))
+        )
+        return [row[ROW_COUNT] for row in source_rows], [row[ROW_COUNT] for row in target_rows]
+
+    def count_tables(self, run_both, source_db, source_type, source_rows, target_db, target_type, target_rows):
+        """
+        :param run_both: Function running a function for the source and one for the target at the same time
+        :param source_rows: Rows of GET_TABLE_ROW_COUNTS of the source, with the estimated row counts
+        :return: Row counts of the source and the target, with the tier which decided each table
+        """
+        source_counts = self.get_row_counts(source_rows, TIER_ESTIMATE)
+        target_counts = self.get_row_counts(target_rows, TIER_ESTIMATE)
+        source = (source_db, source_type, source_counts)
+        target = (target_db, target_type, target_counts)
+
+        pending = [key for key in source_counts if key in target_counts and not
+                   self.estimates_match(source_counts[key][ROW_COUNT], target_counts[key][ROW_COUNT])]
+        self.logger.info(f"Estimates decided {len(source_counts) - len(pending)} of {len(source_counts)} tables")
+
+        sampled = [key for key in pending if supports(source_type, CAPABILITY_SAMPLED_ROW_COUNT) and
+                   supports(target_type, CAPABILITY_SAMPLED_ROW_COUNT) and
+                   self.is_sampled(source_counts[key][ROW_COUNT], target_counts[key][ROW_COUNT])]
+        if sampled:
+            # The percentage is formatted in now and the table once it is quoted
+            queries = {db_type: query.format(table='{table}', percent=self.sample_percent)
+                       for db_type, query in GET_SAMPLED_ROW_COUNT.items()}
+            source_samples, target_samples = self.count_tier(run_both, source, target, sampled, queries)
+
+            decided = set()
+            for key, source_sample, target_sample in zip(sampled, source_samples, target_samples):
+                if self.samples_differ(source_sample, target_sample):
+                    source_counts[key].update({ROW_COUNT: source_sample, ROW_COUNT_TIER: TIER_SAMPLE})
+                    target_counts[key].update({ROW_COUNT: target_sample, ROW_COUNT_TIER: TIER_SAMPLE})
+                    decided.add(key)
+
+            pending = [key for key in pending if key not in decided]
+            self.logger.info(f"Samples decided {len(decided)} of {len(sampled)} sampled tables")
+
+        if pending:
+            source_exact, target_exact = self.count_tier(run_both, source, target, pending,
+                                                         GET_EXACT_ROW_COUNT)
+            for key, source_count, target_count in zip(pending, source_exact, target_exact):
+                source_counts[key].update({ROW_COUNT: source_count, ROW_COUNT_TIER: TIER_EXACT})
+                target_counts[key].update({ROW_COUNT: target_count, ROW_COUNT_TIER: TIER_EXACT})
+            self.logger.info(f"Counted the rows of {len(pending)} tables")
+
+        return list(source_counts.values()), list(target_counts.values())
+
+    def count_partitions(self, run_both, source_db, source_type, source_partitions, target_db, target_type,
+                         target_partitions, source_rows, target_rows):
+        """
+        Counts the partitions of the tables whose row counts differ, to find the partitions which differ
+        :param source_partitions: Rows of GET_PARTITIONED_INDEX of the source, with the estimated row counts
+        :param source_rows: Row counts of the source returned by count_tables
+        :return: Row counts of the partitions of the source and the target
+        """
+        target_counts = {(row[SCHEMA_NAME], row[TABLE_NAME]): row[ROW_COUNT] for row in target_rows}
+        mismatched = {(row[SCHEMA_NAME], row[TABLE_NAME]) for row in source_rows
+                      if row[ROW_COUNT] is not None and target_counts.get((row[SCHEMA_NAME], row[TABLE_NAME]))
+                      not in (None, row[ROW_COUNT])}
+        source_partitions = [row for row in source_partitions if (row[SCHEMA_NAME], row[TABLE_NAME]) in mismatched]
+        target_partitions = [row for row in target_partitions if (row[SCHEMA_NAME], row[TABLE_NAME]) in mismatched]
+        if not source_partitions and not target_partitions:
+            return [], []
+
+        self.logger.info(f"Counting the partitions of {len(mismatched)} tables whose row counts differ")
+        return run_both(
+            partial(self.counter.count_partitions, source_db, source_type, source_partitions, SECTION_SOURCE),
+            partial(self.counter.count_partitions, target_db, target_type, target_partitions, SECTION_TARGET)
+        )
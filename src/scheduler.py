@@ -0,0 +1,43 @@
+"""
+Scheduler for running the extraction queries of the source and the target database concurrently
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from database import SECTION_SOURCE, SECTION_TARGET
+
+
+class ExtractionScheduler:
+    """
+    Keeps one thread pool per database, sized by the concurrency limit configured for that database, so that no
+    more than that many queries are in flight against it at once. A separate pool runs the source side and the
+    target side at the same time, which lets a side wait on its own queries without taking one of their workers.
+    """
+
+    def __init__(self, source_concurrency, target_concurrency):
+        self.executors = {
+            SECTION_SOURCE: ThreadPoolExecutor(max_workers=source_concurrency, thread_name_prefix=SECTION_SOURCE),
+            SECTION_TARGET: ThreadPoolExecutor(max_workers=target_concurrency, thread_name_prefix=SECTION_TARGET)
+        }
+        self.side_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="side")
+
+    def submit(self, category, fn, *args, **kwargs):
+        """
+        Schedules a query on the pool of the source or the target database
+        :param category: SECTION_SOURCE or SECTION_TARGET
+        :return: Future for the result of the function
+        """
+        return self.executors[category].submit(fn, *args, **kwargs)
+
+    def run_both(self, source_fn, target_fn):
+        """
+        Runs the extraction of the source and the target side concurrently
+        :return: Tuple with the results of the source and the target function
+        """
+        source_future = self.side_executor.submit(source_fn)
+        target_future = self.side_executor.submit(target_fn)
+        return source_future.result(), target_future.result()
+
+    def shutdown(self):
+        self.side_executor.shutdown()
+        for executor in self.executors.values():
+            executor.shutdown()
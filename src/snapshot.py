@@ -0,0 +1,27 @@
+"""
+Loading of the snapshots and of the incremental state. Both are pickles, and loading a pickle can run any code, so only
+the types which the report data is made of can be loaded from them
+"""
+import pickle
+
+# Classes of the report data besides the built-in containers, numbers and strings, which pickle stores without a class
+SNAPSHOT_CLASSES = {
+    ('decimal', 'Decimal'),
+    ('datetime', 'date'),
+    ('datetime', 'datetime'),
+    ('datetime', 'time'),
+    ('datetime', 'timedelta'),
+    ('src.catalog', 'ObjectNames')
+}
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    """
+    Refuses the classes other than SNAPSHOT_CLASSES, so that a crafted snapshot cannot call any function when it is
+    loaded
+    """
+
+    def find_class(self, module, name):
+        if (module, name) not in SNAPSHOT_CLASSES:
+            raise pickle.UnpicklingError(f"{module}.{name} is not allowed in a snapshot")
+        return super().find_class(module, name)
@@ -0,0 +1,263 @@
+"""
+Spills the object names of a catalog to sorted run files on local disk, for validating catalogs which do not fit in
+the memory budget. The runs are merged into one file sorted by schema, object type and name, and the names of each
+schema and object type are then read back from that file when they are iterated
+"""
+import heapq
+import itertools
+import os
+import pickle
+from operator import itemgetter
+from threading import Lock
+
+from src import SPILL_CHUNK_SIZE, SPILL_RECORD_SIZE
+from src.catalog import ObjectNames
+from src.snapshot import SnapshotUnpickler
+
+
+def read_chunks(spill_file):
+    while True:
+        try:
+            yield pickle.load(spill_file)
+        except EOFError:
+            return
+
+
+def read_run(path):
+    with open(path, 'rb') as run_file:
+        for chunk in read_chunks(run_file):
+            yield from chunk
+
+
+class SpilledNames:
+    """
+    Sorted object names of one schema and object type stored in a spill file. Like ObjectNames it can be iterated
+    over and has a length, so it is used in the same places. Pickling it stores the names as ObjectNames, which
+    holds all of them in memory, so the snapshot and the incremental state are written with dump_spilled instead
+    """
+    __slots__ = ('path', 'offset', 'count')
+
+    def __init__(self, path, offset, count):
+        self.path = path
+        self.offset = offset
+        self.count = count
+
+    def iter_chunks(self):
+        if not self.count:
+            return
+
+        with open(self.path, 'rb') as spill_file:
+            spill_file.seek(self.offset)
+            remaining = self.count
+            while remaining:
+                chunk = pickle.load(spill_file)
+                remaining -= len(chunk)
+                yield chunk
+
+    def __iter__(self):
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    def __len__(self):
+        return self.count
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __reduce__(self):
+        return ObjectNames, (list(self),)
+
+
+class SpillWriter:
+    """
+    Appends sequences of names to a spill file, in chunks of SPILL_CHUNK_SIZE names. The file can only be read
+    once the writer is closed
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.offset = 0
+        self.count = 0
+        self.chunk = []
+
+    def append(self, name):
+        self.chunk.append(name)
+        if len(self.chunk) >= SPILL_CHUNK_SIZE:
+            self.write_chunk()
+
+    def write_chunk(self):
+        if self.chunk:
+            pickle.dump(self.chunk, self.file, protocol=pickle.HIGHEST_PROTOCOL)
+            self.count += len(self.chunk)
+            self.chunk = []
+
+    def end(self):
+        """
+        Ends the current sequence of names
+        :return: SpilledNames of the sequence
+        """
+        self.write_chunk()
+        names = SpilledNames(self.path, self.offset, self.count)
+        self.offset = self.file.tell()
+        self.count = 0
+        return names
+
+    def write(self, names):
+        for name in names:
+            self.append(name)
+        return self.end()
+
+    def close(self):
+        self.file.close()
+
+
+class CatalogSpill:
+    """
+    Collects the objects of one database. The rows of every object query are buffered until they take up run_size
+    bytes, then sorted and written to a run file. Object queries run in parallel, so each of them keeps its own
+    buffer
+    """
+
+    def __init__(self, directory, prefix, run_size):
+        self.directory = directory
+        self.prefix = prefix
+        self.run_size = run_size
+        self.runs = []
+        self.lock = Lock()
+
+    def add(self, db_object, rows):
+        """
+        Spills the (schema name, object name) rows of an object query, in lower case
+        """
+        buffer = []
+        buffer_size = 0
+        for schema_name, object_name in rows:
+            buffer.append((schema_name.lower(), db_object, object_name.lower()))
+            buffer_size += len(schema_name) + len(object_name) + SPILL_RECORD_SIZE
+            if buffer_size >= self.run_size:
+                self.write_run(buffer)
+                buffer = []
+                buffer_size = 0
+
+        if buffer:
+            self.write_run(buffer)
+
+    def write_run(self, records):
+        records.sort()
+        with self.lock:
+            path = os.path.join(self.directory, f"{self.prefix}_run_{len(self.runs)}.spill")
+            self.runs.append(path)
+
+        with open(path, 'wb') as run_file:
+            for i in range(0, len(records), SPILL_CHUNK_SIZE):
+                pickle.dump(records[i:i + SPILL_CHUNK_SIZE], run_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def merge(self):
+        """
+        Merges the sorted runs into a single file and removes them. Only one chunk of each run is held in memory
+        :return: Dictionary with the SpilledNames of each (schema name, object type)
+        """
+        writer = SpillWriter(os.path.join(self.directory, f"{self.prefix}_catalog.spill"))
+        schema_objects = {}
+        try:
+            records = heapq.merge(*[read_run(path) for path in self.runs])
+            for bucket, bucket_records in itertools.groupby(records, key=itemgetter(0, 1)):
+                schema_objects[bucket] = writer.write(record[2] for record in bucket_records)
+        finally:
+            writer.close()
+
+        for path in self.runs:
+            os.remove(path)
+        self.runs = []
+
+        return schema_objects
+
+
+class SpillPickler(pickle.Pickler):
+    """
+    Pickles the SpilledNames by reference. Their names are written after the pickle by dump_spilled, one chunk at a
+    time
+    """
+
+    def __init__(self, file):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.spilled = {}
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, SpilledNames):
+            return None
+
+        index = self.spilled.setdefault(id(obj), (len(self.spilled), obj))[0]
+        return index, len(obj)
+
+
+class SpillUnpickler(SnapshotUnpickler):
+    """
+    Creates an empty placeholder for each SpilledNames of the pickle, which is filled by load_spilled once the pickle
+    is read. Like any snapshot, the pickle can only hold the classes of the report data
+    """
+
+    def __init__(self, file, writer=None):
+        super().__init__(file)
+        self.writer = writer
+        self.placeholders = {}
+
+    def persistent_load(self, pid):
+        index, count = pid
+        if index not in self.placeholders:
+            self.placeholders[index] = (SpilledNames(self.writer.path, 0, count) if self.writer is not None
+                                        else ObjectNames(), count)
+        return self.placeholders[index][0]
+
+
+def dump_spilled(data, file):
+    """
+    Pickles data whose object names may be SpilledNames, such as the snapshot. The pickler would keep every name it
+    writes in its memo until the end, so the names of the SpilledNames are written after the pickle in separately
+    pickled chunks, and only one chunk is held in memory at a time
+    """
+    pickler = SpillPickler(file)
+    pickler.dump(data)
+    for _, names in sorted(pickler.spilled.values(), key=itemgetter(0)):
+        for chunk in names.iter_chunks():
+            pickle.dump(chunk, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_spilled(file, spill_path=None):
+    """
+    Reads data written by dump_spilled, or by pickle.dump
+    :param spill_path: Spill file the names are copied to, so that they are read back as SpilledNames instead of being
+    loaded in memory as ObjectNames
+    """
+    writer = SpillWriter(spill_path) if spill_path is not None else None
+    try:
+        unpickler = SpillUnpickler(file, writer)
+        data = unpickler.load()
+        for index in sorted(unpickler.placeholders):
+            names, count = unpickler.placeholders[index]
+            chunks = []
+            while count:
+                chunk = pickle.load(file)
+                count -= len(chunk)
+                if writer is not None:
+                    for name in chunk:
+                        writer.append(name)
+                else:
+                    chunks.extend(chunk)
+
+            if writer is not None:
+                names.offset = writer.end().offset
+            else:
+                names.packed = ObjectNames.separator.join(chunks)
+                names.count = len(chunks)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return data
@@ -0,0 +1,250 @@
+"""
+Spot check of the data of the tables on a random sample of rows. The rows of a few randomly drawn primary keys of every
+table are fetched from both databases with IN lists, and compared column by column on whole columns at once, after the
+values of both databases are normalized to the same Python types. The share of the sampled rows which differ is
+reported with its confidence interval, which estimates the share of the rows of the whole table which differ
+"""
+import math
+import random
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from database import SECTION_SOURCE, SECTION_TARGET
+from database.database_queries import CHECKSUM_TYPE_FAMILIES, GET_KEY_RANGE, GET_SAMPLE_ROWS
+from database.dialects import get_dialect
+from src import *
+from src.data_validator import TableValidator
+from src.datatype_mapping import SPOT_CHECK_TYPE_FAMILIES
+
+# Families whose values are compared after they are converted to the wider family of the group
+NUMERIC_FAMILIES = ('integer', 'decimal', 'float')
+TEMPORAL_FAMILIES = ('date', 'timestamp')
+
+
+class SpotChecker(TableValidator):
+    """
+    Samples sample_size rows of every table with a single integer primary key. The key ranges, then the sampled rows,
+    are read with one level of queries each, which run at once on the source and target workers of the scheduler
+    """
+
+    def __init__(self, sample_size, confidence, timeout):
+        """
+        :param confidence: Confidence level of the bounds of the mismatch rates, in percent
+        """
+        super().__init__(timeout)
+        self.sample_size = sample_size
+        self.z = NormalDist().inv_cdf((1 + confidence / 100) / 2)
+
+    @staticmethod
+    def get_family(db_type, data_type):
+        """
+        The data types of dialects with a type mapping, such as SQL Server, are first converted to the data types of
+        PostgreSQL they are migrated to, so that for example bit is compared as a boolean and datetime2 as a timestamp
+        :return: Family of the data type, or None if its values are not compared
+        """
+        dialect = get_dialect(db_type)
+        if dialect is not None and dialect.type_mapping is not None:
+            return SPOT_CHECK_TYPE_FAMILIES.get(dialect.type_mapping.get(data_type))
+        return CHECKSUM_TYPE_FAMILIES[db_type].get(data_type)
+
+    def get_compared_columns(self, source_table, source_type, target_table, target_type):
+        """
+        :return: Dictionary with the family each column present on both databases is compared as
+        """
+        columns = {}
+        for name, (_, _, source_data_type) in source_table['columns'].items():
+            if name not in target_table['columns']:
+                continue
+
+            families = (self.get_family(source_type, source_data_type),
+                        self.get_family(target_type, target_table['columns'][name][2]))
+            if None in families:
+                continue
+
+            if families[0] == families[1]:
+                columns[name] = families[0]
+            else:
+                for group in (NUMERIC_FAMILIES, TEMPORAL_FAMILIES):
+                    if families[0] in group and families[1] in group:
+                        columns[name] = max(families, key=group.index)
+
+        return columns
+
+    def validate(self, submit, source_db, source_type, target_db, target_type, row_counts):
+        """
+        :param submit: Function running a function on the workers of the source or the target
+        :param row_counts: Row count data of the source tables, which sets how many keys are drawn from the key range
+        :return: Dictionary with the result of each (schema name, table name) of the source
+        """
+        databases = {SECTION_SOURCE: source_db, SECTION_TARGET: target_db}
+        db_types = {SECTION_SOURCE: source_type, SECTION_TARGET: target_type}
+        source_tables, target_tables = self.get_catalogs(submit, databases, db_types)
+
+        data = {}
+        plans = {}
+        for name, source_table in source_tables.items():
+            data[name] = {KEY_COLUMN: None, SAMPLE_SIZE: 0, MISMATCHED_ROWS: 0, MISMATCH_RATE: None,
+                          MISMATCH_LOWER_BOUND: None, MISMATCH_UPPER_BOUND: None, MISMATCHED_COLUMNS: [],
+                          REASON: None, COLOR: COLOR_GREEN}
+            target_table = target_tables.get(name)
+            key, reason = self.get_key(source_table, target_table)
+            if reason is not None:
+                data[name].update({REASON: reason, COLOR: COLOR_RED if target_table is None else COLOR_ORANGE})
+                continue
+
+            columns = self.get_compared_columns(source_table, source_type, target_table, target_type)
+            columns.pop(key, None)
+            data[name][KEY_COLUMN] = key
+            plans[name] = (key, columns, {
+                category: self.get_side(databases[category], table, key, columns)
+                for category, table in ((SECTION_SOURCE, source_table), (SECTION_TARGET, target_table))})
+
+        self.logger.info(f"Spot checking the data of {len(plans)} of {len(source_tables)} tables")
+        batches = self.get_batches(submit, databases, db_types, plans, row_counts, data)
+
+        self.logger.info(f"Fetching {len(batches)} batches of sampled rows")
+        results = self.run_level(submit, databases, [
+            {category: GET_SAMPLE_ROWS[db_type].format(**plans[name][2][category], keys=", ".join(map(str, keys)))
+             for category, db_type in db_types.items()} for name, keys in batches])
+
+        samples = {}
+        for (name, _), (source_rows, target_rows) in zip(batches, results):
+            if data[name][COLOR] == COLOR_ORANGE or self.set_error(data[name], source_rows, target_rows):
+                samples.pop(name, None)
+                continue
+            sample = samples.setdefault(name, ([], []))
+            sample[0].extend(source_rows)
+            sample[1].extend(target_rows)
+
+        for name, (source_rows, target_rows) in samples.items():
+            key, columns, _ = plans[name]
+            # The databases may return the rows in the order of the keys, so the rows kept are drawn again
+            random.shuffle(source_rows)
+            self.compare_sample(data[name], key, columns, source_rows[:self.sample_size], target_rows)
+
+        mismatched = sum(1 for result in data.values() if result[COLOR] == COLOR_YELLOW)
+        self.logger.info(f"The sampled rows of {mismatched} tables differ")
+        return data
+
+    @staticmethod
+    def get_side(database, table, key, columns):
+        """
+        :return: Names formatted into the queries of one side of a table, which select the key first
+        """
+        names = TableValidator.get_table_names(database, table, key)
+        names['columns'] = ", ".join([names['key']] + [database.quote_identifier(table['columns'][name][0])
+                                                       for name in columns])
+        return names
+
+    def get_batches(self, submit, databases, db_types, plans, row_counts, data):
+        """
+        Reads the range of the keys of every table on the source and draws random keys in it. Tables whose keys have
+        gaps get more keys than sample_size, in proportion to the keys of the range per row, so that about
+        sample_size of them are found
+        :return: List of the (table, keys) of the batches of sampled rows
+        """
+        names = list(plans)
+        results = self.run_level(submit, databases, [
+            {category: GET_KEY_RANGE[db_type].format(**plans[name][2][category])
+             for category, db_type in db_types.items()} for name in names])
+
+        batches = []
+        for name, (source_rows, target_rows) in zip(names, results):
+            if self.set_error(data[name], source_rows, target_rows):
+                continue
+
+            low, high = source_rows[0] if source_rows else (None, None)
+            if low is None:
+                data[name][REASON] = "No rows on the source"
+                continue
+
+            num_keys = int(high) - int(low) + 1
+            row_count = (row_counts.get(name) or {}).get(ROW_COUNT) or num_keys
+            oversampling = min(max(num_keys / max(int(row_count), 1), 1), SPOT_CHECK_MAX_OVERSAMPLING)
+            num_candidates = min(num_keys, math.ceil(self.sample_size * oversampling))
+            keys = random.sample(range(int(low), int(high) + 1), num_candidates)
+            batches.extend((name, keys[i:i + SPOT_CHECK_BATCH_SIZE])
+                           for i in range(0, len(keys), SPOT_CHECK_BATCH_SIZE))
+
+        return batches
+
+    def compare_sample(self, result, key, columns, source_rows, target_rows):
+        """
+        Aligns the rows of the target on the keys of the sampled rows of the source and compares every column. A row
+        missing on the target counts as a mismatched row
+        """
+        names = [key] + list(columns)
+        source = pd.DataFrame(source_rows, columns=names, dtype=object).set_index(key)
+        target = pd.DataFrame(target_rows, columns=names, dtype=object).set_index(key)
+        found = source.index.isin(target.index)
+        target = target[~target.index.duplicated()].reindex(source.index)
+
+        mismatched = np.zeros(len(source), dtype=bool)
+        for name, family in columns.items():
+            # The rows missing on the target are not counted against the columns
+            equal = self.compare_column(source[name], target[name], family) | ~found
+            if not equal.all():
+                result[MISMATCHED_COLUMNS].append(name)
+                mismatched |= ~equal
+
+        mismatched |= ~found
+        self.set_rate(result, len(source), int(mismatched.sum()))
+
+    @staticmethod
+    def normalize(values, family):
+        """
+        Converts the values of a column to a type which compares equal for both databases. Trailing blanks are
+        removed from the strings, since fixed length strings are migrated to variable length strings
+        """
+        if family == 'boolean':
+            return values.astype('boolean')
+        if family in TEMPORAL_FAMILIES:
+            return pd.to_datetime(values, errors='coerce')
+        if family == 'float':
+            return pd.to_numeric(values, errors='coerce').astype(float)
+        if family == 'uuid':
+            return values.astype(str).str.lower().where(values.notna())
+        if family == 'string':
+            return values.astype(str).str.rstrip(' ').where(values.notna())
+        # Integers and decimals stay Python objects, which compare exactly whatever their scale
+        return values
+
+    def compare_column(self, source_values, target_values, family):
+        """
+        :return: Boolean array, True for the rows whose values are equal or NULL on both databases
+        """
+        source_null = source_values.isna().to_numpy()
+        target_null = target_values.isna().to_numpy()
+        null = source_null | target_null
+        dtype = float if family == 'float' else object
+        source_values = self.normalize(source_values, family).to_numpy(dtype=dtype, copy=True)
+        target_values = self.normalize(target_values, family).to_numpy(dtype=dtype, copy=True)
+        # The NULLs are replaced, so that only the values of the rows without NULLs are compared
+        source_values[null] = 0
+        target_values[null] = 0
+
+        if family == 'float':
+            equal = np.isclose(source_values, target_values)
+        else:
+            equal = source_values == target_values
+
+        return np.where(null, source_null & target_null, equal)
+
+    def set_rate(self, result, sample_size, mismatched_rows):
+        """
+        Sets the mismatch rate of the sample, and the Wilson score interval of the mismatch rate of the table
+        """
+        result.update({SAMPLE_SIZE: sample_size, MISMATCHED_ROWS: mismatched_rows,
+                       COLOR: COLOR_YELLOW if mismatched_rows else COLOR_GREEN})
+        if not sample_size:
+            return
+
+        rate = mismatched_rows / sample_size
+        z2 = self.z ** 2
+        center = (rate + z2 / (2 * sample_size)) / (1 + z2 / sample_size)
+        margin = self.z * math.sqrt(rate * (1 - rate) / sample_size + z2 / (4 * sample_size ** 2)) / \
+            (1 + z2 / sample_size)
+        result.update({MISMATCH_RATE: rate, MISMATCH_LOWER_BOUND: max(0.0, center - margin),
+                       MISMATCH_UPPER_BOUND: min(1.0, center + margin)})
@@ -1,6 +1,11 @@
+import os
+from functools import lru_cache
+
 from database import *
 from src.utility.utils import CommonUtility
 
+STATIC_DIR = os.path.join(os.path.dirname(__file__), 'static')
+
 
 class Template:
     def __init__(self):
@@ -13,6 +18,19 @@ class Template:
         self.db_host_source = CommonUtility.read_configurations(SOURCE_HOST, CONFIG_FILE, SECTION_SOURCE)
         self.db_host_target = CommonUtility.read_configurations(TARGET_HOST, CONFIG_FILE, SECTION_TARGET)
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_jinja_template(name):
+        """
+        Compiles a template of the static folder when it is first used. The compiled templates are kept in the
+        temporary directory of the user, so that later runs load them instead of compiling them again
+        """
+        from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+        environment = Environment(loader=FileSystemLoader(searchpath=STATIC_DIR), autoescape=True,
+                                  bytecode_cache=FileSystemBytecodeCache())
+        return environment.get_template(name)
+
     def create_report(self, *args):
         """
         To be implemented by child
@@ -1,13 +1,18 @@
 import re
+from typing import TYPE_CHECKING
+
 import xlsxwriter
 from database import SECTION_SOURCE, SECTION_TARGET
-from src.report_generator import MigrationSummaryObject
 from src import *
+from src.datatype_mapping import DATATYPE_MAPPING, DATATYPE_MAPPING_SQL_TO_PG
 from src.templates.base_template import Template
 
+if TYPE_CHECKING:
+    from src.report_generator import MigrationSummaryObject
+
 
 class ExcelTemplate(Template):
-    def __init__(self, migration_summary_object: MigrationSummaryObject):
+    def __init__(self, migration_summary_object: 'MigrationSummaryObject'):
         super().__init__()
 
         self.migration_summary_object = migration_summary_object
@@ -38,49 +43,35 @@ class ExcelTemplate(Template):
         self.fmt_orange = self.book.add_format({'bg_color': '#FBC003'})
         self.fmt_dark_orange = self.book.add_format({'bg_color': '#F89647'})
 
-        self.datatype_mapping = {'bigint': ['bigint'], 'bytea': ['binary', 'image', 'varbinarymax'], 'boolean': ['bit'],
-                                 'character': ['char'], 'date': ['date'],
-                                 'timestamp without time zone': ['datetime', 'smalldatetime', 'datetime2'],
-                                 'numeric': ['decimal', 'money', 'numeric', 'smallmoney'],
-                                 'double precision': ['float'], 'integer': ['int'],
-                                 'text': ['ntext', 'nvarcharmax', 'text', 'varcharmax'],
-                                 'character varying': ['nvarchar', 'varchar', 'nchar'], 'real': ['real'],
-                                 'smallint': ['smallint', 'tinyint'], 'uuid': ['uniqueidentifier'],
-                                 'xml': ['xml', 'xmlmax']}
-
-        self.datatype_mapping_sql_to_pg = {'bigint': 'bigint', 'binary': 'bytea', 'bit': 'boolean', 'char': 'character',
-                                           'date': 'date', 'datetime': 'timestamp without time zone',
-                                           'datetime2': 'timestamp without time zone', 'decimal': 'numeric',
-                                           'float': 'double precision', 'image': 'bytea', 'int': 'integer',
-                                           'money': 'numeric',
-                                           'ntext': 'text', 'numeric': 'numeric', 'nvarchar': 'character varying',
-                                           'nvarcharmax': 'text', 'real': 'real',
-                                           'smalldatetime': 'timestamp without time zone', 'smallint': 'smallint',
-                                           'smallmoney': 'numeric', 'text': 'text', 'tinyint': 'smallint',
-                                           'uniqueidentifier': 'uuid', 'varbinarymax': 'bytea',
-                                           'varchar': 'character varying',
-                                           'varcharmax': 'text', 'xml': 'xml',
-                                           "xmlmax": "xml",  # Added on my own
-                                           "hierarchyid": None,  # Added on my own
-                                           "nchar": "character varying",  # Added on my own
-                                           "time": None,  # Added on my own
-                                           "geographymax": None
-                                           }
+        self.datatype_mapping = DATATYPE_MAPPING
+        self.datatype_mapping_sql_to_pg = DATATYPE_MAPPING_SQL_TO_PG
 
         self.color_assignment = {
             COLOR_RED: self.fmt_red,
             COLOR_GREEN: self.fmt_green,
-            COLOR_YELLOW: self.fmt_yellow
+            COLOR_YELLOW: self.fmt_yellow,
+            COLOR_ORANGE: self.fmt_orange
         }
 
         self.color_reference = [(self.fmt_green, f"{GREEN}%"), (self.fmt_yellow, f'> {YELLOW_LEFT}%'),
                                 (self.fmt_red, f'< {YELLOW_LEFT}%')]
 
         self.create_report(migration_summary_object.combined_row_count_data, migration_summary_object.validation_data,
-                           migration_summary_object.comparison_data, migration_summary_object.output_file_name)
+                           migration_summary_object.comparison_data, migration_summary_object.output_file_name,
+                           migration_summary_object.data_validation_data,
+                           migration_summary_object.spot_check_data)
 
-    def create_report(self, combined_row_count_data, validation_data, comparison_data, file_name):
+    def create_report(self, combined_row_count_data, validation_data, comparison_data, file_name,
+                      data_validation_data=None, spot_check_data=None):
         self.add_table_count_validation_sheet(combined_row_count_data)
+        if combined_row_count_data.get(PARTITIONS):
+            self.add_table_count_validation_sheet(combined_row_count_data[PARTITIONS], "Partition row count",
+                                                  "Partition row counts", ["SchemaName", "TableName", "Partition"],
+                                                  "SCHEMA, TABLE, PARTITION")
+        if data_validation_data:
+            self.add_data_validation_sheet(data_validation_data)
+        if spot_check_data:
+            self.add_spot_check_sheet(spot_check_data)
         self.add_summary_data(validation_data)
 
         for schema in comparison_data:
@@ -172,25 +163,27 @@ class ExcelTemplate(Template):
     def add_db_detail(self):
         row = 3
         col = 7
+        source_summary = self.migration_summary_object.database_summary["source"]
+        target_summary = self.migration_summary_object.database_summary["target"]
 
         # Source ---------------
         self.summary_sheet.write_row(row, col, ["Source", self.db_type_source.upper()])
         row += 1
 
-        self.summary_sheet.write_row(row, col, ["Database", self.migration_summary_object.source_db.database])
+        self.summary_sheet.write_row(row, col, ["Database", source_summary["name"]])
         row += 1
 
-        self.summary_sheet.write_row(row, col, ["Host", self.migration_summary_object.source_db.host])
+        self.summary_sheet.write_row(row, col, ["Host", source_summary["host"]])
         row += 3
 
         # Target ---------------
         self.summary_sheet.write_row(row, col, ["Target", self.db_type_target.upper()])
         row += 1
 
-        self.summary_sheet.write_row(row, col, ["Database", self.migration_summary_object.target_db.database])
+        self.summary_sheet.write_row(row, col, ["Database", target_summary["name"]])
         row += 1
 
-        self.summary_sheet.write_row(row, col, ["Host", self.migration_summary_object.target_db.host])
+        self.summary_sheet.write_row(row, col, ["Host", target_summary["host"]])
 
         row += 4
 
@@ -199,35 +192,48 @@ class ExcelTemplate(Template):
             self.summary_sheet.write(row, col + 1, c[1])
             row += 1
 
-    def add_table_count_validation_sheet(self, data):
+    def add_table_count_validation_sheet(self, data, worksheet_name="Table row count", title="Table row counts",
+                                         key_heading=("SchemaName", "TableName"), item="SCHEMA, TABLE"):
+        """
+        :param key_heading: Headings of the columns of the keys of data, which identify a table or a partition
+        :param item: Name of the identified item in the legend of the colors
+        """
         start_row = 5
         row = 2
         col_sql = 0
-        col_pg = 5
+        sub_heading = list(key_heading) + ["RowCount"]
+        col_pg = len(sub_heading) + 2
 
-        column_widths_sql = [len(max(self.objects, key=len)) + 5, 30, 20]
-        column_widths_pg = [len(max(self.objects, key=len)) + 5, 30, 20]
+        column_widths_sql = [len(max(self.objects, key=len)) + 5, 30] + [12] * (len(key_heading) - 2) + [20]
+        column_widths_pg = list(column_widths_sql)
 
         colored_cell_fmt = self.book.add_format({'bold': True, 'bg_color': 'yellow'})
 
-        worksheet = self.book.add_worksheet("Table row count")
-        heading = [self.db_type_source, "", "", "", "", self.db_type_target]
+        worksheet = self.book.add_worksheet(worksheet_name)
+        heading = [self.db_type_source] + [""] * (col_pg - 1) + [self.db_type_target]
 
-        worksheet.write(0, 2, "Table row counts", self.fmt_bold_14)
+        worksheet.write(0, 2, title, self.fmt_bold_14)
         worksheet.write_row(row, col_sql, heading, colored_cell_fmt)
 
         row += 2
-        sub_heading = ["SchemaName", "TableName", "RowCount"]
         worksheet.write_row(row, col_sql, sub_heading, self.fmt_bold)
         worksheet.write_row(row, col_pg, sub_heading, self.fmt_bold)
 
+        # The tier which decided each row count is only known when the counts were verified in tiers
+        tiered = any(ROW_COUNT_TIER in row_count for row_count in data[SECTION_SOURCE].values())
+        if tiered:
+            worksheet.write(row, col_sql + len(sub_heading), "VerifiedBy", self.fmt_bold)
+            column_widths_sql.append(12)
+
         row += 1
 
         # Print SQL data
         for data_row in data[SECTION_SOURCE]:
-            worksheet.write_row(row, col_sql, [data_row[0], data_row[1]])
-            worksheet.write(row, col_sql + 2, data[SECTION_SOURCE][data_row][ROW_COUNT],
+            worksheet.write_row(row, col_sql, list(data_row))
+            worksheet.write(row, col_sql + len(data_row), data[SECTION_SOURCE][data_row][ROW_COUNT],
                             self.color_assignment[data[SECTION_SOURCE][data_row][COLOR]])
+            if tiered:
+                worksheet.write(row, col_sql + len(data_row) + 1, data[SECTION_SOURCE][data_row][ROW_COUNT_TIER])
             column_widths_sql[1] = max(len(data_row[1]) + 5, column_widths_sql[1])
             row += 1
 
@@ -235,7 +241,7 @@ class ExcelTemplate(Template):
 
         # Print PG data
         for data_row in data[SECTION_TARGET]:
-            worksheet.write_row(row, col_pg, [data_row[0], data_row[1], data[SECTION_TARGET][data_row][ROW_COUNT]])
+            worksheet.write_row(row, col_pg, list(data_row) + [data[SECTION_TARGET][data_row][ROW_COUNT]])
             column_widths_pg[1] = max(len(data_row[1]) + 5, column_widths_pg[1])
             row += 1
 
@@ -243,13 +249,110 @@ class ExcelTemplate(Template):
         self.apply_widths(worksheet, column_widths_pg, col_pg)
 
         color_mappings = [
-            (self.fmt_green, 'The SCHEMA, TABLE pair was found their counts matched'),
-            (self.fmt_red, 'The SCHEMA, TABLE pair was not found'),
-            (self.fmt_yellow, 'The SCHEMA, TABLE pair was found but their counts didn\'t match')
+            (self.fmt_green, f'The {item} pair was found their counts matched'),
+            (self.fmt_red, f'The {item} pair was not found'),
+            (self.fmt_yellow, f'The {item} pair was found but their counts didn\'t match'),
+            (self.fmt_orange, f'The {item} pair was found but a row count could not be determined')
+        ]
+
+        row = 1
+        mapping_col = col_pg + len(sub_heading) + 1
+        for m in color_mappings:
+            worksheet.write(row, mapping_col, '', m[0])
+            worksheet.write(row, mapping_col + 1, m[1])
+            row += 1
+
+    def add_data_validation_sheet(self, data):
+        """
+        Lists the result of the checksums of every table, followed by the key ranges whose data differs
+        """
+        row = 2
+        col = 0
+        column_widths = [len(max(self.objects, key=len)) + 5, 30, 20, 15, 50]
+
+        worksheet = self.book.add_worksheet("Data validation")
+        worksheet.write(0, 2, "Data validation", self.fmt_bold_14)
+        worksheet.write_row(row, col, ["SchemaName", "TableName", "KeyColumn", "ChunksCompared", "Result"],
+                            self.fmt_bold)
+        row += 1
+
+        for (schema_name, table_name), result in data.items():
+            worksheet.write_row(row, col, [schema_name, table_name, result[KEY_COLUMN] or "", result[NUM_CHUNKS]])
+            if result[REASON]:
+                summary = result[REASON]
+            elif result[MISMATCHED_RANGES]:
+                summary = f"The data of {len(result[MISMATCHED_RANGES])} key ranges differs"
+            else:
+                summary = "The data matched"
+            worksheet.write(row, col + 4, summary, self.color_assignment[result[COLOR]])
+            column_widths[1] = max(len(table_name) + 5, column_widths[1])
+            row += 1
+
+            for low, high, source_rows, target_rows in result[MISMATCHED_RANGES]:
+                worksheet.write(row, col + 4, f"Keys {low} to {high}: {source_rows} source rows, "
+                                              f"{target_rows} target rows")
+                row += 1
+
+        self.apply_widths(worksheet, column_widths, col)
+
+        color_mappings = [
+            (self.fmt_green, 'The checksums of all the chunks of the table matched'),
+            (self.fmt_red, 'The table was not found on the target'),
+            (self.fmt_yellow, 'The checksums of some key ranges didn\'t match'),
+            (self.fmt_orange, 'The data of the table could not be validated')
+        ]
+
+        row = 1
+        mapping_col = 7
+        for m in color_mappings:
+            worksheet.write(row, mapping_col, '', m[0])
+            worksheet.write(row, mapping_col + 1, m[1])
+            row += 1
+
+    def add_spot_check_sheet(self, data):
+        """
+        Lists the mismatch rate of the sampled rows of every table, with its confidence interval and the columns
+        which differ
+        """
+        row = 2
+        col = 0
+        column_widths = [len(max(self.objects, key=len)) + 5, 30, 20, 15, 15, 15, 25, 50]
+
+        worksheet = self.book.add_worksheet("Spot check")
+        worksheet.write(0, 2, "Spot check", self.fmt_bold_14)
+        worksheet.write_row(row, col, ["SchemaName", "TableName", "KeyColumn", "SampledRows", "MismatchedRows",
+                                       "MismatchRate", "ConfidenceInterval", "Result"], self.fmt_bold)
+        row += 1
+
+        for (schema_name, table_name), result in data.items():
+            worksheet.write_row(row, col, [schema_name, table_name, result[KEY_COLUMN] or "", result[SAMPLE_SIZE],
+                                           result[MISMATCHED_ROWS]])
+            if result[MISMATCH_RATE] is not None:
+                worksheet.write(row, col + 5, f"{result[MISMATCH_RATE]:.2%}")
+                worksheet.write(row, col + 6, f"{result[MISMATCH_LOWER_BOUND]:.2%} to "
+                                              f"{result[MISMATCH_UPPER_BOUND]:.2%}")
+            if result[REASON]:
+                summary = result[REASON]
+            elif result[MISMATCHED_ROWS]:
+                summary = "Differing columns: " + ", ".join(result[MISMATCHED_COLUMNS]) \
+                    if result[MISMATCHED_COLUMNS] else "Sampled rows missing on the target"
+            else:
+                summary = "The sampled rows matched"
+            worksheet.write(row, col + 7, summary, self.color_assignment[result[COLOR]])
+            column_widths[1] = max(len(table_name) + 5, column_widths[1])
+            row += 1
+
+        self.apply_widths(worksheet, column_widths, col)
+
+        color_mappings = [
+            (self.fmt_green, 'All the sampled rows matched'),
+            (self.fmt_red, 'The table was not found on the target'),
+            (self.fmt_yellow, 'Some sampled rows differ or are missing on the target'),
+            (self.fmt_orange, 'The rows of the table could not be sampled')
         ]
 
         row = 1
-        mapping_col = 9
+        mapping_col = 10
         for m in color_mappings:
             worksheet.write(row, mapping_col, '', m[0])
             worksheet.write(row, mapping_col + 1, m[1])
@@ -1,17 +1,16 @@
-import os
 # from weasyprint import HTML
-from jinja2 import Environment, FileSystemLoader
-from src.report_generator import MigrationSummaryObject
+from typing import TYPE_CHECKING
+
 from src.templates.base_template import Template
 
+if TYPE_CHECKING:
+    from src.report_generator import MigrationSummaryObject
+
 
 class PDFTemplate(Template):
-    path = os.path.join(os.path.dirname(__file__), './static')
-    templateLoader = FileSystemLoader(searchpath=path)
-    environment = Environment(loader=templateLoader, autoescape=True)
-    template = environment.get_template("pdf_template.html")
+    template_name = "pdf_template.html"
 
-    def __init__(self, migration_summary_object: MigrationSummaryObject):
+    def __init__(self, migration_summary_object: 'MigrationSummaryObject'):
         super().__init__()
 
         self.create_report('',
@@ -23,6 +22,7 @@ class PDFTemplate(Template):
     def create_report(self, combined_row_count_data, validation_data, comparison_data, file_name, database_summary,
                       missing_schemas):
         # Create a Summary
-        content = self.template.render(summary_data=validation_data, comparison_data=comparison_data,
-                                       database_summary=database_summary, missing_schemas=missing_schemas)
+        template = self.get_jinja_template(self.template_name)
+        content = template.render(summary_data=validation_data, comparison_data=comparison_data,
+                                  database_summary=database_summary, missing_schemas=missing_schemas)
         # HTML(string=content).write_pdf(file_name)
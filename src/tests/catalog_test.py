@@ -0,0 +1,39 @@
+"""
+Tests of the compact representation of the object names
+"""
+import pickle
+
+from src.catalog import ObjectNames
+
+
+def test_object_names():
+    names = ObjectNames(['orders', 'items', 'lines'])
+
+    assert list(names) == ['items', 'lines', 'orders']
+    assert len(names) == 3
+    assert names == ['items', 'lines', 'orders']
+    assert names == ObjectNames(['lines', 'orders', 'items'])
+    assert names != ObjectNames(['items', 'lines'])
+    assert repr(names) == "['items', 'lines', 'orders']"
+
+
+def test_empty_object_names():
+    names = ObjectNames()
+
+    assert list(names) == []
+    assert len(names) == 0
+    assert names == []
+    # An empty name is still a name
+    assert list(ObjectNames([''])) == ['']
+
+
+def test_group_by_schema():
+    names = ObjectNames.group_by_schema([('Sales', 'Orders'), ('hr', 'people'), ('sales', 'items')])
+
+    assert names == {'sales': ObjectNames(['items', 'orders']), 'hr': ObjectNames(['people'])}
+
+
+def test_pickle():
+    names = ObjectNames(['orders', 'items'])
+
+    assert pickle.loads(pickle.dumps(names)) == names
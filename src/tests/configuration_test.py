@@ -0,0 +1,53 @@
+"""
+Tests of the process wide configuration
+"""
+import pytest
+
+from src.utility.configuration import Configuration
+
+
+@pytest.fixture
+def configuration(tmp_path, monkeypatch):
+    (tmp_path / 'configurations.ini').write_text("[source]\nDB_HOST = file-host\nDB_PORT = 5432\nDB_NAME = sales\n")
+    monkeypatch.setenv('DB_PORT', '6543')
+    monkeypatch.delenv('DB_HOST', raising=False)
+    monkeypatch.delenv('DB_NAME', raising=False)
+    return Configuration(str(tmp_path))
+
+
+def test_get(configuration):
+    assert configuration.get('DB_HOST', 'configurations.ini', 'source') == 'file-host'
+    assert configuration.get('DB_PORT', 'configurations.ini', 'source') == '6543'
+    assert configuration.get('DB_USER', 'configurations.ini', 'source') is None
+    assert configuration.get('DB_HOST', 'configurations.ini', 'target') == ''
+    assert configuration.get('DB_HOST', 'missing.ini', 'source') == ''
+
+
+def test_overrides(configuration):
+    configuration.set_overrides({'DB_PORT': '7654', 'DB_HOST': None, 'DB_NAME': ''})
+
+    assert configuration.get('DB_PORT', 'configurations.ini', 'source') == '7654'
+    # Properties which were not given on the command line fall back to the environment and to the file
+    assert configuration.get('DB_HOST', 'configurations.ini', 'source') == 'file-host'
+    assert configuration.get('DB_NAME', 'configurations.ini', 'source') == 'sales'
+
+
+def test_reload(configuration, tmp_path, monkeypatch):
+    configuration.set_overrides({'DB_NAME': 'override'})
+    assert configuration.get('DB_HOST', 'configurations.ini', 'source') == 'file-host'
+
+    (tmp_path / 'configurations.ini').write_text("[source]\nDB_HOST = new-host\nDB_PORT = 5432\n")
+    monkeypatch.setenv('DB_PORT', '1111')
+    # The file and the environment are read once, until the configuration is reloaded
+    assert configuration.get('DB_HOST', 'configurations.ini', 'source') == 'file-host'
+    assert configuration.get('DB_PORT', 'configurations.ini', 'source') == '6543'
+
+    configuration.reload()
+
+    assert configuration.get('DB_HOST', 'configurations.ini', 'source') == 'new-host'
+    assert configuration.get('DB_PORT', 'configurations.ini', 'source') == '1111'
+    assert configuration.get('DB_NAME', 'configurations.ini', 'source') == 'override'
+
+
+def test_get_instance():
+    assert Configuration.get_instance() is Configuration.get_instance()
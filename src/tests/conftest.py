@@ -0,0 +1,7 @@
+"""
+Puts the tool source directory on the path, so that the tests import the src and database packages like src/main.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
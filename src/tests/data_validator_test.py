@@ -0,0 +1,160 @@
+"""
+Tests of the checksum validation of the data of the tables
+"""
+import pytest
+
+from database import MSSQL, MYSQL, ORACLE, POSTGRES
+from src import *
+from src.data_validator import ChecksumValidator
+
+
+class FakeDatabase:
+    @staticmethod
+    def quote_identifier(name):
+        return f'"{name}"'
+
+
+def get_column(column_name, data_type, numeric_scale=None, is_primary_key=False):
+    return {SCHEMA_NAME: 'sales', TABLE_NAME: 'orders', SCHEMA_IDENTIFIER: 'SALES', TABLE_IDENTIFIER: 'ORDERS',
+            'column_name': column_name, 'column_identifier': column_name.upper(), DATA_TYPE: data_type,
+            'numeric_scale': numeric_scale, 'is_primary_key': is_primary_key}
+
+
+def get_chunk_checksums(rows, low, high, width):
+    """
+    Computes the chunks of GET_CHUNK_CHECKSUMS from a dictionary with the value of each key
+    """
+    chunks = {}
+    for key, value in rows.items():
+        if low <= key < high:
+            row_count, checksum = chunks.get((key - low) // width, (0, 0))
+            chunks[(key - low) // width] = (row_count + 1, checksum + hash(value))
+    return [(chunk, row_count, checksum) for chunk, (row_count, checksum) in chunks.items()]
+
+
+def drill_down(validator, source_rows, target_rows, low, high, width):
+    """
+    Runs the levels of ChecksumValidator.validate on the rows of both sides of a table
+    :return: Result of the table, and the number of levels
+    """
+    data = {('sales', 'orders'): {KEY_COLUMN: 'id', NUM_CHUNKS: 0, MISMATCHED_RANGES: [], REASON: None,
+                                  COLOR: COLOR_GREEN}}
+    tasks = [(('sales', 'orders'), low, high, width)]
+    levels = 0
+    while tasks:
+        levels += 1
+        results = [(get_chunk_checksums(source_rows, *task[1:]), get_chunk_checksums(target_rows, *task[1:]))
+                   for task in tasks]
+        tasks = validator.compare_level(tasks, results, data)
+    return data['sales', 'orders'], levels
+
+
+def test_get_tables():
+    tables = ChecksumValidator.get_tables([get_column('id', 'number', 0, True), get_column('amount', 'number', 2),
+                                           get_column('name', 'varchar2(100)')], ORACLE)
+
+    table = tables['sales', 'orders']
+    assert table['columns'] == {'id': ('ID', 'integer', 'number'), 'amount': ('AMOUNT', 'decimal', 'number'),
+                                'name': ('NAME', 'string', 'varchar2')}
+    assert table['scales'] == {'id': 0, 'amount': 2, 'name': None}
+    assert table['keys'] == ['id']
+
+
+def test_get_key():
+    table = ChecksumValidator.get_tables([get_column('id', 'number', 0, True), get_column('code', 'varchar2(10)')],
+                                         ORACLE)['sales', 'orders']
+    text_key_table = ChecksumValidator.get_tables([get_column('id', 'number', 0), get_column('code', 'varchar2(10)',
+                                                   is_primary_key=True)], ORACLE)['sales', 'orders']
+
+    assert ChecksumValidator.get_key(table, table) == ('id', None)
+    assert ChecksumValidator.get_key(table, None) == (None, "Table not found on the target")
+    assert ChecksumValidator.get_key(table, dict(table, keys=['id', 'code'])) == \
+        (None, "No single column primary key on both databases")
+    assert ChecksumValidator.get_key(text_key_table, text_key_table) == (None, "The primary key is not an integer")
+
+
+def test_get_checksum_columns():
+    source_table = ChecksumValidator.get_tables([
+        get_column('id', 'int', 0, True), get_column('price', 'decimal(10,2)', 2), get_column('ratio', 'float'),
+        get_column('note', 'nvarchar(50)'), get_column('total', 'numeric(12,4)', 4)], MSSQL)['sales', 'orders']
+    target_table = ChecksumValidator.get_tables([
+        get_column('id', 'integer', 0, True), get_column('price', 'numeric'), get_column('ratio', 'real'),
+        get_column('note', 'text'), get_column('total', 'numeric(12,2)', 2)], POSTGRES)['sales', 'orders']
+
+    columns = ChecksumValidator.get_checksum_columns(source_table, MSSQL, target_table, POSTGRES)
+
+    assert columns == {'id': 0, 'note': None, 'price': 2, 'total': 4}
+    assert list(columns) == ['id', 'note', 'price', 'total']
+
+
+@pytest.mark.parametrize('db_type, family, scale, text', [
+    (ORACLE, 'decimal', 2, "TO_CHAR(\"AMOUNT\", 'FM" + '9' * 35 + "0.00')"),
+    (POSTGRES, 'decimal', 2, "round(\"AMOUNT\", 2)::text"),
+    (POSTGRES, 'decimal', None, "\"AMOUNT\"::text"),
+    (MYSQL, 'decimal', 4, "CAST(CAST(\"AMOUNT\" AS DECIMAL(65, 4)) AS CHAR)"),
+    (MSSQL, 'string', None, "CAST(\"AMOUNT\" AS nvarchar(max))")
+])
+def test_get_column_text(db_type, family, scale, text):
+    assert ChecksumValidator.get_column_text(FakeDatabase(), db_type, 'AMOUNT', family, scale) == text
+
+
+def test_get_row_text():
+    # SQL Server adds the texts of the columns instead of passing them to CONCAT, which takes 254 arguments at most
+    columns = [(f'C{i}', 'integer', 0) for i in range(300)]
+
+    row_text = ChecksumValidator.get_row_text(FakeDatabase(), MSSQL, columns)
+
+    assert row_text.startswith("(CAST(N'' AS nvarchar(max)) + COALESCE(CAST(\"C0\" AS varchar(20)), '\\N') + '|'")
+    assert row_text.count(" + ") == 600
+    assert ChecksumValidator.get_row_text(FakeDatabase(), POSTGRES, [('ID', 'integer', 0)]) == \
+        "(COALESCE(\"ID\"::text, '\\N') || '|')"
+
+
+def test_compare_level_matched():
+    rows = {key: f"row {key}" for key in range(1, 101)}
+
+    result, levels = drill_down(ChecksumValidator(10, 1, 30), rows, dict(rows), 1, 101, 10)
+
+    assert levels == 1
+    assert result[NUM_CHUNKS] == 10
+    assert result[COLOR] == COLOR_GREEN
+    assert result[MISMATCHED_RANGES] == []
+
+
+def test_compare_level_drill_down():
+    source_rows = {key: f"row {key}" for key in range(0, 10000)}
+    target_rows = dict(source_rows)
+    target_rows[1234] = "changed"
+    del target_rows[8765]
+
+    result, levels = drill_down(ChecksumValidator(1000, 1, 30), source_rows, target_rows, 0, 10000, 1000)
+
+    # The chunks of 1000 keys are split in 100, 10 and then single keys
+    assert levels == 4
+    assert result[COLOR] == COLOR_YELLOW
+    assert sorted(result[MISMATCHED_RANGES]) == [[1234, 1234, 1, 1], [8765, 8765, 1, 0]]
+    assert result[NUM_CHUNKS] == 10 + 2 * (10 + 10 + 10)
+
+
+def test_compare_level_min_chunk_rows():
+    # A chunk with no more than min_chunk_rows rows is reported instead of being split again
+    source_rows = {key: f"row {key}" for key in range(0, 10000)}
+    target_rows = dict(source_rows)
+    target_rows[1234] = "changed"
+
+    result, levels = drill_down(ChecksumValidator(1000, 100, 30), source_rows, target_rows, 0, 10000, 1000)
+
+    assert levels == 2
+    assert result[MISMATCHED_RANGES] == [[1200, 1299, 100, 100]]
+
+
+def test_compare_level_error():
+    data = {('sales', 'orders'): {KEY_COLUMN: 'id', NUM_CHUNKS: 0, MISMATCHED_RANGES: [], REASON: None,
+                                  COLOR: COLOR_GREEN}}
+
+    tasks = ChecksumValidator(10, 1, 30).compare_level([(('sales', 'orders'), 0, 100, 10)],
+                                                       [([], TimeoutError("statement timeout"))], data)
+
+    assert tasks == []
+    assert data['sales', 'orders'][REASON] == "Query failed on the target: statement timeout"
+    assert data['sales', 'orders'][COLOR] == COLOR_ORANGE
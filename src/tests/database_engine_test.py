@@ -0,0 +1,57 @@
+"""
+Tests of the engine options and the pooled connections of the databases
+"""
+import pytest
+from sqlalchemy import create_engine
+
+from database import POOL_MAX_OVERFLOW, POOL_PRE_PING, POOL_RECYCLE, POOL_SIZE
+from database.database_engine import get_engine_options
+from database.database_types import Database
+from src.utility.utils import CommonUtility
+
+
+class SQLiteDatabase(Database):
+    def __init__(self, path, **engine_options):
+        super().__init__()
+        self.database_type = 'SQLite'
+        self.engine = create_engine(f"sqlite:///{path}", **engine_options)
+
+
+def set_configurations(monkeypatch, configurations):
+    monkeypatch.setattr(CommonUtility, 'read_configurations',
+                        staticmethod(lambda property_name, *args, **kwargs: configurations.get(property_name)))
+
+
+def test_engine_options(monkeypatch):
+    set_configurations(monkeypatch, {POOL_SIZE: '8', POOL_MAX_OVERFLOW: '2', POOL_PRE_PING: 'Yes',
+                                     POOL_RECYCLE: '1800'})
+
+    assert get_engine_options() == {'pool_size': 8, 'max_overflow': 2, 'pool_pre_ping': True, 'pool_recycle': 1800}
+
+
+@pytest.mark.parametrize('configurations, options', [
+    ({}, {}),
+    ({POOL_SIZE: '', POOL_PRE_PING: 'false'}, {'pool_pre_ping': False})
+])
+def test_default_engine_options(monkeypatch, configurations, options):
+    # Settings which are not configured are left to the defaults of SQLAlchemy
+    set_configurations(monkeypatch, configurations)
+
+    assert get_engine_options() == options
+
+
+def test_pooled_connections(tmp_path):
+    database = SQLiteDatabase(str(tmp_path / 'sales.sqlite3'), pool_size=1, max_overflow=0)
+
+    dbapi_connections = []
+    for _ in range(3):
+        with database.connect() as conn:
+            dbapi_connections.append(conn.connection.dbapi_connection)
+
+    # Every query checks out the same connection from the pool, instead of connecting again
+    assert dbapi_connections[0] is dbapi_connections[1] is dbapi_connections[2]
+    assert database.acquire_count == 3
+    assert database.engine.pool.checkedout() == 0
+
+    database.close()
+    assert database.engine.pool.checkedin() == 0
@@ -0,0 +1,85 @@
+"""
+Tests of the queries run on the DB-API cursors of the databases, on an SQLite database
+"""
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from database import SCHEMA_NAMES
+from database.database_types import Database
+
+QUERY = "SELECT schema_name, table_name FROM tables WHERE owner = :username ORDER BY table_name"
+
+
+class SQLiteDatabase(Database):
+    chunk_size = 4
+
+    def __init__(self, path):
+        super().__init__()
+        self.database_type = 'SQLite'
+        self.engine = create_engine(f"sqlite:///{path}")
+        self.fetch_sizes = []
+
+    def prepare_cursor(self, cursor, batch_size):
+        super().prepare_cursor(cursor, batch_size)
+        self.fetch_sizes.append(cursor.arraysize)
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'sales.sqlite3')
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE tables (schema_name TEXT, table_name TEXT, owner TEXT)")
+        conn.executemany("INSERT INTO tables VALUES (?, ?, ?)",
+                         [('sales', f'table_{i:02d}', 'admin') for i in range(10)] +
+                         [('hr', 'people', "o'brien")])
+    return SQLiteDatabase(path)
+
+
+def test_execute_query_stream(database):
+    batches = list(database.execute_query_stream(QUERY, params={'username': 'admin'}))
+
+    # The rows are fetched in batches of the chunk size of the database
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert batches[0][1].table_name == 'table_01'
+    assert batches[2][1]._fields == ('schema_name', 'table_name')
+    assert database.fetch_sizes == [4]
+
+
+def test_execute_query_stream_batch_size(database):
+    batches = list(database.execute_query_stream(QUERY, batch_size=6, params={'username': 'admin'}))
+
+    assert [len(batch) for batch in batches] == [6, 4]
+    assert database.fetch_sizes == [6]
+
+
+def test_execute_query(database):
+    records = database.execute_query(QUERY, {'username': "o'brien", 'database_name': 'sales'})
+
+    assert records == [{'schema_name': 'hr', 'table_name': 'people'}]
+
+
+def test_execute_query_empty(database):
+    assert database.execute_query(QUERY, {'username': 'nobody'}) == []
+
+
+def test_compile_query(database):
+    query = f"SELECT table_name FROM tables WHERE schema_name IN :{SCHEMA_NAMES} AND owner = :username"
+
+    statement, params = database.compile_query(query, {SCHEMA_NAMES: ['sales', 'hr'], 'username': 'admin',
+                                                       'database_name': 'sales'})
+    compiled = database.compiled_statements[query]
+    database.compile_query(query, {SCHEMA_NAMES: ['hr'], 'username': 'admin'})
+
+    # The schema list is expanded to one placeholder per schema, and the query is only compiled once
+    assert statement.endswith("schema_name IN (?, ?) AND owner = ?")
+    assert params == ('sales', 'hr', 'admin')
+    assert database.compiled_statements == {query: compiled}
+
+
+def test_bound_schema_names(database):
+    query = f"SELECT table_name FROM tables WHERE schema_name IN :{SCHEMA_NAMES} ORDER BY table_name"
+
+    assert database.execute_query(query, {SCHEMA_NAMES: ['hr']}) == [{'table_name': 'people'}]
+    assert len(database.execute_query(query, {SCHEMA_NAMES: ['hr', 'sales']})) == 11
@@ -0,0 +1,69 @@
+"""
+Tests of the registry of the database dialects
+"""
+import pytest
+
+from database import (CAPABILITY_BULK_CATALOG_QUERY, CAPABILITY_OBJECT_DIGESTS, CAPABILITY_SAMPLED_ROW_COUNT, MSSQL,
+                      MYSQL, database_queries, dialects)
+from database.database_engine import get_configured_dialect
+from database.database_types import DatabaseMsSQL
+from database.dialects import Dialect, get_dialect, register_dialect, supports
+
+
+class EntryPoint:
+    def __init__(self, name, dialect):
+        self.name = name
+        self.dialect = dialect
+        self.loaded = False
+
+    def load(self):
+        self.loaded = True
+        return self.dialect
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    # The dialects and queries registered by a test are removed after it
+    monkeypatch.setattr(dialects, 'DIALECTS', dict(dialects.DIALECTS))
+    monkeypatch.setattr(database_queries, 'GET_TABLES', dict(database_queries.GET_TABLES))
+    monkeypatch.setattr(database_queries, 'CHECKSUM_TYPE_FAMILIES', dict(database_queries.CHECKSUM_TYPE_FAMILIES))
+    entry_points = []
+    monkeypatch.setattr(dialects, 'get_entry_points', lambda: entry_points)
+    return entry_points
+
+
+def test_builtin_dialects():
+    assert get_dialect('MsSQL').get_database_class() is DatabaseMsSQL
+    assert get_dialect(MSSQL).get_async_database_class() is None
+    assert supports(MSSQL, CAPABILITY_SAMPLED_ROW_COUNT)
+    assert not supports(MYSQL, CAPABILITY_SAMPLED_ROW_COUNT)
+    assert not supports('unknown', CAPABILITY_BULK_CATALOG_QUERY)
+
+
+def test_register_dialect(registry):
+    register_dialect(Dialect('duckdb', 'duckdb_validator:DuckDBDatabase', queries={'GET_TABLES': "SELECT 1"},
+                             type_families={'bigint': 'integer'}, capabilities=(CAPABILITY_OBJECT_DIGESTS,)))
+
+    assert database_queries.GET_TABLES['duckdb'] == "SELECT 1"
+    assert database_queries.CHECKSUM_TYPE_FAMILIES['duckdb'] == {'bigint': 'integer'}
+    assert supports('DuckDB', CAPABILITY_OBJECT_DIGESTS)
+    assert not supports('duckdb', CAPABILITY_BULK_CATALOG_QUERY)
+
+
+def test_entry_point_dialect(registry):
+    entry_point = EntryPoint('DuckDB', Dialect('duckdb', 'duckdb_validator:DuckDBDatabase'))
+    registry.append(entry_point)
+
+    assert get_dialect('duckdb') is entry_point.dialect
+    assert entry_point.loaded
+    # The driver of the dialect is only imported when a database is created
+    with pytest.raises(ModuleNotFoundError, match="duckdb_validator"):
+        entry_point.dialect.get_database_class()
+
+
+def test_unknown_dialect(registry):
+    registry.append(EntryPoint('duckdb', Dialect('duckdb', DatabaseMsSQL)))
+
+    assert get_dialect('sqlite') is None
+    with pytest.raises(SystemExit):
+        get_configured_dialect('sqlite')
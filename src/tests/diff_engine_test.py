@@ -0,0 +1,180 @@
+"""
+Tests of the comparison of the catalogs of the source and the target by the diff engine
+"""
+import pytest
+
+from src import *
+from src.catalog import ObjectNames
+from src.columnar_diff_engine import ColumnarDiffEngine
+from src.diff_engine import DiffEngine
+from src.external_diff_engine import ExternalDiffEngine
+from src.spill import CatalogSpill
+
+OBJECT_TYPES = ['table', 'view', 'index']
+
+
+def build_catalog(schemas, objects_key, count_key):
+    """
+    Builds the catalog of one side in the structure of MigrationSummaryObject.prepare_data
+    :param schemas: Dictionary with the object names of each object type of each schema
+    """
+    return {schema: {obj: {objects_key: ObjectNames(names.get(obj, [])), count_key: len(names.get(obj, []))}
+                     for obj in OBJECT_TYPES} for schema, names in schemas.items()}
+
+
+def get_catalogs():
+    """
+    Catalogs with matched, missing, extra and duplicated names, a schema only on the source and a schema only on the
+    target, whose placeholders on the other side hold plain lists like in prepare_data
+    """
+    source_data = build_catalog({
+        'sales': {'table': ['orders', 'customers', 'items'], 'index': ['ix_orders', 'ix_items', 'ix_items']},
+        'hr': {'table': ['employees'], 'view': ['v_staff']},
+        'legacy': {'table': ['old_orders']}
+    }, OBJECTS_SOURCE, NUM_SOURCE)
+    target_data = build_catalog({
+        'sales': {'table': ['orders', 'customers', 'returns'], 'index': ['ix_orders']},
+        'hr': {'table': ['employees'], 'view': ['v_staff']},
+        'audit': {'table': ['events']}
+    }, OBJECTS_TARGET, NUM_TARGET)
+    source_data['audit'] = {obj: {OBJECTS_SOURCE: [], NUM_SOURCE: 0} for obj in OBJECT_TYPES}
+    target_data['legacy'] = {obj: {OBJECTS_TARGET: [], NUM_TARGET: 0} for obj in OBJECT_TYPES}
+    return source_data, target_data
+
+
+def spill_catalog(data, directory, prefix, objects_key):
+    """
+    Replaces the ObjectNames of a catalog with the SpilledNames of a CatalogSpill, like when a memory budget is
+    configured. The placeholders of absent schemas are kept as plain lists
+    """
+    spill = CatalogSpill(directory, prefix, run_size=64)
+    for schema, schema_data in data.items():
+        for obj in OBJECT_TYPES:
+            spill.add(obj, ((schema, name) for name in schema_data[obj][objects_key]))
+
+    for (schema, obj), names in spill.merge().items():
+        data[schema][obj][objects_key] = names
+
+    return data
+
+
+def to_lists(data):
+    """
+    Turns the sequences of names in the validation or comparison data into lists, whichever backend built them
+    """
+    if isinstance(data, dict):
+        return {key: to_lists(value) for key, value in data.items()}
+    if isinstance(data, (str, int, float, bool)) or data is None:
+        return data
+    return [to_lists(value) for value in data]
+
+
+def test_compare_buckets():
+    validation_data, comparison_data = DiffEngine(OBJECT_TYPES).compare(*get_catalogs())
+
+    tables = validation_data[OBJECTS]['sales']['table']
+    assert list(tables[MISSING_ITEMS]) == ['items']
+    assert tables[VALIDATION_PERCENT] == 66.67
+    assert tables[REASON] == "Count matched, names didn't"
+    assert list(comparison_data['sales'][ALL_ITEMS]['table'][OBJECTS_TARGET]) == ['returns']
+
+    # The duplicated index name lowers the percentage and is listed once as missing
+    indexes = validation_data[OBJECTS]['sales']['index']
+    assert list(indexes[MISSING_ITEMS]) == ['ix_items']
+    assert indexes[VALIDATION_PERCENT] == 33.33
+    assert indexes[REASON] == "Partially migrated"
+
+    assert validation_data[OBJECTS]['hr']['table'][REASON] == "Counts and names matched"
+    assert validation_data[OBJECTS]['hr'][VALIDATION_PERCENT] == 100.0
+
+
+def test_compare_absent_schemas():
+    validation_data, comparison_data = DiffEngine(OBJECT_TYPES).compare(*get_catalogs())
+
+    assert validation_data[SCHEMA][MISSING_ITEMS] == []
+    assert validation_data[OBJECTS]['legacy']['table'][REASON] == "No objects were migrated"
+    assert validation_data[OBJECTS]['legacy'][VALIDATION_PERCENT] == 'NA'
+    assert validation_data[OBJECTS]['audit']['table'][REASON] == "Only present on target"
+    assert list(comparison_data['audit'][ALL_ITEMS]['table'][OBJECTS_TARGET]) == ['events']
+    assert not comparison_data['audit'][DISPLAY_FLAG]
+
+
+def test_compare_matched_digests():
+    source_data, target_data = get_catalogs()
+    source_data['hr']['table'] = {OBJECTS_SOURCE: [], NUM_SOURCE: 4, MATCHED_OBJECTS: 3}
+    target_data['hr']['table'] = {OBJECTS_TARGET: [], NUM_TARGET: 4, MATCHED_OBJECTS: 3}
+
+    validation_data, _ = DiffEngine(OBJECT_TYPES).compare(source_data, target_data)
+
+    assert validation_data[OBJECTS]['hr']['table'][VALIDATION_PERCENT] == 75.0
+    assert validation_data[OBJECTS]['hr']['table'][REASON] == "Counts and names matched"
+
+
+@pytest.mark.parametrize('source_count, target_count, color', [
+    (10, 10, COLOR_GREEN),
+    (10, 9, COLOR_YELLOW),
+    (None, 9, COLOR_ORANGE)
+])
+def test_compare_row_counts(source_count, target_count, color):
+    source_rows = [{SCHEMA_NAME: 'sales', TABLE_NAME: 'orders', ROW_COUNT: source_count},
+                   {SCHEMA_NAME: 'sales', TABLE_NAME: 'items', ROW_COUNT: 5}]
+    target_rows = [{SCHEMA_NAME: 'sales', TABLE_NAME: 'orders', ROW_COUNT: target_count}]
+
+    source_counts, target_counts = DiffEngine.compare_row_counts(source_rows, target_rows)
+
+    assert source_counts['sales', 'orders'][COLOR] == color
+    assert source_counts['sales', 'items'][COLOR] == COLOR_RED
+    assert target_counts['sales', 'orders'] == {ROW_COUNT: target_count}
+
+
+def test_columnar_compare():
+    expected = DiffEngine(OBJECT_TYPES).compare(*get_catalogs())
+    actual = ColumnarDiffEngine(OBJECT_TYPES).compare(*get_catalogs())
+
+    assert to_lists(actual) == to_lists(expected)
+
+
+def test_columnar_compare_empty():
+    source_data = build_catalog({'sales': {}}, OBJECTS_SOURCE, NUM_SOURCE)
+    target_data = build_catalog({'sales': {}}, OBJECTS_TARGET, NUM_TARGET)
+
+    expected = DiffEngine(OBJECT_TYPES).compare(source_data, target_data)
+    actual = ColumnarDiffEngine(OBJECT_TYPES).compare(source_data, target_data)
+
+    assert to_lists(actual) == to_lists(expected)
+
+
+@pytest.mark.parametrize('tiered', [False, True])
+def test_columnar_compare_row_counts(tiered):
+    source_rows = [{SCHEMA_NAME: 'sales', TABLE_NAME: 'orders', ROW_COUNT: 10},
+                   {SCHEMA_NAME: 'sales', TABLE_NAME: 'returns', ROW_COUNT: 10},
+                   {SCHEMA_NAME: 'sales', TABLE_NAME: 'items', ROW_COUNT: None},
+                   {SCHEMA_NAME: 'hr', TABLE_NAME: 'employees', ROW_COUNT: 3}]
+    target_rows = [{SCHEMA_NAME: 'sales', TABLE_NAME: 'orders', ROW_COUNT: 10},
+                   {SCHEMA_NAME: 'sales', TABLE_NAME: 'returns', ROW_COUNT: 7},
+                   {SCHEMA_NAME: 'sales', TABLE_NAME: 'items', ROW_COUNT: 4}]
+    if tiered:
+        for row in source_rows + target_rows:
+            row[ROW_COUNT_TIER] = TIER_EXACT
+
+    assert ColumnarDiffEngine.compare_row_counts(source_rows, target_rows) == \
+        DiffEngine.compare_row_counts(source_rows, target_rows)
+
+
+def test_external_compare(tmp_path):
+    expected = DiffEngine(OBJECT_TYPES).compare(*get_catalogs())
+    actual = ExternalDiffEngine(OBJECT_TYPES, str(tmp_path)).compare(*get_catalogs())
+
+    assert to_lists(actual) == to_lists(expected)
+
+
+def test_external_compare_spilled(tmp_path, monkeypatch):
+    monkeypatch.setattr('src.spill.SPILL_CHUNK_SIZE', 2)
+    source_data, target_data = get_catalogs()
+    source_data = spill_catalog(source_data, str(tmp_path), 'source', OBJECTS_SOURCE)
+    target_data = spill_catalog(target_data, str(tmp_path), 'target', OBJECTS_TARGET)
+
+    expected = DiffEngine(OBJECT_TYPES).compare(*get_catalogs())
+    actual = ExternalDiffEngine(OBJECT_TYPES, str(tmp_path)).compare(source_data, target_data)
+
+    assert to_lists(actual) == to_lists(expected)
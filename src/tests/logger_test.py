@@ -0,0 +1,63 @@
+"""
+Tests of the logging of the records through the queue
+"""
+import logging
+import queue
+import threading
+from logging.handlers import QueueListener
+
+from logger import DebugPayload, LogQueueHandler
+
+
+class CountingPayload(DebugPayload):
+    """
+    Records the threads on which the payload is serialized
+    """
+    __slots__ = ('threads',)
+
+    def __init__(self, payload):
+        super().__init__(payload)
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread())
+        return super().__str__()
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+
+def test_payload_serialized_by_listener():
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger('logger_test')
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    queue_handler = LogQueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+    payload = CountingPayload({'rows': [1, 2, 3]})
+
+    try:
+        logger.debug("Result: %s", payload)
+    finally:
+        logger.removeHandler(queue_handler)
+
+    # The record is on the queue unformatted, with the payload still in its arguments
+    record = log_queue.get_nowait()
+    assert record.args == (payload,)
+    assert payload.threads == []
+
+    log_queue.put(record)
+    handler = ListHandler()
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    listener.stop()
+
+    assert handler.messages == ['Result: {\n    "rows": [\n        1,\n        2,\n        3\n    ]\n}']
+    assert len(payload.threads) == 1
+    assert payload.threads[0] is not threading.current_thread()
@@ -0,0 +1,169 @@
+"""
+Tests of the cache of the query results, on an SQLite database
+"""
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from database.database_engine import ConfiguredDatabase
+from database import query_cache as query_cache_module
+from database.database_types import Database
+from database.query_cache import QueryCache
+from logger import get_logger
+from src.report_generator import MigrationSummaryObject
+from src.spill import CatalogSpill
+
+QUERY = "SELECT schema_name, table_name FROM tables WHERE owner = :username ORDER BY table_name"
+
+
+class SQLiteDatabase(Database):
+    chunk_size = 3
+
+    def __init__(self, path):
+        super().__init__()
+        self.database_type = 'SQLite'
+        self.engine = create_engine(f"sqlite:///{path}")
+
+
+class CachedDatabase(ConfiguredDatabase):
+    def __init__(self, path, query_cache):
+        self.logger = get_logger(__name__)
+        self.db_type = 'sqlite'
+        self.host = 'localhost'
+        self.port = 0
+        self.database = 'sales'
+        self.username = 'admin'
+        self.db = SQLiteDatabase(path)
+        self.query_cache = query_cache
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    path = str(tmp_path / 'sales.sqlite3')
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE tables (schema_name TEXT, table_name TEXT, owner TEXT)")
+        conn.executemany("INSERT INTO tables VALUES (?, ?, ?)",
+                         [('Sales', f'Table_{i:02d}', 'admin') for i in range(10)] + [('hr', 'other', 'hr')])
+    return path
+
+
+@pytest.fixture
+def query_cache(tmp_path):
+    return QueryCache(str(tmp_path / 'output' / 'query_cache.sqlite3'), 3600)
+
+
+def count_rows(query_cache, table):
+    with query_cache.connect() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def drop_tables(path):
+    # The cached results are then the only place the rows can be read from
+    with sqlite3.connect(path) as conn:
+        conn.execute("DROP TABLE tables")
+
+
+def test_execute_query(database_path, query_cache):
+    database = CachedDatabase(database_path, query_cache)
+    records = database.execute_query(QUERY)
+
+    drop_tables(database_path)
+
+    assert len(records) == 10
+    assert database.execute_query(QUERY) == records
+    # The entries are keyed by the parameters and the database
+    assert query_cache.get(database, QUERY, database.get_query_parameters({'username': 'hr'})) is None
+    database.database = 'hr'
+    assert query_cache.get(database, QUERY, database.get_query_parameters()) is None
+
+
+def test_ttl(database_path, query_cache, monkeypatch):
+    database = CachedDatabase(database_path, query_cache)
+    now = [1000.0]
+    monkeypatch.setattr(query_cache_module, 'time', lambda: now[0])
+    database.execute_query(QUERY)
+
+    now[0] += 3599
+    assert query_cache.get(database, QUERY, database.get_query_parameters()) is not None
+    now[0] += 2
+    assert query_cache.get(database, QUERY, database.get_query_parameters()) is None
+
+
+def test_bypass_cache(database_path, query_cache):
+    database = CachedDatabase(database_path, query_cache)
+
+    database.execute_query(QUERY, use_cache=False)
+
+    assert count_rows(query_cache, 'query_cache') == 0
+
+
+def test_stream(database_path, query_cache):
+    database = CachedDatabase(database_path, query_cache)
+
+    stream = database.execute_query_stream(QUERY)
+    first_batch = next(stream)
+    # The batches are written to the cache as they are streamed, and the entry once the stream ends
+    assert [row.table_name for row in first_batch] == ['Table_00', 'Table_01', 'Table_02']
+    assert count_rows(query_cache, 'query_cache_batches') == 1
+    assert count_rows(query_cache, 'query_cache') == 0
+
+    batches = [first_batch] + list(stream)
+    assert [len(batch) for batch in batches] == [3, 3, 3, 1]
+    assert count_rows(query_cache, 'query_cache_batches') == 4
+    assert count_rows(query_cache, 'query_cache') == 1
+
+    drop_tables(database_path)
+    cached_batches = list(database.execute_query_stream(QUERY))
+    assert cached_batches == batches
+    assert cached_batches[0][0].schema_name == 'Sales'
+    assert database.execute_query(QUERY) == [row._asdict() for batch in batches for row in batch]
+
+
+def test_stream_not_read_to_the_end(database_path, query_cache):
+    database = CachedDatabase(database_path, query_cache)
+
+    stream = database.execute_query_stream(QUERY)
+    next(stream)
+    stream.close()
+
+    assert count_rows(query_cache, 'query_cache') == 0
+    assert query_cache.get(database, QUERY, database.get_query_parameters()) is None
+
+
+def test_stream_of_cached_query(database_path, query_cache):
+    # Results stored by execute_query are streamed in batches too
+    database = CachedDatabase(database_path, query_cache)
+    records = database.execute_query(QUERY)
+
+    drop_tables(database_path)
+    batches = list(database.execute_query_stream(QUERY, batch_size=4))
+
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert [row._asdict() for batch in batches for row in batch] == records
+
+
+def test_invalidate(database_path, query_cache):
+    database = CachedDatabase(database_path, query_cache)
+    list(database.execute_query_stream(QUERY))
+
+    assert query_cache.invalidate(host='localhost', database_name='sales') == 1
+    assert count_rows(query_cache, 'query_cache_batches') == 0
+
+
+def test_spill_with_cache(database_path, query_cache, tmp_path):
+    # With a memory budget the rows of the object queries are spilled as they are streamed through the cache
+    database = CachedDatabase(database_path, query_cache)
+    params = {'schema_names': ['sales']}
+
+    spills = []
+    for run in range(2):
+        spill = CatalogSpill(str(tmp_path), f'source_{run}', run_size=64)
+        assert MigrationSummaryObject.spill_objects(spill, database, QUERY, 'table', params) == {}
+        spills.append({bucket: list(names) for bucket, names in spill.merge().items()})
+        if run == 0:
+            drop_tables(database_path)
+
+    assert spills[0] == {('sales', 'table'): [f'table_{i:02d}' for i in range(10)]}
+    assert spills[1] == spills[0]
+    assert count_rows(query_cache, 'query_cache_batches') == 4
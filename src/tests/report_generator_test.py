@@ -0,0 +1,327 @@
+"""
+Tests of the extraction of the catalogs, on SQLite databases which stand in for the source and the target
+"""
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database import MSSQL, POSTGRES, SECTION_SOURCE, SECTION_TARGET, database_queries
+from database.async_database_types import AsyncDatabase, AsyncDatabaseThreaded
+from database.database_engine import ConfiguredDatabase
+from database.database_types import Database
+from logger import get_logger
+from src import *
+from src.async_report_generator import AsyncMigrationSummaryObject
+from src.report_generator import MigrationSummaryObject, ObjectDigest
+from src.scheduler import ExtractionScheduler
+
+OBJECT_QUERY = ("SELECT schema_name, name AS {0}_name FROM objects WHERE kind = '{0}' "
+                "AND lower(schema_name) IN :schema_names ORDER BY name")
+OBJECT_QUERIES = [OBJECT_QUERY.format(obj) for obj in MigrationSummaryObject.objects]
+QUERIES = {
+    'GET_SCHEMAS': "SELECT DISTINCT lower(schema_name) AS schema_name FROM objects",
+    'GET_TABLE_ROW_COUNTS': "SELECT lower(schema_name) AS schema_name, lower(name) AS table_name, row_count, "
+                            "schema_name AS schema_identifier, name AS table_identifier FROM objects "
+                            "WHERE kind = 'table'",
+    'GET_VERSION': "SELECT sqlite_version() AS version",
+    'GET_DB_SIZE': "SELECT 1 AS database_size",
+    'GET_ENCODING': "SELECT 'UTF8' AS encoding",
+    'GET_SCHEMA_DDL_MARKERS': "SELECT lower(schema_name) AS schema_name, MAX(modified) AS ddl_marker FROM objects "
+                              "WHERE lower(schema_name) IN :schema_names GROUP BY lower(schema_name)",
+    'GET_OBJECT_DIGESTS': "SELECT lower(objects.schema_name) AS schema_name, COUNT(*) AS object_count, "
+                          "COUNT(DISTINCT lower(objects.{column})) AS distinct_count, "
+                          "SUM(length(objects.{column}) * unicode(lower(objects.{column}))) AS digest "
+                          "FROM ({query}) objects GROUP BY lower(objects.schema_name)"
+}
+SOURCE_OBJECTS = [('Sales', 'table', 'Orders', 10, 1), ('sales', 'table', 'items', 5, 1),
+                  ('sales', 'index', 'ix_orders', 0, 1), ('hr', 'view', 'people', 0, 1),
+                  ('legacy', 'table', 'archive', 3, 1)]
+TARGET_OBJECTS = [('sales', 'table', 'orders', 10, 1), ('sales', 'table', 'lines', 5, 1),
+                  ('sales', 'index', 'ix_orders', 0, 1), ('hr', 'view', 'people', 0, 1)]
+
+
+class SQLiteDatabase(Database):
+    def __init__(self, path):
+        super().__init__()
+        self.database_type = 'SQLite'
+        self.engine = create_engine(f"sqlite:///{path}")
+
+
+class CatalogDatabase(ConfiguredDatabase):
+    """
+    SQLite database with an objects table, which the queries of the database type read instead of the catalog
+    """
+
+    def __init__(self, path, db_type, objects=None):
+        """
+        :param objects: Rows of the objects table to create, or None to open the table of a previous test run
+        """
+        if objects is not None:
+            with sqlite3.connect(path) as conn:
+                conn.execute("CREATE TABLE objects (schema_name TEXT, kind TEXT, name TEXT, row_count INTEGER, "
+                             "modified INTEGER)")
+                conn.executemany("INSERT INTO objects VALUES (?, ?, ?, ?, ?)", objects)
+
+        self.logger = get_logger(__name__)
+        self.db_type = db_type
+        self.host = 'localhost'
+        self.port = 0
+        self.database = db_type
+        self.username = 'admin'
+        self.password = 'secret'
+        self.db = SQLiteDatabase(path)
+        self.query_cache = None
+        self.queries = []
+        self.queries_lock = threading.Lock()
+
+    def execute_query(self, query, params=None, use_cache=True):
+        with self.queries_lock:
+            self.queries.append(query)
+        return super().execute_query(query, params, use_cache)
+
+    def execute_query_stream(self, query, batch_size=None, params=None):
+        with self.queries_lock:
+            self.queries.append(query)
+        return super().execute_query_stream(query, batch_size, params)
+
+    async def execute_query_async(self, query, params=None, use_cache=True):
+        with self.queries_lock:
+            self.queries.append(query)
+        return await super().execute_query_async(query, params, use_cache)
+
+
+@pytest.fixture(autouse=True)
+def queries(monkeypatch):
+    for query_name, query in QUERIES.items():
+        for db_type in (MSSQL, POSTGRES):
+            monkeypatch.setitem(getattr(database_queries, query_name), db_type, query)
+
+
+def create_summary(tmp_path, summary_class=MigrationSummaryObject, source_objects=SOURCE_OBJECTS,
+                   target_objects=TARGET_OBJECTS, **attributes):
+    tmp_path.mkdir(parents=True, exist_ok=True)
+    summary = summary_class.__new__(summary_class)
+    summary.logger = get_logger(__name__)
+    summary.source_db = CatalogDatabase(str(tmp_path / 'source.sqlite3'), MSSQL, source_objects)
+    summary.target_db = CatalogDatabase(str(tmp_path / 'target.sqlite3'), POSTGRES, target_objects)
+    summary.db_type_source = MSSQL
+    summary.db_type_target = POSTGRES
+    summary.extraction_mode = EXTRACTION_MODE_BULK
+    summary.incremental = False
+    summary.digest_comparison = False
+    summary.comparison_backend = COMPARISON_BACKEND_PYTHON
+    summary.memory_budget = 0
+    summary.spill_directory = None
+    summary.row_counter = None
+    summary.partition_row_count = False
+    summary.data_validator = None
+    summary.data_validation_data = None
+    summary.spot_checker = None
+    summary.spot_check_data = None
+    summary.concurrency = {SECTION_SOURCE: 2, SECTION_TARGET: 2}
+    summary.scheduler = ExtractionScheduler(2, 2)
+    summary.output_directory = str(tmp_path)
+    summary.incremental_state = {}
+    summary.next_incremental_state = {}
+    summary.object_query_mapping = {obj: {MSSQL: OBJECT_QUERY.format(obj), POSTGRES: OBJECT_QUERY.format(obj)}
+                                    for obj in summary.objects}
+    summary.database_summary = None
+    summary.combined_row_count_data = None
+    summary.validation_data = None
+    summary.comparison_data = None
+    summary.missing_schemas = []
+    for name, value in attributes.items():
+        setattr(summary, name, value)
+    return summary
+
+
+def get_names(schema_objects):
+    return {schema: {obj: list(names) for obj, names in objects.items() if len(names)}
+            for schema, objects in schema_objects.items()}
+
+
+def test_get_schema_batches(tmp_path):
+    schema_names = [f'schema_{i}' for i in range(SCHEMA_BATCH_SIZE + 1)]
+
+    bulk = create_summary(tmp_path).get_schema_batches(MSSQL, schema_names)
+    per_schema = create_summary(tmp_path / 'schema', extraction_mode=EXTRACTION_MODE_SCHEMA).get_schema_batches(
+        MSSQL, schema_names)
+
+    assert [len(batch) for batch in bulk] == [SCHEMA_BATCH_SIZE, 1]
+    assert per_schema == [[schema] for schema in schema_names]
+
+
+@pytest.mark.parametrize('extraction_mode, num_queries', [(EXTRACTION_MODE_BULK, 8), (EXTRACTION_MODE_SCHEMA, 24)])
+def test_extraction_modes(tmp_path, extraction_mode, num_queries):
+    summary = create_summary(tmp_path, extraction_mode=extraction_mode)
+
+    schema_objects = summary.get_schema_objects(summary.source_db, MSSQL, ['Sales', 'hr', 'legacy'],
+                                                SECTION_SOURCE)
+
+    # Both modes read the same objects, with one query per object type or one per schema and object type
+    assert get_names(schema_objects) == {'sales': {'table': ['items', 'orders'], 'index': ['ix_orders']},
+                                         'hr': {'view': ['people']}, 'legacy': {'table': ['archive']}}
+    assert len(summary.source_db.queries) == num_queries
+
+
+def test_run_both():
+    scheduler = ExtractionScheduler(1, 1)
+    barrier = threading.Barrier(2, timeout=5)
+
+    # Each side waits for the other, so this only returns if the source and the target run at the same time
+    try:
+        assert scheduler.run_both(lambda: barrier.wait() + 10, lambda: barrier.wait() + 20) in [(10, 21), (11, 20)]
+    finally:
+        scheduler.shutdown()
+
+
+def test_generate_report_data(tmp_path):
+    summary = create_summary(tmp_path)
+
+    summary.generate_report_data()
+
+    assert summary.missing_schemas == ['legacy']
+    assert summary.database_summary[SECTION_SOURCE]['encoding'] == 'UTF8'
+    assert summary.combined_row_count_data[SECTION_SOURCE][('sales', 'orders')] == {ROW_COUNT: 10,
+                                                                                   COLOR: COLOR_GREEN}
+    assert summary.combined_row_count_data[SECTION_SOURCE][('sales', 'items')][COLOR] == COLOR_RED
+    assert list(summary.validation_data[OBJECTS]['sales']['table'][MISSING_ITEMS]) == ['items']
+    tables = summary.comparison_data['sales'][ALL_ITEMS]['table']
+    assert (list(tables[OBJECTS_SOURCE]), list(tables[OBJECTS_TARGET])) == (['items'], ['lines'])
+
+
+def test_incremental(tmp_path):
+    summary = create_summary(tmp_path, incremental=True)
+    summary.generate_report_data()
+
+    # Only the changed schema is read again by the next run, the other schemas are taken from the state
+    with sqlite3.connect(str(tmp_path / 'target.sqlite3')) as conn:
+        conn.execute("INSERT INTO objects VALUES ('sales', 'table', 'items', 5, 2)")
+    next_summary = create_summary(tmp_path / 'next', incremental=True, output_directory=str(tmp_path),
+                                  source_db=CatalogDatabase(str(tmp_path / 'source.sqlite3'), MSSQL),
+                                  target_db=CatalogDatabase(str(tmp_path / 'target.sqlite3'), POSTGRES))
+    next_summary.incremental_state = next_summary.load_incremental_state()
+    next_summary.generate_report_data()
+
+    assert next_summary.incremental_state[SECTION_TARGET][DDL_MARKERS] == {'sales': '1', 'hr': '1'}
+    assert next_summary.next_incremental_state[SECTION_TARGET][DDL_MARKERS] == {'sales': '2', 'hr': '1'}
+    assert [query for query in next_summary.source_db.queries if query in OBJECT_QUERIES] == []
+    assert len([query for query in next_summary.target_db.queries if query in OBJECT_QUERIES]) == 8
+    assert list(next_summary.validation_data[OBJECTS]['sales']['table'][MISSING_ITEMS]) == []
+
+
+def test_build_ddl_markers():
+    markers = MigrationSummaryObject.build_ddl_markers(['Sales', 'HR'], [{SCHEMA_NAME: 'SALES', DDL_MARKER: 12}])
+
+    assert markers == {'sales': '12', 'hr': ''}
+
+
+def test_get_changed_schemas(tmp_path):
+    summary = create_summary(tmp_path, incremental_state={
+        SECTION_SOURCE: {DDL_MARKERS: {'sales': '1', 'hr': '1'}, OBJECTS: {'sales': {}, 'hr': {}}}})
+
+    changed_schemas = summary.get_changed_schemas(SECTION_SOURCE, {'sales': '2', 'hr': '1', 'legacy': '1'})
+
+    assert changed_schemas == ['sales', 'legacy']
+
+
+def test_get_digest_query(tmp_path):
+    summary = create_summary(tmp_path)
+
+    query = summary.get_digest_query(MSSQL, 'table')
+
+    assert 'ORDER BY' not in query
+    assert query.endswith("FROM (SELECT schema_name, name AS table_name FROM objects WHERE kind = 'table' AND "
+                          "lower(schema_name) IN :schema_names ) objects GROUP BY lower(objects.schema_name)")
+
+
+def test_compare_object_digests(tmp_path):
+    summary = create_summary(tmp_path)
+    source_digests = {('sales', 'table'): ObjectDigest(2, 2, 100), ('sales', 'index'): ObjectDigest(1, 1, 7)}
+    target_digests = {('sales', 'table'): ObjectDigest(2, 2, 101), ('sales', 'index'): ObjectDigest(1, 1, 7)}
+
+    matched_digests, source_object_schemas, target_object_schemas = summary.compare_object_digests(
+        ['Sales', 'legacy'], ['sales'], source_digests, target_digests)
+
+    # Object types without any objects on both sides match too
+    assert matched_digests[('sales', 'index')] == ObjectDigest(1, 1, 7)
+    assert matched_digests[('sales', 'view')] == ObjectDigest(0, 0, 0)
+    assert ('sales', 'table') not in matched_digests
+    assert source_object_schemas['table'] == ['Sales', 'legacy']
+    assert source_object_schemas['index'] == ['legacy']
+    assert target_object_schemas['index'] == []
+
+
+def test_digest_comparison(tmp_path):
+    summary = create_summary(tmp_path, digest_comparison=True)
+
+    summary.generate_report_data()
+
+    # The names are only read where the digests differ, and the counts of the matched object types are kept
+    object_queries = [query for query in summary.target_db.queries if query in OBJECT_QUERIES]
+    assert object_queries == [OBJECT_QUERY.format('table')]
+    assert summary.validation_data[OBJECTS]['hr']['view'][REASON] == "Counts and names matched"
+    assert summary.comparison_data['hr'][ALL_ITEMS]['view'][NUM_SOURCE] == 1
+    assert list(summary.validation_data[OBJECTS]['sales']['table'][MISSING_ITEMS]) == ['items']
+
+
+class AiosqliteDatabase(AsyncDatabase):
+    def __init__(self, path):
+        super().__init__()
+        self.database_type = 'SQLite'
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+
+def get_report_data(summary):
+    return [summary.combined_row_count_data, summary.database_summary, sorted(summary.missing_schemas),
+            summary.validation_data, summary.comparison_data]
+
+
+@pytest.mark.parametrize('native', [False, True])
+def test_asyncio_engine(tmp_path, native):
+    summary = create_summary(tmp_path / 'threads')
+    summary.generate_report_data()
+    async_summary = create_summary(tmp_path / 'asyncio', AsyncMigrationSummaryObject,
+                                   concurrency={SECTION_SOURCE: 1, SECTION_TARGET: 1})
+    # Without a native asyncio driver the queries run on the blocking database in worker threads
+    for database in (async_summary.source_db, async_summary.target_db):
+        database.async_db = AiosqliteDatabase(database.db.engine.url.database) if native \
+            else AsyncDatabaseThreaded(database.db)
+
+    async_summary.generate_report_data()
+
+    # The asyncio engine returns the same data as the thread pools of the scheduler
+    assert get_report_data(async_summary) == get_report_data(summary)
+    assert len(async_summary.source_db.queries) == len(summary.source_db.queries)
+
+
+def test_partition_row_counts(tmp_path):
+    summary = create_summary(tmp_path, partition_row_count=True)
+    tables = [{SCHEMA_NAME: 'sales', TABLE_NAME: 'orders', ROW_COUNT: 10}]
+    source_partitions = [{SCHEMA_NAME: 'sales', TABLE_NAME: 'orders', PARTITION_NUMBER: number, ROW_COUNT: row_count}
+                         for number, row_count in ((1, 4), (2, 6))]
+    target_partitions = [source_partitions[0], {**source_partitions[1], ROW_COUNT: 5},
+                         {**source_partitions[1], PARTITION_NUMBER: 3, ROW_COUNT: 1}]
+
+    row_count_data = summary.build_row_count_data((tables, source_partitions), (tables, target_partitions))
+
+    # The tables match, while the rows of the second partition moved to a new partition on the target
+    assert row_count_data[SECTION_SOURCE][('sales', 'orders')][COLOR] == COLOR_GREEN
+    assert row_count_data[PARTITIONS][SECTION_SOURCE] == {('sales', 'orders', 1): {ROW_COUNT: 4, COLOR: COLOR_GREEN},
+                                                          ('sales', 'orders', 2): {ROW_COUNT: 6, COLOR: COLOR_YELLOW}}
+    assert row_count_data[PARTITIONS][SECTION_TARGET][('sales', 'orders', 3)] == {ROW_COUNT: 1}
+
+
+def test_get_partitions(tmp_path, monkeypatch):
+    monkeypatch.setitem(database_queries.GET_PARTITIONED_INDEX, MSSQL,
+                        "SELECT lower(schema_name) AS schema_name, lower(name) AS table_name, 1 AS partition_number, "
+                        "row_count FROM objects WHERE kind = 'table' ORDER BY lower(name)")
+    summary = create_summary(tmp_path, partition_row_count=True)
+
+    assert summary.get_partitions(summary.source_db, MSSQL, SECTION_SOURCE)[0] == {
+        SCHEMA_NAME: 'legacy', TABLE_NAME: 'archive', PARTITION_NUMBER: 1, ROW_COUNT: 3}
+    summary.partition_row_count = False
+    assert summary.get_partitions(summary.source_db, MSSQL, SECTION_SOURCE) == []
@@ -0,0 +1,171 @@
+"""
+Tests of the exact and tiered row counts, on a fake database which returns the counts of its tables
+"""
+import re
+
+from database import MYSQL, ORACLE, POSTGRES, SECTION_SOURCE
+from src import *
+from src.row_counter import ExactRowCounter, TieredRowCounter
+
+
+class FakeDatabase:
+    """
+    Counts the rows of a table, or of a partition, from a dictionary. The samples are used for the sampled counts,
+    and a table which is not in the dictionary cannot be counted, like a count running into the timeout
+    """
+
+    def __init__(self, counts, samples=None):
+        self.counts = counts
+        self.samples = samples or {}
+        self.queries = []
+
+    @staticmethod
+    def quote_table(schema_name, table_name):
+        return f"{schema_name}.{table_name}"
+
+    @staticmethod
+    def quote_identifier(name):
+        return name
+
+    def execute_scalar(self, query, timeout=None):
+        self.queries.append(query)
+        name = re.search(r"FROM (?:ONLY )?(\S+)", query).group(1)
+        partition = re.search(r"PARTITION \((\S+)\)", query)
+        if partition is not None:
+            name += f" partition {partition.group(1)}"
+
+        counts = self.samples if 'SAMPLE' in query.upper() else self.counts
+        if name not in counts:
+            raise TimeoutError("canceling statement due to statement timeout")
+        return counts[name]
+
+
+def get_table(schema_name, table_name, row_count):
+    return {SCHEMA_NAME: schema_name, TABLE_NAME: table_name, ROW_COUNT: row_count, SCHEMA_IDENTIFIER: schema_name,
+            TABLE_IDENTIFIER: table_name}
+
+
+def get_partition(table_name, partition_number, partition_name):
+    partition = get_table('sales', table_name, 100)
+    partition.update({PARTITION_NUMBER: partition_number, PARTITION_SCHEMA: 'sales',
+                      PARTITION_IDENTIFIER: partition_name, PARTITION_FUNCTION: None, PARTITION_COLUMN: None})
+    return partition
+
+
+def to_counts(rows, *columns):
+    return {tuple(row[column] for column in columns): row[ROW_COUNT] for row in rows}
+
+
+def test_count_tables():
+    database = FakeDatabase({'sales.orders': 10, 'sales.items': 20})
+    tables = [get_table('sales', 'orders', 5), get_table('sales', 'items', None), get_table('sales', 'returns', 7)]
+
+    rows = ExactRowCounter(2, 30).count_tables(database, POSTGRES, tables, SECTION_SOURCE)
+
+    assert rows == [{SCHEMA_NAME: 'sales', TABLE_NAME: 'orders', ROW_COUNT: 10},
+                    {SCHEMA_NAME: 'sales', TABLE_NAME: 'items', ROW_COUNT: 20},
+                    {SCHEMA_NAME: 'sales', TABLE_NAME: 'returns', ROW_COUNT: None}]
+    # The table which was never analyzed is scheduled first
+    assert 'sales.items' in database.queries[0]
+
+
+def test_count_partitioned_tables_postgres():
+    # The partitions of PostgreSQL are tables, which are not counted on their own
+    database = FakeDatabase({'sales.items': 20, 'sales.orders_2023': 3, 'sales.orders_2024': 4})
+    tables = [get_table('sales', 'orders', 7), get_table('sales', 'orders_2023', 3),
+              get_table('sales', 'orders_2024', 4), get_table('sales', 'items', 20)]
+    partitions = [get_partition('orders', 1, 'orders_2023'), get_partition('orders', 2, 'orders_2024')]
+
+    rows, partition_rows = ExactRowCounter(2, 30).count_partitioned_tables(database, POSTGRES, tables, partitions,
+                                                                           SECTION_SOURCE)
+
+    assert to_counts(rows, SCHEMA_NAME, TABLE_NAME) == {('sales', 'orders'): 7, ('sales', 'orders_2023'): 3,
+                                                        ('sales', 'orders_2024'): 4, ('sales', 'items'): 20}
+    assert to_counts(partition_rows, TABLE_NAME, PARTITION_NUMBER) == {('orders', 1): 3, ('orders', 2): 4}
+    assert len(database.queries) == 3
+
+
+def test_count_partitioned_tables_oracle():
+    # The partition names of Oracle are not table names, so a table named like a partition keeps its own count
+    database = FakeDatabase({'sales.p0': 50, 'sales.orders partition p0': 3, 'sales.orders partition p1': 4})
+    tables = [get_table('sales', 'orders', 7), get_table('sales', 'p0', 50)]
+    partitions = [get_partition('orders', 1, 'p0'), get_partition('orders', 2, 'p1')]
+
+    rows, _ = ExactRowCounter(2, 30).count_partitioned_tables(database, ORACLE, tables, partitions, SECTION_SOURCE)
+
+    assert to_counts(rows, SCHEMA_NAME, TABLE_NAME) == {('sales', 'orders'): 7, ('sales', 'p0'): 50}
+
+
+def test_count_partitioned_tables_timeout():
+    database = FakeDatabase({'sales.orders partition p0': 3})
+    tables = [get_table('sales', 'orders', 7)]
+    partitions = [get_partition('orders', 1, 'p0'), get_partition('orders', 2, 'p1')]
+
+    rows, partition_rows = ExactRowCounter(2, 30).count_partitioned_tables(database, MYSQL, tables, partitions,
+                                                                           SECTION_SOURCE)
+
+    assert to_counts(rows, SCHEMA_NAME, TABLE_NAME) == {('sales', 'orders'): None}
+    assert to_counts(partition_rows, TABLE_NAME, PARTITION_NUMBER) == {('orders', 1): 3, ('orders', 2): None}
+
+
+def run_both(source_function, target_function):
+    return source_function(), target_function()
+
+
+def count_tiers(source_type, target_type):
+    source_rows = [get_table('sales', 'matched', 1000), get_table('sales', 'dropped', 1000),
+                   get_table('sales', 'sampled', 100000), get_table('sales', 'close', 100000),
+                   get_table('sales', 'small', 10), get_table('sales', 'unanalyzed', 0)]
+    target_rows = [get_table('sales', 'matched', 1000), get_table('sales', 'sampled', 90000),
+                   get_table('sales', 'close', 99000), get_table('sales', 'small', 12),
+                   get_table('sales', 'unanalyzed', 0)]
+    source_db = FakeDatabase({'sales.close': 100000, 'sales.small': 10, 'sales.unanalyzed': 5,
+                              'sales.sampled': 100000},
+                             {'sales.sampled': 100000, 'sales.close': 100200})
+    target_db = FakeDatabase({'sales.close': 99500, 'sales.small': 10, 'sales.unanalyzed': 5,
+                              'sales.sampled': 50000},
+                             {'sales.sampled': 50000, 'sales.close': 99800})
+    counter = TieredRowCounter(ExactRowCounter(2, 30), sample_percent=1, tolerance=5, min_sample_rows=10000)
+
+    source_counts, target_counts = counter.count_tables(run_both, source_db, source_type, source_rows, target_db,
+                                                        target_type, target_rows)
+    return {row[TABLE_NAME]: (row[ROW_COUNT], row[ROW_COUNT_TIER]) for row in source_counts}, \
+        {row[TABLE_NAME]: (row[ROW_COUNT], row[ROW_COUNT_TIER]) for row in target_counts}
+
+
+def test_tiered_count_tables():
+    source_counts, target_counts = count_tiers(POSTGRES, POSTGRES)
+
+    assert source_counts == {'matched': (1000, TIER_ESTIMATE), 'dropped': (1000, TIER_ESTIMATE),
+                             'sampled': (100000, TIER_SAMPLE), 'close': (100000, TIER_EXACT),
+                             'small': (10, TIER_EXACT), 'unanalyzed': (5, TIER_EXACT)}
+    assert target_counts == {'matched': (1000, TIER_ESTIMATE), 'sampled': (50000, TIER_SAMPLE),
+                             'close': (99500, TIER_EXACT), 'small': (10, TIER_EXACT), 'unanalyzed': (5, TIER_EXACT)}
+
+
+def test_tiered_count_tables_without_sampling():
+    # MySQL has no sampled row count, so the tables the estimates do not decide are counted in full
+    source_counts, target_counts = count_tiers(POSTGRES, MYSQL)
+
+    assert source_counts['sampled'] == (100000, TIER_EXACT)
+    assert target_counts['sampled'] == (50000, TIER_EXACT)
+    assert source_counts['matched'] == (1000, TIER_ESTIMATE)
+
+
+def test_tiered_count_partitions():
+    source_rows = [{SCHEMA_NAME: 'sales', TABLE_NAME: 'orders', ROW_COUNT: 7},
+                   {SCHEMA_NAME: 'sales', TABLE_NAME: 'items', ROW_COUNT: 20}]
+    target_rows = [{SCHEMA_NAME: 'sales', TABLE_NAME: 'orders', ROW_COUNT: 6},
+                   {SCHEMA_NAME: 'sales', TABLE_NAME: 'items', ROW_COUNT: 20}]
+    partitions = [get_partition('orders', 1, 'p0'), get_partition('items', 1, 'p0')]
+    source_db = FakeDatabase({'sales.orders partition p0': 7})
+    target_db = FakeDatabase({'sales.orders partition p0': 6})
+    counter = TieredRowCounter(ExactRowCounter(2, 30), sample_percent=1, tolerance=5, min_sample_rows=10000)
+
+    source_partitions, target_partitions = counter.count_partitions(run_both, source_db, ORACLE, partitions,
+                                                                    target_db, ORACLE, partitions, source_rows,
+                                                                    target_rows)
+
+    # Only the partitions of the table whose row counts differ are counted
+    assert to_counts(source_partitions, TABLE_NAME, PARTITION_NUMBER) == {('orders', 1): 7}
+    assert to_counts(target_partitions, TABLE_NAME, PARTITION_NUMBER) == {('orders', 1): 6}
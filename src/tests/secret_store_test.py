@@ -0,0 +1,144 @@
+"""
+Tests of the resolution and caching of the secrets
+"""
+import json
+from threading import Lock
+
+import pytest
+
+from database import *
+from database import database_engine
+from database.database_engine import create_databases
+from src import SECRETS_CACHE_KEY
+from src.utility import secret_store
+from src.utility.secret_store import EnvironmentProvider, FileProvider, SecretStore
+from src.utility.utils import CommonUtility
+
+SECRET = {"host": "localhost", "port": 5432, "username": "admin", "password": "secret", "database_name": "sales"}
+
+
+class CountingProvider:
+    """
+    Returns a copy of SECRET with the secret id, and counts the secrets read
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.lock = Lock()
+
+    def get_secret(self, secret_id):
+        with self.lock:
+            self.calls.append(secret_id)
+        return dict(SECRET, secret_id=secret_id)
+
+
+def test_environment_provider(monkeypatch):
+    monkeypatch.setenv('SECRET_PROD_SOURCE_DB_1', json.dumps(SECRET))
+
+    assert EnvironmentProvider.get_variable_name('prod/source-db.1') == 'SECRET_PROD_SOURCE_DB_1'
+    assert EnvironmentProvider().get_secret('prod/source-db.1') == SECRET
+
+
+def test_environment_provider_missing(monkeypatch):
+    monkeypatch.delenv('SECRET_PROD_TARGET', raising=False)
+
+    with pytest.raises(KeyError, match="SECRET_PROD_TARGET"):
+        EnvironmentProvider().get_secret('prod/target')
+
+
+def test_file_provider(tmp_path):
+    path = tmp_path / 'secrets.json'
+    path.write_text(json.dumps({'prod/source': SECRET}), encoding='utf-8')
+
+    assert FileProvider(str(path)).get_secret('prod/source') == SECRET
+    with pytest.raises(KeyError, match="prod/target"):
+        FileProvider(str(path)).get_secret('prod/target')
+
+
+def test_cache(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(secret_store, 'time', lambda: now[0])
+    provider = CountingProvider()
+    store = SecretStore(provider, ttl=60)
+
+    assert store.get_secret('prod/source')['secret_id'] == 'prod/source'
+    now[0] += 59
+    store.get_secret('prod/source')
+    assert provider.calls == ['prod/source']
+
+    # The secret is read from the provider again once it expired
+    now[0] += 2
+    store.get_secret('prod/source')
+    assert provider.calls == ['prod/source', 'prod/source']
+
+
+def test_cache_disabled():
+    provider = CountingProvider()
+    store = SecretStore(provider, ttl=0)
+
+    store.get_secret('prod/source')
+    store.get_secret('prod/source')
+
+    assert provider.calls == ['prod/source', 'prod/source']
+
+
+def test_get_secrets():
+    provider = CountingProvider()
+    store = SecretStore(provider, ttl=60)
+
+    secrets = store.get_secrets(['prod/source', 'prod/target', 'prod/source'])
+
+    assert list(secrets) == ['prod/source', 'prod/target']
+    assert secrets['prod/target']['secret_id'] == 'prod/target'
+    assert sorted(provider.calls) == ['prod/source', 'prod/target']
+    # The secrets read in parallel are then returned from the cache
+    store.get_secret('prod/target')
+    assert len(provider.calls) == 2
+
+
+def test_disk_cache_without_key(tmp_path, monkeypatch):
+    monkeypatch.delenv(SECRETS_CACHE_KEY, raising=False)
+    cache_path = tmp_path / 'output' / 'secrets_cache.bin'
+    provider = CountingProvider()
+
+    store = SecretStore(provider, ttl=60, cache_path=str(cache_path))
+    store.get_secret('prod/source')
+
+    # Without a key the secrets are only cached in memory, and nothing is written to disk
+    assert store.fernet is None
+    assert not cache_path.exists()
+    assert provider.calls == ['prod/source']
+
+
+def test_disk_cache(tmp_path, monkeypatch):
+    fernet = pytest.importorskip('cryptography.fernet')
+    monkeypatch.setenv(SECRETS_CACHE_KEY, fernet.Fernet.generate_key().decode())
+    cache_path = tmp_path / 'output' / 'secrets_cache.bin'
+    SecretStore(CountingProvider(), ttl=60, cache_path=str(cache_path)).get_secret('prod/source')
+    provider = CountingProvider()
+
+    store = SecretStore(provider, ttl=60, cache_path=str(cache_path))
+
+    assert store.get_secret('prod/source')['secret_id'] == 'prod/source'
+    assert provider.calls == []
+    assert b'"password"' not in cache_path.read_bytes()
+
+
+def test_create_databases(monkeypatch):
+    configurations = {SOURCE_SECRET_ID: 'prod/source', TARGET_SECRET_ID: 'prod/target',
+                      SOURCE_DATABASE_TYPE: MSSQL, TARGET_DATABASE_TYPE: POSTGRES}
+    monkeypatch.setattr(CommonUtility, 'read_configurations',
+                        staticmethod(lambda property_name, *args, **kwargs: configurations[property_name]))
+    provider = CountingProvider()
+    # Without a cache of the secrets, each secret is still read once
+    monkeypatch.setattr(CommonUtility, 'secret_store', SecretStore(provider, ttl=0))
+    created = []
+    monkeypatch.setattr(database_engine, 'create_database', lambda *args: created.append(args))
+    monkeypatch.setattr(database_engine, 'get_query_cache', lambda: None)
+
+    source_db, target_db = create_databases()
+
+    assert sorted(provider.calls) == ['prod/source', 'prod/target']
+    assert (source_db.db_type, target_db.db_type) == (MSSQL, POSTGRES)
+    assert created == [(MSSQL, 'localhost', 5432, 'sales', 'admin', 'secret'),
+                       (POSTGRES, 'localhost', 5432, 'sales', 'admin', 'secret')]
@@ -0,0 +1,75 @@
+"""
+Tests of the snapshot of the report data
+"""
+import gzip
+import io
+import pickle
+from decimal import Decimal
+
+import pytest
+
+from database import SECTION_SOURCE
+from logger import get_logger
+from src import *
+from src.catalog import ObjectNames
+from src.report_generator import MigrationSummaryObject
+from src.snapshot import SnapshotUnpickler
+
+
+class RunsCode:
+    """
+    Pickled like in a crafted snapshot, which creates a file when it is loaded
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __reduce__(self):
+        return exec, (f"open({self.path!r}, 'w').close()",)
+
+
+@pytest.fixture
+def summary(tmp_path):
+    summary = MigrationSummaryObject.__new__(MigrationSummaryObject)
+    summary.logger = get_logger(__name__)
+    summary.output_directory = str(tmp_path)
+    summary.timestamp = '20240102_030405'
+    summary.db_type_source = 'mssql'
+    summary.db_type_target = 'postgres'
+    summary.combined_row_count_data = {SECTION_SOURCE: {('sales', 'orders'): {ROW_COUNT: Decimal('10')}}}
+    summary.database_summary = {'version': ['15.0', '16.1']}
+    summary.missing_schemas = ['legacy']
+    summary.validation_data = {OBJECTS: {'sales': {'table': {MISSING_ITEMS: ObjectNames(['items'])}}}}
+    summary.comparison_data = {'sales': {DISPLAY_FLAG: True}}
+    summary.data_validation_data = None
+    summary.spot_check_data = None
+    return summary
+
+
+def test_snapshot(summary):
+    snapshot_path = summary.save_snapshot()
+
+    loaded = MigrationSummaryObject.from_snapshot(snapshot_path, 'html')
+
+    for attribute in MigrationSummaryObject.snapshot_attributes:
+        assert getattr(loaded, attribute) == getattr(summary, attribute)
+    assert loaded.output_file_name.endswith('.html')
+
+
+def test_crafted_snapshot(tmp_path):
+    marker_path = tmp_path / 'marker'
+    snapshot_path = tmp_path / 'crafted.pkl.gz'
+    with gzip.open(snapshot_path, 'wb') as snapshot_file:
+        pickle.dump({'version': SNAPSHOT_VERSION, 'validation_data': RunsCode(str(marker_path))}, snapshot_file)
+
+    with pytest.raises(SystemExit):
+        MigrationSummaryObject.from_snapshot(str(snapshot_path), 'html')
+    assert not marker_path.exists()
+
+
+def test_unpickler():
+    data = {'count': Decimal('1.5'), 'names': ObjectNames(['a', 'b'])}
+    assert SnapshotUnpickler(io.BytesIO(pickle.dumps(data))).load() == data
+
+    with pytest.raises(pickle.UnpicklingError, match="builtins.exec"):
+        SnapshotUnpickler(io.BytesIO(pickle.dumps(RunsCode('marker')))).load()
@@ -0,0 +1,95 @@
+"""
+Tests of the spill of the object names of a catalog to local disk
+"""
+import io
+import pickle
+
+import pytest
+
+from src.catalog import ObjectNames
+from src.spill import CatalogSpill, SpilledNames, SpillWriter, dump_spilled, load_spilled
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # A few names per chunk, so that every sequence of names spans several chunks
+    monkeypatch.setattr('src.spill.SPILL_CHUNK_SIZE', 2)
+
+
+def test_merge(tmp_path):
+    spill = CatalogSpill(str(tmp_path), 'source', run_size=40)
+    spill.add('table', [('Sales', 'Orders'), ('HR', 'employees'), ('sales', 'items'), ('sales', 'customers')])
+    spill.add('index', [('sales', 'ix_orders'), ('sales', 'ix_items')])
+    spill.add('table', [('sales', 'returns'), ('hr', 'contractors')])
+    assert len(spill.runs) > 3
+
+    schema_objects = spill.merge()
+
+    assert list(schema_objects) == [('hr', 'table'), ('sales', 'index'), ('sales', 'table')]
+    assert list(schema_objects['hr', 'table']) == ['contractors', 'employees']
+    assert list(schema_objects['sales', 'index']) == ['ix_items', 'ix_orders']
+    assert list(schema_objects['sales', 'table']) == ['customers', 'items', 'orders', 'returns']
+    assert len(schema_objects['sales', 'table']) == 4
+    assert spill.runs == []
+    assert [path.name for path in tmp_path.iterdir()] == ['source_catalog.spill']
+
+
+def test_writer(tmp_path):
+    writer = SpillWriter(str(tmp_path / 'names.spill'))
+    first = writer.write(['a', 'b', 'c'])
+    empty = writer.end()
+    second = writer.write(['d'])
+    writer.close()
+
+    assert list(first) == ['a', 'b', 'c']
+    assert list(empty) == [] and len(empty) == 0
+    assert list(second) == ['d']
+    assert second == ObjectNames(['d'])
+
+
+def get_spilled_data(tmp_path):
+    writer = SpillWriter(str(tmp_path / 'catalog.spill'))
+    orders = writer.write(['customers', 'items', 'orders'])
+    empty = writer.end()
+    writer.close()
+    return {'sales': {'table': orders, 'view': empty, 'index': ObjectNames(['ix_orders'])},
+            'hr': {'table': orders}}
+
+
+def test_dump_and_load(tmp_path):
+    data = get_spilled_data(tmp_path)
+    spill_file = io.BytesIO()
+    dump_spilled(data, spill_file)
+    spill_file.seek(0)
+
+    loaded = load_spilled(spill_file)
+
+    assert isinstance(loaded['sales']['table'], ObjectNames)
+    assert list(loaded['sales']['table']) == ['customers', 'items', 'orders']
+    assert list(loaded['sales']['view']) == []
+    assert list(loaded['sales']['index']) == ['ix_orders']
+    # A SpilledNames referenced twice is written once and loaded as a single object
+    assert loaded['hr']['table'] is loaded['sales']['table']
+
+
+def test_load_into_spill(tmp_path):
+    data = get_spilled_data(tmp_path)
+    spill_file = io.BytesIO()
+    dump_spilled(data, spill_file)
+    spill_file.seek(0)
+
+    loaded = load_spilled(spill_file, spill_path=str(tmp_path / 'loaded.spill'))
+
+    assert isinstance(loaded['sales']['table'], SpilledNames)
+    assert loaded['sales']['table'].path == str(tmp_path / 'loaded.spill')
+    assert list(loaded['sales']['table']) == ['customers', 'items', 'orders']
+    assert list(loaded['sales']['view']) == []
+    assert loaded['hr']['table'] is loaded['sales']['table']
+
+
+def test_load_pickle():
+    # Snapshots written with pickle.dump by earlier versions still load
+    data = {'sales': {'table': ObjectNames(['orders'])}}
+    loaded = load_spilled(io.BytesIO(pickle.dumps(data)))
+
+    assert list(loaded['sales']['table']) == ['orders']
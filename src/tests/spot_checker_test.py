@@ -0,0 +1,100 @@
+"""
+Tests of the spot check of the data of the tables on a sample of rows
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from database import MSSQL, ORACLE, POSTGRES
+from src import *
+from src.spot_checker import SpotChecker
+
+
+def get_result():
+    return {KEY_COLUMN: 'id', SAMPLE_SIZE: 0, MISMATCHED_ROWS: 0, MISMATCH_RATE: None, MISMATCH_LOWER_BOUND: None,
+            MISMATCH_UPPER_BOUND: None, MISMATCHED_COLUMNS: [], REASON: None, COLOR: COLOR_GREEN}
+
+
+@pytest.mark.parametrize('sample_size, mismatched_rows, lower_bound, upper_bound', [
+    # Wilson score intervals at 95 % confidence
+    (1000, 0, 0.0, 0.003827),
+    (1000, 10, 0.005441, 0.018309),
+    (10, 10, 0.722467, 1.0)
+])
+def test_set_rate(sample_size, mismatched_rows, lower_bound, upper_bound):
+    result = get_result()
+
+    SpotChecker(1000, 95, 30).set_rate(result, sample_size, mismatched_rows)
+
+    assert result[MISMATCH_RATE] == mismatched_rows / sample_size
+    assert result[MISMATCH_LOWER_BOUND] == pytest.approx(lower_bound, abs=1e-6)
+    assert result[MISMATCH_UPPER_BOUND] == pytest.approx(upper_bound, abs=1e-6)
+    assert result[COLOR] == (COLOR_YELLOW if mismatched_rows else COLOR_GREEN)
+
+
+def test_set_rate_confidence():
+    result_95 = get_result()
+    result_99 = get_result()
+
+    SpotChecker(1000, 95, 30).set_rate(result_95, 1000, 10)
+    SpotChecker(1000, 99, 30).set_rate(result_99, 1000, 10)
+
+    assert result_99[MISMATCH_LOWER_BOUND] < result_95[MISMATCH_LOWER_BOUND]
+    assert result_99[MISMATCH_UPPER_BOUND] > result_95[MISMATCH_UPPER_BOUND]
+
+
+def test_set_rate_empty_sample():
+    result = get_result()
+
+    SpotChecker(1000, 95, 30).set_rate(result, 0, 0)
+
+    assert result[SAMPLE_SIZE] == 0
+    assert result[MISMATCH_RATE] is None
+    assert result[COLOR] == COLOR_GREEN
+
+
+@pytest.mark.parametrize('db_type, data_type, family', [
+    (MSSQL, 'bit', 'boolean'),
+    (MSSQL, 'datetime2', 'timestamp'),
+    (MSSQL, 'uniqueidentifier', 'uuid'),
+    (POSTGRES, 'numeric', 'decimal'),
+    (ORACLE, 'blob', None)
+])
+def test_get_family(db_type, data_type, family):
+    assert SpotChecker.get_family(db_type, data_type) == family
+
+
+@pytest.mark.parametrize('family, source_values, target_values, equal', [
+    ('string', ['abc  ', 'x', None], ['abc', 'y', None], [True, False, True]),
+    ('boolean', [1, 0, None], [True, True, False], [True, False, False]),
+    ('timestamp', [datetime(2024, 1, 2, 3, 4, 5), date(2024, 1, 2)],
+     ['2024-01-02 03:04:05', datetime(2024, 1, 2)], [True, True]),
+    ('decimal', [Decimal('1.50'), 2, Decimal('3')], [Decimal('1.5'), Decimal('2.00'), Decimal('3.01')],
+     [True, True, False]),
+    ('float', [0.1 + 0.2, 1.0], [0.3, 1.1], [True, False]),
+    ('uuid', ['6F9619FF-8B86-D011-B42D-00C04FC964FF'], ['6f9619ff-8b86-d011-b42d-00c04fc964ff'], [True])
+])
+def test_compare_column(family, source_values, target_values, equal):
+    actual = SpotChecker(1000, 95, 30).compare_column(pd.Series(source_values, dtype=object),
+                                                      pd.Series(target_values, dtype=object), family)
+
+    assert actual.tolist() == equal
+
+
+def test_compare_sample():
+    source_rows = [(1, 'a', Decimal('1.0')), (2, 'b', Decimal('2.0')), (3, 'c', Decimal('3.0')),
+                   (4, 'd', Decimal('4.0'))]
+    # The target returns the rows in another order, row 2 has another name and row 4 is missing
+    target_rows = [(3, 'c', Decimal('3.00')), (1, 'a', Decimal('1')), (2, 'B', Decimal('2.0'))]
+    result = get_result()
+
+    SpotChecker(1000, 95, 30).compare_sample(result, 'id', {'name': 'string', 'amount': 'decimal'}, source_rows,
+                                             target_rows)
+
+    assert result[SAMPLE_SIZE] == 4
+    assert result[MISMATCHED_ROWS] == 2
+    assert result[MISMATCH_RATE] == 0.5
+    assert result[MISMATCHED_COLUMNS] == ['name']
+    assert result[COLOR] == COLOR_YELLOW
@@ -0,0 +1,21 @@
+"""
+Tests of the imports of the report templates
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.mark.parametrize('module_name', ['src.templates.excel_template', 'src.templates.html_template',
+                                         'src.templates.pdf_template'])
+def test_template_imports(module_name):
+    # The report generator is only imported by the templates for the type hints
+    code = (f"import sys, {module_name}\n"
+            "print(sorted({'src.report_generator', 'sqlalchemy', 'pandas', 'boto3'} & set(sys.modules)))")
+    result = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == '[]'
@@ -0,0 +1,76 @@
+"""
+Process wide configuration. The configuration files are parsed once and the values are then looked up in memory
+"""
+import os
+from configparser import ConfigParser
+from threading import Lock
+
+from src.utility import CONFIGURATION_DIR
+
+
+class Configuration:
+    """
+    Values of the configuration files, overlaid by the environment variables, which are overlaid in turn by the values
+    given on the command line. The files and the environment are read when a value is first looked up, and are only
+    read again by reload, for processes which run for long and whose configuration changes
+    """
+    _instance = None
+    _instance_lock = Lock()
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = Lock()
+        self.files = {}
+        self.environment = dict(os.environ)
+        self.overrides = {}
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+                    cls._instance = cls(os.path.join(root_dir, CONFIGURATION_DIR))
+        return cls._instance
+
+    def get(self, property_name, config_file=None, section_name=None):
+        """
+        :return: Value of the property, '' if the section is not in the file and None if the property is not in the
+        section
+        """
+        value = self.overrides.get(property_name) or self.environment.get(property_name)
+
+        if not value:
+            sections = self.get_sections(config_file)
+            value = sections[section_name].get(property_name.lower()) if section_name in sections else ''
+        return value
+
+    def get_sections(self, config_file):
+        """
+        :return: Dictionary with the options of each section of the configuration file, whose names are in lower case
+        """
+        sections = self.files.get(config_file)
+        if sections is None:
+            with self.lock:
+                sections = self.files.get(config_file)
+                if sections is None:
+                    config = ConfigParser()
+                    config.read(os.path.join(self.directory, config_file))
+                    sections = {section: dict(config[section]) for section in config.sections()}
+                    self.files[config_file] = sections
+        return sections
+
+    def set_overrides(self, overrides):
+        """
+        :param overrides: Dictionary with the values of the properties given on the command line
+        """
+        self.overrides.update({name: value for name, value in overrides.items() if value is not None})
+
+    def reload(self):
+        """
+        Reads the configuration files and the environment variables again. The values given on the command line are
+        kept
+        """
+        with self.lock:
+            self.files = {}
+            self.environment = dict(os.environ)
@@ -0,0 +1,165 @@
+"""
+Resolution of the secrets holding the connection details of the databases. The secrets are read from a provider, which
+is AWS Secrets Manager or, for running the tool offline, the environment variables or a local JSON file. They are kept
+in memory, and optionally in an encrypted file, for SECRETS_CACHE_TTL seconds, so that repeated runs do not read them
+from the provider again
+"""
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import time
+
+from logger import get_logger
+from src import *
+
+
+class SecretsManagerProvider:
+    """
+    Reads the secrets from AWS Secrets Manager, or from a local stand-in of its API when an endpoint URL is given.
+    A single client is shared by all the secrets
+    """
+
+    def __init__(self, region, endpoint_url=None):
+        self.region = region
+        self.endpoint_url = endpoint_url or None
+        self.client = None
+        self.lock = Lock()
+
+    def get_client(self):
+        with self.lock:
+            if self.client is None:
+                # boto3 takes long to import and is only needed for reading the secrets
+                import boto3
+                self.client = boto3.session.Session().client(service_name='secretsmanager', region_name=self.region,
+                                                             endpoint_url=self.endpoint_url)
+        return self.client
+
+    def get_secret(self, secret_id):
+        response = self.get_client().get_secret_value(SecretId=secret_id)
+        return json.loads(response['SecretString'])
+
+
+class EnvironmentProvider:
+    """
+    Reads each secret as JSON from the environment variable named SECRET_ followed by the secret id in upper case,
+    with the characters other than letters and digits replaced by underscores
+    """
+
+    @staticmethod
+    def get_variable_name(secret_id):
+        return SECRET_ENVIRONMENT_PREFIX + re.sub(r'[^A-Z0-9]', '_', secret_id.upper())
+
+    def get_secret(self, secret_id):
+        variable_name = self.get_variable_name(secret_id)
+        if variable_name not in os.environ:
+            raise KeyError(f"The environment variable {variable_name} is not set")
+        return json.loads(os.environ[variable_name])
+
+
+class FileProvider:
+    """
+    Reads the secrets from a JSON file holding the secret of each secret id
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def get_secret(self, secret_id):
+        with open(self.path, encoding='utf-8') as secrets_file:
+            secrets = json.load(secrets_file)
+        if secret_id not in secrets:
+            raise KeyError(f"The secret {secret_id} is not in {self.path}")
+        return secrets[secret_id]
+
+
+class SecretStore:
+    """
+    Resolves the secrets through the provider and caches them for ttl seconds. With a cache path, the cached secrets
+    are also saved to that file, encrypted with the Fernet key of the SECRETS_CACHE_KEY environment variable
+    """
+
+    def __init__(self, provider, ttl, cache_path=None):
+        self.logger = get_logger(__name__)
+        self.provider = provider
+        self.ttl = ttl
+        self.cache_path = cache_path
+        self.fernet = self.create_fernet() if cache_path else None
+        self.secrets = {}
+        self.lock = Lock()
+        if self.fernet is not None:
+            self.secrets = self.load_cache()
+
+    def create_fernet(self):
+        """
+        :return: Fernet object of the key of the SECRETS_CACHE_KEY environment variable, or None if the secrets are
+        not saved to disk
+        """
+        key = os.environ.get(SECRETS_CACHE_KEY)
+        if not key:
+            self.logger.warning(f"Set {SECRETS_CACHE_KEY} to a Fernet key to save the secrets to disk")
+            return None
+
+        try:
+            # cryptography is only needed for the encrypted cache
+            from cryptography.fernet import Fernet
+            return Fernet(key.encode())
+        except Exception as e:
+            self.logger.warning(f"The secrets are not saved to disk: {e}")
+            return None
+
+    def load_cache(self):
+        if not os.path.exists(self.cache_path):
+            return {}
+
+        try:
+            with open(self.cache_path, 'rb') as cache_file:
+                secrets = json.loads(self.fernet.decrypt(cache_file.read()))
+        except Exception as e:
+            self.logger.warning(f"Ignoring the secrets cache {self.cache_path}: {e}")
+            return {}
+
+        now = time()
+        return {secret_id: (expiry, secret) for secret_id, (expiry, secret) in secrets.items() if expiry > now}
+
+    def save_cache(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        temp_path = f"{self.cache_path}.tmp"
+        with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as cache_file:
+            cache_file.write(self.fernet.encrypt(json.dumps(self.secrets).encode()))
+        os.replace(temp_path, self.cache_path)
+
+    def get_cached_secret(self, secret_id):
+        cached = self.secrets.get(secret_id)
+        if cached is not None and cached[0] > time():
+            return cached[1]
+        return None
+
+    def get_secret(self, secret_id):
+        """
+        :return: Dictionary with the secret, from the cache unless it expired
+        """
+        secret = self.get_cached_secret(secret_id)
+        if secret is not None:
+            return secret
+
+        self.logger.info(f"Trying to fetch the secret: {secret_id}")
+        secret = self.provider.get_secret(secret_id)
+        self.logger.info("Successfully retrieved secret")
+
+        if self.ttl > 0:
+            with self.lock:
+                self.secrets[secret_id] = (time() + self.ttl, secret)
+                if self.fernet is not None:
+                    self.save_cache()
+        return secret
+
+    def get_secrets(self, secret_ids):
+        """
+        Resolves the secrets in parallel, so that the round trips to the provider overlap
+        :return: Dictionary with the secret of each secret id
+        """
+        secret_ids = list(dict.fromkeys(secret_ids))
+        with ThreadPoolExecutor(max_workers=max(len(secret_ids), 1)) as executor:
+            return dict(zip(secret_ids, executor.map(self.get_secret, secret_ids)))
@@ -2,71 +2,96 @@
 Common utilities file
 """
 import os
-import json
-import boto3
 from logger import get_logger
 from pathlib import Path
-from configparser import ConfigParser
-from database import CONFIG_FILE, SECRET_REGION, SECTION_REGION
+from threading import Lock
+from database import (CONFIG_FILE, SECRET_REGION, SECRETS_CACHE_TTL, SECRETS_DISK_CACHE, SECRETS_ENDPOINT_URL,
+                      SECRETS_FILE, SECRETS_PROVIDER, SECTION_REGION, SECTION_SECRETS)
+from src import (DEFAULT_SECRETS_CACHE_TTL, OUTPUT_DIR, SECRETS_CACHE_FILE, SECRETS_PROVIDER_ENVIRONMENT,
+                 SECRETS_PROVIDER_FILE, SECRETS_PROVIDER_SECRETS_MANAGER)
 
-from src.utility import CONFIGURATION_DIR
+from src.utility.configuration import Configuration
+from src.utility.secret_store import EnvironmentProvider, FileProvider, SecretsManagerProvider, SecretStore
 
 
 class CommonUtility:
     logger = get_logger(__name__)
+    secret_store = None
+    secret_store_lock = Lock()
 
     @staticmethod
     def read_configurations(property_name, config_file=None, section_name=None):
-        value = os.environ.get(property_name, None)
+        return Configuration.get_instance().get(property_name, config_file, section_name)
 
+    @staticmethod
+    def read_boolean_configuration(property_name, config_file=None, section_name=None, default=False):
+        """
+        :return: True if the property is set to true, yes or 1, whatever the case, and default if it is not set
+        """
+        value = CommonUtility.read_configurations(property_name, config_file, section_name)
         if not value:
-            # Reading the value from the config file
-            config_path = os.path.join(CommonUtility.get_project_root() + "/conf")
-            if config_path:
-                path = config_path
-            else:
-                path = os.path.join(os.getcwd(), CONFIGURATION_DIR)
-
-            path = os.path.join(path, config_file)
-            config = ConfigParser()
-            config.read(path)
-            if section_name in config.sections():
-                value = config[section_name].get(property_name)
-            else:
-                value = ''
-        return value
+            return default
+        return value.strip().lower() in ('true', 'yes', '1')
 
     @staticmethod
     def get_project_root_old() -> Path:
         return Path(__file__).parent.parent.parent
 
     @staticmethod
-    def get_secret(secret_name):
-        # Create a Secrets Manager client
-        session = boto3.session.Session()
+    def get_secret_store():
+        """
+        Creates the store of the secrets of the configured provider the first time it is needed
+        :return: SecretStore object shared by the whole process
+        """
+        with CommonUtility.secret_store_lock:
+            if CommonUtility.secret_store is None:
+                provider_name = (CommonUtility.read_configurations(SECRETS_PROVIDER, CONFIG_FILE, SECTION_SECRETS) or
+                                 SECRETS_PROVIDER_SECRETS_MANAGER).strip().lower()
+                if provider_name == SECRETS_PROVIDER_ENVIRONMENT:
+                    provider = EnvironmentProvider()
+                elif provider_name == SECRETS_PROVIDER_FILE:
+                    # A relative path is relative to the tool source directory
+                    provider = FileProvider(os.path.join(CommonUtility.get_project_root(),
+                                                         CommonUtility.read_configurations(SECRETS_FILE, CONFIG_FILE,
+                                                                                           SECTION_SECRETS)))
+                else:
+                    provider = SecretsManagerProvider(
+                        CommonUtility.read_configurations(SECRET_REGION, CONFIG_FILE, SECTION_REGION),
+                        CommonUtility.read_configurations(SECRETS_ENDPOINT_URL, CONFIG_FILE, SECTION_SECRETS))
+
+                ttl = CommonUtility.read_configurations(SECRETS_CACHE_TTL, CONFIG_FILE, SECTION_SECRETS)
+                disk_cache = CommonUtility.read_boolean_configuration(SECRETS_DISK_CACHE, CONFIG_FILE, SECTION_SECRETS)
+                cache_path = os.path.join(CommonUtility.get_project_root(), OUTPUT_DIR, SECRETS_CACHE_FILE) \
+                    if disk_cache else None
+                CommonUtility.secret_store = SecretStore(provider, int(ttl or DEFAULT_SECRETS_CACHE_TTL), cache_path)
+
+        return CommonUtility.secret_store
 
+    @staticmethod
+    def get_secret(secret_name):
         try:
-            client = session.client(
-                service_name='secretsmanager',
-                region_name=CommonUtility.read_configurations(SECRET_REGION, CONFIG_FILE, SECTION_REGION)
-            )
-
-            CommonUtility.logger.info(f"Trying to fetch the secret: {secret_name}")
-            get_secret_value_response = client.get_secret_value(
-                SecretId=secret_name
-            )
-            CommonUtility.logger.info("Successfully retrieved secret")
+            return CommonUtility.get_secret_store().get_secret(secret_name)
         except Exception as e:
-            # For a list of exceptions thrown, see
+            # For a list of exceptions thrown by Secrets Manager, see
             # https://docs.aws.amazon.com/secretsmanager/latest/apireference/API_GetSecretValue.html
-            CommonUtility.logger.error("Ensure that the Secrets Manager secret has been correctly created in the "
-                                       "mentioned region.")
+            CommonUtility.logger.error("Ensure that the secret has been correctly created in the mentioned region, or "
+                                       "in the configured secrets provider.")
             CommonUtility.logger.error(e)
             exit(0)
 
-        # Decrypts secret using the associated KMS key.
-        secret = json.loads(get_secret_value_response['SecretString'])
-        return secret
+    @staticmethod
+    def get_secrets(secret_names):
+        """
+        Reads several secrets in parallel
+        :return: Dictionary with the secret of each secret name
+        """
+        try:
+            return CommonUtility.get_secret_store().get_secrets(secret_names)
+        except Exception as e:
+            CommonUtility.logger.error("Ensure that the secret has been correctly created in the mentioned region, or "
+                                       "in the configured secrets provider.")
+            CommonUtility.logger.error(e)
+            exit(0)
 
     @staticmethod
     def verify_secret_schema(secret_dict):